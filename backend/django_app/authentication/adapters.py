@@ -3,6 +3,7 @@ from allauth.socialaccount.providers.github.provider import GitHubProvider
 from allauth.socialaccount.providers.google.provider import GoogleProvider
 from django.utils import timezone
 from . import models
+from .audit import log_security_event
 
 class CustomSocialAccountAdapter(DefaultSocialAccountAdapter):
     def save_user(self, request, sociallogin, form=None):
@@ -47,7 +48,7 @@ class CustomSocialAccountAdapter(DefaultSocialAccountAdapter):
             )
 
             # Log social authentication
-            models.SecurityLog.objects.create(
+            log_security_event(
                 user=user,
                 action=f'{provider}_auth',
                 details={
@@ -0,0 +1,143 @@
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Avg, Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import (
+    Workspace,
+    Team,
+    TeamMembership,
+    UserActivity,
+    SecurityLog,
+    DailyMetric,
+    AnalyticsSnapshot
+)
+
+User = get_user_model()
+
+USER_METRIC_WINDOWS = [7, 30, 90]
+OVERVIEW_WINDOW_DAYS = 30
+
+OVERVIEW = 'overview'
+USER_METRICS = 'user_metrics'
+
+
+def compute_overview():
+    """Totals that only change slowly; refreshed by the periodic job"""
+    return {
+        'users': {
+            'total': User.objects.count(),
+            'active': User.objects.filter(is_active=True).count(),
+        },
+        'workspaces': {
+            'total': Workspace.objects.count(),
+            'by_plan': dict(Workspace.objects.values_list(
+                'plan_type'
+            ).annotate(count=Count('id')))
+        },
+        'teams': {
+            'total': Team.objects.count(),
+            'average_size': TeamMembership.objects.values(
+                'team'
+            ).annotate(size=Count('id')).aggregate(avg=Avg('size'))['avg']
+        }
+    }
+
+
+def compute_user_metrics():
+    """Distinct active users per window cannot be summed from daily counters"""
+    now = timezone.now()
+    return {
+        f'last_{days}_days': {
+            'active_users': UserActivity.objects.filter(
+                created_at__gte=now - timedelta(days=days)
+            ).values('user').distinct().count()
+        }
+        for days in USER_METRIC_WINDOWS
+    }
+
+
+SNAPSHOT_BUILDERS = {
+    OVERVIEW: compute_overview,
+    USER_METRICS: compute_user_metrics,
+}
+
+
+def refresh_snapshot(name):
+    snapshot, _ = AnalyticsSnapshot.objects.update_or_create(
+        name=name,
+        defaults={
+            'data': SNAPSHOT_BUILDERS[name](),
+            'computed_at': timezone.now()
+        }
+    )
+    return snapshot
+
+
+def get_snapshot(name, force_refresh=False):
+    """
+    Return the stored snapshot, building it when missing or older
+    than ANALYTICS_SNAPSHOT_MAX_AGE seconds
+    """
+    snapshot = AnalyticsSnapshot.objects.filter(name=name).first()
+    max_age = timedelta(seconds=settings.ANALYTICS_SNAPSHOT_MAX_AGE)
+    if force_refresh or not snapshot or timezone.now() - snapshot.computed_at > max_age:
+        snapshot = refresh_snapshot(name)
+    return snapshot
+
+
+def rebuild_daily_metrics(days=2):
+    """
+    Recount the last ``days`` days of counters from the source tables,
+    correcting any increments lost by the signal handlers
+    """
+    start = (timezone.now() - timedelta(days=days - 1)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    sources = {
+        DailyMetric.NEW_USERS: User.objects.all(),
+        DailyMetric.PLAN_UPGRADES: UserActivity.objects.filter(action='plan_upgraded'),
+        DailyMetric.USER_ACTIVITIES: UserActivity.objects.all(),
+        DailyMetric.CRITICAL_SECURITY_LOGS: SecurityLog.objects.filter(severity='critical'),
+    }
+    for metric, queryset in sources.items():
+        counts = queryset.filter(created_at__gte=start).annotate(
+            day=TruncDate('created_at')
+        ).values('day').annotate(total=Count('id')).values_list('day', 'total')
+        for day, total in counts:
+            DailyMetric.objects.update_or_create(
+                date=day,
+                metric=metric,
+                defaults={'value': total}
+            )
+
+
+def overview_response(force_refresh=False):
+    snapshot = get_snapshot(OVERVIEW, force_refresh)
+    data = snapshot.data
+    data['users']['new_last_30_days'] = DailyMetric.window_total(
+        DailyMetric.NEW_USERS, OVERVIEW_WINDOW_DAYS
+    )
+    data['security'] = {
+        'critical_logs': DailyMetric.window_total(
+            DailyMetric.CRITICAL_SECURITY_LOGS, OVERVIEW_WINDOW_DAYS
+        )
+    }
+    data['generated_at'] = snapshot.computed_at
+    return data
+
+
+def user_metrics_response(force_refresh=False):
+    snapshot = get_snapshot(USER_METRICS, force_refresh)
+    metrics = {}
+    for days in USER_METRIC_WINDOWS:
+        key = f'last_{days}_days'
+        metrics[key] = {
+            'new_users': DailyMetric.window_total(DailyMetric.NEW_USERS, days),
+            'active_users': snapshot.data.get(key, {}).get('active_users', 0),
+            'upgrades': DailyMetric.window_total(DailyMetric.PLAN_UPGRADES, days)
+        }
+    metrics['generated_at'] = snapshot.computed_at
+    return metrics
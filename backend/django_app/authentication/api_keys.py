@@ -0,0 +1,176 @@
+import atexit
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from cachetools import TTLCache
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import authentication, exceptions
+
+from .jwt import ClaimsUser, get_claims_resolver, user_claims
+from .models import APIKey
+from .models.security import hash_api_key
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ResolvedAPIKey:
+    """
+    What authentication needs from an APIKey row, kept in the local cache.
+    Only the owner's id and flags are kept; each request gets its own user.
+    """
+    id: Any
+    name: str
+    user_id: Any
+    user_claims: Dict[str, Any]
+    scopes: List[str]
+    rate_limit: int
+    expires_at: Optional[datetime]
+
+    def has_scope(self, scope):
+        return scope in self.scopes
+
+    def is_expired(self, now=None):
+        return bool(self.expires_at and self.expires_at < (now or timezone.now()))
+
+
+class APIKeyCache:
+    """
+    Short-lived in-process cache of resolved keys by hash. Unknown keys
+    are cached too, so a client retrying a bad key does not hit the DB.
+    """
+    _MISSING = object()
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cache = TTLCache(
+            maxsize=settings.API_KEY_CACHE_SIZE,
+            ttl=settings.API_KEY_CACHE_TTL
+        )
+
+    def resolve(self, key_hash):
+        with self._lock:
+            resolved = self._cache.get(key_hash, self._MISSING)
+        if resolved is not self._MISSING:
+            return resolved
+
+        api_key = APIKey.objects.select_related('user').filter(
+            key_hash=key_hash,
+            is_active=True
+        ).first()
+        resolved = None
+        if api_key:
+            resolved = ResolvedAPIKey(
+                id=api_key.id,
+                name=api_key.name,
+                user_id=api_key.user_id,
+                user_claims=user_claims(api_key.user),
+                scopes=list(api_key.scopes),
+                rate_limit=api_key.rate_limit,
+                expires_at=api_key.expires_at
+            )
+        with self._lock:
+            self._cache[key_hash] = resolved
+        return resolved
+
+    def invalidate(self, key):
+        with self._lock:
+            self._cache.pop(hash_api_key(key), None)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+class LastUsedTracker:
+    """
+    Collects API key usage in memory and writes last_used for all keys
+    seen since the previous flush in one UPDATE, at most once per
+    API_KEY_LAST_USED_FLUSH_INTERVAL seconds, off the request thread
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._last_flush = timezone.now()
+        self._flushing = False
+
+    def touch(self, key_id, when=None):
+        when = when or timezone.now()
+        with self._lock:
+            self._pending[key_id] = when
+            due = (when - self._last_flush).total_seconds() >= settings.API_KEY_LAST_USED_FLUSH_INTERVAL
+            if not due or self._flushing:
+                return
+            self._flushing = True
+            self._last_flush = when
+        threading.Thread(target=self._flush_in_background, daemon=True).start()
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        finally:
+            from django.db import close_old_connections
+            close_old_connections()
+            with self._lock:
+                self._flushing = False
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        try:
+            APIKey.objects.bulk_update(
+                [APIKey(id=key_id, last_used=when) for key_id, when in pending.items()],
+                ['last_used'],
+                batch_size=500
+            )
+        except Exception as e:
+            logger.warning(f"Failed to record API key usage: {str(e)}")
+
+
+api_key_cache = APIKeyCache()
+last_used_tracker = LastUsedTracker()
+atexit.register(last_used_tracker.flush)
+
+
+class APIKeyAuthentication(authentication.BaseAuthentication):
+    """
+    Authenticate with ``Authorization: Api-Key <key>`` or an ``X-API-Key``
+    header. ``request.auth`` is the ResolvedAPIKey, so views can check scopes.
+    """
+    keyword = 'Api-Key'
+
+    def get_key(self, request):
+        header = authentication.get_authorization_header(request).split()
+        if header and header[0].lower() == self.keyword.lower().encode():
+            if len(header) != 2:
+                raise exceptions.AuthenticationFailed('Invalid API key header.')
+            return header[1].decode('utf-8', errors='ignore')
+        return request.META.get('HTTP_X_API_KEY')
+
+    def authenticate(self, request):
+        key = self.get_key(request)
+        if not key:
+            return None
+
+        resolved = api_key_cache.resolve(hash_api_key(key))
+        now = timezone.now()
+        if resolved is None or resolved.is_expired(now):
+            raise exceptions.AuthenticationFailed('Invalid or expired API key.')
+        # Published claims are kept current on (de)activation; the cached
+        # flags may be up to API_KEY_CACHE_TTL old
+        claims = get_claims_resolver().resolve(resolved.user_id) or resolved.user_claims
+        if not claims.get('is_active'):
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+
+        last_used_tracker.touch(resolved.id, now)
+        return ClaimsUser(resolved.user_id, claims), resolved
+
+    def authenticate_header(self, request):
+        return self.keyword
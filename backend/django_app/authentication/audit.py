@@ -0,0 +1,164 @@
+import atexit
+import logging
+import os
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .models import SecurityLog, TeamActivity, LoginHistory
+
+logger = logging.getLogger(__name__)
+
+
+class AuditLogWriter:
+    """
+    Buffers audit records in process and writes them with bulk_create
+    from a background thread, so requests do not pay for the INSERT.
+    Records are queued only once the surrounding transaction commits.
+    ``close`` stops the thread and writes what is left; it runs at
+    interpreter exit and when a Celery worker process shuts down.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def enqueue(self, record):
+        if not settings.AUDIT_LOG_ASYNC:
+            transaction.on_commit(lambda: self._write([record]))
+            return
+        transaction.on_commit(lambda: self._append(record))
+
+    def _append(self, record):
+        with self._lock:
+            self._buffer.append(record)
+            full = len(self._buffer) >= settings.AUDIT_LOG_BATCH_SIZE
+        self._ensure_worker()
+        if full:
+            self._wakeup.set()
+
+    def flush(self):
+        """Write everything buffered so far"""
+        with self._lock:
+            records, self._buffer = self._buffer, []
+        if records:
+            self._write(records)
+
+    def close(self, timeout=10):
+        """Stop the writer thread and write everything still buffered"""
+        thread = self._thread
+        if thread is not None and self._pid == os.getpid() and thread.is_alive():
+            self._stop.set()
+            self._wakeup.set()
+            thread.join(timeout)
+        self._thread = None
+        self._stop.clear()
+        self.flush()
+
+    def _write(self, records):
+        by_model = defaultdict(list)
+        for record in records:
+            by_model[type(record)].append(record)
+
+        for model, batch in by_model.items():
+            try:
+                with transaction.atomic():
+                    model.objects.bulk_create(batch, batch_size=settings.AUDIT_LOG_BATCH_SIZE)
+            except Exception as e:
+                # One bad record (e.g. its user was deleted meanwhile) must not
+                # drop the whole batch
+                logger.warning(f"Bulk audit write failed, retrying row by row: {str(e)}")
+                for record in batch:
+                    try:
+                        record.save(force_insert=True)
+                    except Exception as row_error:
+                        logger.error(f"Failed to write {model.__name__} audit record: {str(row_error)}")
+
+    def _ensure_worker(self):
+        # Restart the worker in forked children (gunicorn/celery prefork)
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run,
+                name='audit-log-writer',
+                daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(settings.AUDIT_LOG_FLUSH_INTERVAL)
+            self._wakeup.clear()
+            if self._stop.is_set():
+                # close() writes the rest from its own thread
+                return
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Audit log flush failed: {str(e)}")
+            finally:
+                close_old_connections()
+
+
+audit_log_writer = AuditLogWriter()
+atexit.register(audit_log_writer.close)
+
+
+def log_security_event(action, user=None, severity='low', details=None,
+                       ip_address=None, user_agent=''):
+    """
+    Record a SecurityLog entry. Critical events are written synchronously,
+    everything else goes through the batched writer.
+    """
+    record = SecurityLog(
+        user=user,
+        action=action,
+        severity=severity,
+        details=details or {},
+        ip_address=ip_address,
+        user_agent=user_agent or ''
+    )
+    if severity == 'critical':
+        record.save()
+    else:
+        audit_log_writer.enqueue(record)
+    return record
+
+
+def log_team_activity(team, action, user=None, details=None):
+    """Record a TeamActivity entry through the batched writer"""
+    record = TeamActivity(
+        team=team,
+        user=user,
+        action=action,
+        details=details or {}
+    )
+    audit_log_writer.enqueue(record)
+    return record
+
+
+def log_login_attempt(user, status, ip_address=None, user_agent=None, location=None,
+                      device_type=None, login_method='email', failure_reason=None):
+    """Record a LoginHistory entry through the batched writer"""
+    record = LoginHistory(
+        user=user,
+        status=status,
+        ip_address=ip_address,
+        user_agent=user_agent or '',
+        location=location or '',
+        device_type=device_type or '',
+        login_method=login_method,
+        failure_reason=failure_reason or ''
+    )
+    audit_log_writer.enqueue(record)
+    return record
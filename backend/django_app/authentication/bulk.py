@@ -0,0 +1,97 @@
+import uuid
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from .jwt import publish_users_claims
+from .models import UserProfile, SecurityLog
+
+User = get_user_model()
+
+BULK_OPERATIONS = ['activate', 'deactivate', 'update_plan']
+
+
+def validate_bulk_request(operation, user_ids, data):
+    """Return an error message for an invalid bulk request, or None"""
+    if operation not in BULK_OPERATIONS:
+        return f'operation must be one of {BULK_OPERATIONS}'
+    if not isinstance(user_ids, list) or not user_ids:
+        return 'user_ids must be a non-empty list'
+    try:
+        for user_id in user_ids:
+            uuid.UUID(str(user_id))
+    except ValueError:
+        return 'user_ids must contain valid user IDs'
+    if operation == 'update_plan':
+        plans = [choice for choice, _ in UserProfile.PLAN_CHOICES]
+        if (data or {}).get('plan_type') not in plans:
+            return f'data.plan_type must be one of {plans}'
+    return None
+
+
+def _set_active(user_ids, is_active, performed_by_id, now):
+    User.objects.filter(id__in=user_ids).update(is_active=is_active, updated_at=now)
+    # update() skips post_save, which is what normally republishes claims
+    transaction.on_commit(lambda: publish_users_claims(user_ids))
+    action = 'account_activated' if is_active else 'account_deactivated'
+    return [
+        SecurityLog(
+            user_id=user_id,
+            action=action,
+            details={'updated_by': str(performed_by_id), 'bulk': True}
+        )
+        for user_id in user_ids
+    ]
+
+
+def _update_plan(user_ids, plan_type, performed_by_id, now):
+    old_plans = dict(
+        UserProfile.objects.filter(user_id__in=user_ids).values_list('user_id', 'plan_type')
+    )
+    UserProfile.objects.filter(user_id__in=user_ids).update(plan_type=plan_type, updated_at=now)
+    return [
+        SecurityLog(
+            user_id=user_id,
+            action='plan_updated',
+            details={
+                'old_plan': old_plans.get(user_id),
+                'new_plan': plan_type,
+                'updated_by': str(performed_by_id),
+                'bulk': True
+            }
+        )
+        for user_id in user_ids
+    ]
+
+
+def run_bulk_operation(operation, user_ids, data, performed_by_id, on_progress=None):
+    """
+    Apply a bulk operation with one UPDATE and one batched INSERT of
+    audit logs per batch of BULK_USER_BATCH_SIZE users
+    """
+    data = data or {}
+    batch_size = settings.BULK_USER_BATCH_SIZE
+    requested = list(dict.fromkeys(str(uuid.UUID(str(user_id))) for user_id in user_ids))
+    result = {'processed': 0, 'failed': 0, 'errors': []}
+
+    for start in range(0, len(requested), batch_size):
+        batch = requested[start:start + batch_size]
+        found = list(User.objects.filter(id__in=batch).values_list('id', flat=True))
+        missing = set(batch) - {str(user_id) for user_id in found}
+
+        now = timezone.now()
+        with transaction.atomic():
+            if operation == 'update_plan':
+                logs = _update_plan(found, data['plan_type'], performed_by_id, now)
+            else:
+                logs = _set_active(found, operation == 'activate', performed_by_id, now)
+            SecurityLog.objects.bulk_create(logs, batch_size=batch_size)
+
+        result['processed'] += len(found)
+        result['failed'] += len(missing)
+        result['errors'].extend(f'User {user_id} not found' for user_id in sorted(missing))
+        if on_progress:
+            on_progress(start + len(batch), len(requested))
+
+    return result
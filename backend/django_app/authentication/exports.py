@@ -0,0 +1,197 @@
+import csv
+import json
+import logging
+import os
+import time
+import uuid
+import zlib
+
+from django.conf import settings
+from django.core import signing
+
+from .models import UserActivity
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+ACTIVITY_EXPORT_FIELDS = [
+    'id',
+    'user__email',
+    'action',
+    'details',
+    'ip_address',
+    'created_at',
+]
+
+EXPORT_TOKEN_SALT = 'authentication.activity-export'
+
+logger = logging.getLogger(__name__)
+
+
+class _Echo:
+    """File-like object that returns what is written, for csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def activity_export_queryset(start_date=None, end_date=None):
+    """Rows for an activity export as plain dicts, newest first"""
+    queryset = UserActivity.objects.all()
+    if start_date:
+        queryset = queryset.filter(created_at__gte=start_date)
+    if end_date:
+        queryset = queryset.filter(created_at__lte=end_date)
+    return queryset.order_by('-created_at', '-id').values(*ACTIVITY_EXPORT_FIELDS)
+
+
+def _serialize_row(row):
+    return {
+        'id': str(row['id']),
+        'user_email': row['user__email'],
+        'action': row['action'],
+        'details': row['details'],
+        'ip_address': row['ip_address'],
+        'created_at': row['created_at'].isoformat(),
+    }
+
+
+def iter_csv(rows):
+    """Yield CSV lines, header first"""
+    writer = csv.writer(_Echo())
+    columns = ['id', 'user_email', 'action', 'details', 'ip_address', 'created_at']
+    yield writer.writerow(columns)
+    for row in rows:
+        data = _serialize_row(row)
+        data['details'] = json.dumps(data['details'])
+        yield writer.writerow([data[column] for column in columns])
+
+
+def iter_ndjson(rows):
+    """Yield one JSON document per line"""
+    for row in rows:
+        yield json.dumps(_serialize_row(row)) + '\n'
+
+
+def iter_gzip(lines, flush_size=64 * 1024):
+    """Gzip-compress a stream of text lines into byte chunks"""
+    compressor = zlib.compressobj(wbits=31)  # 31 selects the gzip container
+    buffered = []
+    size = 0
+    for line in lines:
+        data = line.encode('utf-8')
+        buffered.append(data)
+        size += len(data)
+        if size >= flush_size:
+            chunk = compressor.compress(b''.join(buffered))
+            buffered, size = [], 0
+            if chunk:
+                yield chunk
+    yield compressor.compress(b''.join(buffered)) + compressor.flush()
+
+
+def iter_export(export_format, start_date=None, end_date=None, compress=False):
+    """
+    Stream an activity export without materializing the queryset
+    """
+    rows = activity_export_queryset(start_date, end_date).iterator(
+        chunk_size=settings.ACTIVITY_EXPORT_CHUNK_SIZE
+    )
+    lines = iter_csv(rows) if export_format == 'csv' else iter_ndjson(rows)
+    if compress:
+        return iter_gzip(lines)
+    return (line.encode('utf-8') for line in lines)
+
+
+def export_filename(export_format, compress=False):
+    return f"activity_logs.{export_format}{'.gz' if compress else ''}"
+
+
+def create_export_token(export_format, compress=False):
+    """Signed download token naming the file a background export writes to"""
+    return signing.dumps(
+        {
+            'file': f"{uuid.uuid4().hex}.{export_format}{'.gz' if compress else ''}",
+            'format': export_format,
+            'compress': compress,
+        },
+        salt=EXPORT_TOKEN_SALT
+    )
+
+
+def read_export_token(token):
+    """Return the token payload, raising signing.BadSignature if invalid/expired"""
+    return signing.loads(
+        token,
+        salt=EXPORT_TOKEN_SALT,
+        max_age=settings.ACTIVITY_EXPORT_TOKEN_MAX_AGE
+    )
+
+
+def export_path(filename):
+    return os.path.join(settings.ACTIVITY_EXPORT_DIR, os.path.basename(filename))
+
+
+def write_export(filename, export_format, start_date=None, end_date=None, compress=False):
+    """
+    Write an export to disk; the file only appears once it is complete
+    """
+    os.makedirs(settings.ACTIVITY_EXPORT_DIR, exist_ok=True)
+    path = export_path(filename)
+    partial_path = f"{path}.partial"
+    try:
+        with open(partial_path, 'wb') as export_file:
+            for chunk in iter_export(export_format, start_date, end_date, compress):
+                export_file.write(chunk)
+        os.replace(partial_path, path)
+    except Exception:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+    return path
+
+
+def _failure_path(filename):
+    return f"{export_path(filename)}.failed"
+
+
+def mark_export_failed(filename, error):
+    """Record that a background export gave up, for download_export to report"""
+    os.makedirs(settings.ACTIVITY_EXPORT_DIR, exist_ok=True)
+    with open(_failure_path(filename), 'w') as failure_file:
+        json.dump({'error': error}, failure_file)
+
+
+def export_failure(filename):
+    """The error of a failed export, or None if it has not failed"""
+    try:
+        with open(_failure_path(filename)) as failure_file:
+            return json.load(failure_file).get('error') or 'Export failed'
+    except FileNotFoundError:
+        return None
+
+
+def cleanup_exports(max_age=None):
+    """
+    Delete export files (finished, partial and failure markers) older than
+    ``max_age`` seconds, by default the download token lifetime after which
+    nothing can reach them. Returns the number of files removed.
+    """
+    if max_age is None:
+        max_age = settings.ACTIVITY_EXPORT_TOKEN_MAX_AGE
+    cutoff = time.time() - max_age
+    removed = 0
+    try:
+        entries = list(os.scandir(settings.ACTIVITY_EXPORT_DIR))
+    except FileNotFoundError:
+        return 0
+    for entry in entries:
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except OSError as e:
+            logger.warning(f"Failed to remove export file {entry.name}: {str(e)}")
+    return removed
@@ -0,0 +1,170 @@
+import logging
+
+import redis
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.functional import SimpleLazyObject
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from shared.auth.claims import UserClaimsResolver
+from shared.auth.revocation import TokenDenylist
+from shared.auth.tokens import InvalidTokenError, TokenVerifier
+
+logger = logging.getLogger(__name__)
+
+_auth_redis = None
+
+
+def get_auth_redis():
+    """Redis connection shared with the FastAPI service for auth state"""
+    global _auth_redis
+    if _auth_redis is None:
+        _auth_redis = redis.Redis.from_url(
+            settings.AUTH_REDIS_URL,
+            decode_responses=True,
+            socket_timeout=0.5,
+            socket_connect_timeout=0.5
+        )
+    return _auth_redis
+
+
+token_verifier = TokenVerifier(
+    settings.SIMPLE_JWT['SIGNING_KEY'],
+    algorithms=[settings.SIMPLE_JWT['ALGORITHM']],
+    cache_size=settings.JWT_VERIFY_CACHE_SIZE
+)
+
+
+def get_token_denylist():
+    return TokenDenylist(get_auth_redis())
+
+
+_claims_resolver = None
+
+
+def get_claims_resolver():
+    global _claims_resolver
+    if _claims_resolver is None:
+        _claims_resolver = UserClaimsResolver(get_auth_redis(), ttl=settings.USER_CLAIMS_TTL)
+    return _claims_resolver
+
+
+def revoke_access_token(token):
+    """Deny an access token in both services until it expires"""
+    try:
+        get_token_denylist().revoke(dict(token.payload))
+    except Exception as e:
+        logger.warning(f"Failed to revoke access token: {str(e)}")
+
+
+def user_claims(user):
+    return {
+        'email': user.email,
+        'is_active': user.is_active,
+        'is_staff': user.is_staff,
+        'is_superuser': user.is_superuser,
+    }
+
+
+def publish_user_claims(user):
+    """Share a user's current authorization flags with the FastAPI service"""
+    try:
+        get_claims_resolver().publish(str(user.pk), user_claims(user))
+    except Exception as e:
+        logger.warning(f"Failed to publish claims for user {user.pk}: {str(e)}")
+
+
+def publish_users_claims(user_ids):
+    """
+    Republish the claims of many users, e.g. after a queryset ``update()``
+    that bypassed post_save
+    """
+    User = get_user_model()
+    users = User.objects.filter(pk__in=list(user_ids)).only(
+        'pk', 'email', 'is_active', 'is_staff', 'is_superuser'
+    )
+    try:
+        get_claims_resolver().publish_many({str(user.pk): user_claims(user) for user in users})
+    except Exception as e:
+        logger.warning(f"Failed to publish claims for {len(user_ids)} users: {str(e)}")
+
+
+def retract_user_claims(user_id):
+    """Mark a deleted user inactive in both services until the claims expire"""
+    try:
+        get_claims_resolver().publish(str(user_id), {'is_active': False})
+    except Exception as e:
+        logger.warning(f"Failed to retract claims for user {user_id}: {str(e)}")
+
+
+class ClaimsUser(SimpleLazyObject):
+    """
+    The authenticated user, with its id and active/staff/superuser flags
+    taken from the shared claims so that permission checks need no query.
+    The User row is loaded the first time anything else is accessed.
+    """
+
+    def __init__(self, user_id, claims):
+        User = get_user_model()
+        self.__dict__['_claims'] = claims
+        self.__dict__['_user_id'] = User._meta.get_field(api_settings.USER_ID_FIELD).to_python(user_id)
+        super().__init__(lambda: User.objects.get(**{api_settings.USER_ID_FIELD: user_id}))
+
+    def __getattr__(self, name):
+        if name in ('is_active', 'is_staff', 'is_superuser', 'email'):
+            return self._claims.get(name)
+        if name in ('pk', api_settings.USER_ID_FIELD):
+            return self._user_id
+        if name == 'is_authenticated':
+            return True
+        if name == 'is_anonymous':
+            return False
+        return super().__getattr__(name)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    simplejwt authentication that verifies each access token once, caching
+    its claims until expiry, and rejects tokens on the shared denylist.
+    The user is resolved through the same published claims the FastAPI
+    service uses; on a miss it is loaded from the database and its claims
+    republished.
+    """
+
+    def get_validated_token(self, raw_token):
+        try:
+            claims = token_verifier.verify(raw_token.decode('utf-8'))
+        except (InvalidTokenError, UnicodeDecodeError) as e:
+            raise InvalidToken({
+                'detail': _('Given token not valid for any token type'),
+                'messages': [{
+                    'token_class': AccessToken.__name__,
+                    'token_type': AccessToken.token_type,
+                    'message': str(e),
+                }]
+            })
+
+        if get_token_denylist().is_revoked(claims):
+            raise InvalidToken(_('Token has been revoked'))
+
+        # The signature is already verified; this only wraps the payload
+        return AccessToken(raw_token, verify=False)
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None or api_settings.CHECK_REVOKE_TOKEN:
+            return super().get_user(validated_token)
+
+        claims = get_claims_resolver().resolve(user_id)
+        if claims is None:
+            user = super().get_user(validated_token)
+            publish_user_claims(user)
+            return user
+
+        if not claims.get('is_active'):
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        return ClaimsUser(user_id, claims)
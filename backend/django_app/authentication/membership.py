@@ -0,0 +1,193 @@
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Workspace, WorkspaceMembership, Team, TeamMembership
+
+
+def _workspace_roles_key(user_id):
+    return f'authentication:workspace-roles:{user_id}'
+
+
+def _team_roles_key(user_id):
+    return f'authentication:team-roles:{user_id}'
+
+
+def roles_cache():
+    """
+    The cache roles are kept in, or None when it is local to this process:
+    invalidations made by other workers would never reach it, so a removed
+    member would keep their role here for MEMBERSHIP_CACHE_TIMEOUT
+    """
+    if isinstance(caches['default'], LocMemCache):
+        return None
+    return cache
+
+
+def _load_workspace_roles(user):
+    roles = {
+        str(workspace_id): role
+        for workspace_id, role in WorkspaceMembership.objects.filter(
+            user_id=user.pk
+        ).values_list('workspace_id', 'role')
+    }
+    # Owners are admins whether or not a membership row exists
+    for workspace_id in Workspace.objects.filter(owner_id=user.pk).values_list('id', flat=True):
+        roles[str(workspace_id)] = 'admin'
+    return roles
+
+
+def _load_team_roles(user):
+    return {
+        str(team_id): (role, custom_permissions)
+        for team_id, role, custom_permissions in TeamMembership.objects.filter(
+            user_id=user.pk
+        ).values_list('team_id', 'role', 'custom_permissions')
+    }
+
+
+def get_workspace_roles(user):
+    """
+    Map of workspace ID to the user's role for every workspace they own
+    or belong to, cached in a shared cache until a membership or
+    ownership change
+    """
+    shared = roles_cache()
+    if shared is None:
+        return _load_workspace_roles(user)
+    key = _workspace_roles_key(user.pk)
+    roles = shared.get(key)
+    if roles is None:
+        roles = _load_workspace_roles(user)
+        shared.set(key, roles, settings.MEMBERSHIP_CACHE_TIMEOUT)
+    return roles
+
+
+def get_team_roles(user):
+    """
+    Map of team ID to (role, custom_permissions) for the user's teams,
+    cached like get_workspace_roles
+    """
+    shared = roles_cache()
+    if shared is None:
+        return _load_team_roles(user)
+    key = _team_roles_key(user.pk)
+    roles = shared.get(key)
+    if roles is None:
+        roles = _load_team_roles(user)
+        shared.set(key, roles, settings.MEMBERSHIP_CACHE_TIMEOUT)
+    return roles
+
+
+def get_workspace_ids(user):
+    return set(get_workspace_roles(user))
+
+
+def _invalidate(keys):
+    # Delete now for reads later in this transaction, and again after
+    # commit in case another request cached the old roles meanwhile
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def invalidate_workspace_roles(*user_ids):
+    _invalidate([_workspace_roles_key(user_id) for user_id in user_ids if user_id])
+
+
+def invalidate_team_roles(*user_ids):
+    _invalidate([_team_roles_key(user_id) for user_id in user_ids if user_id])
+
+
+def _pk(obj):
+    return str(getattr(obj, 'pk', obj))
+
+
+class MembershipResolver:
+    """
+    A user's team and workspace roles, loaded at most once per request
+    and shared by permission classes, views and serializers. Across
+    requests roles are only reused from a shared cache (see roles_cache).
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.user_id = user.pk
+        self._team_roles = None
+        self._workspace_roles = None
+
+    @property
+    def team_roles(self):
+        if self._team_roles is None:
+            self._team_roles = get_team_roles(self.user)
+        return self._team_roles
+
+    @property
+    def workspace_roles(self):
+        if self._workspace_roles is None:
+            self._workspace_roles = get_workspace_roles(self.user)
+        return self._workspace_roles
+
+    def team_role(self, team):
+        entry = self.team_roles.get(_pk(team))
+        return entry[0] if entry else None
+
+    def is_team_member(self, team):
+        return _pk(team) in self.team_roles
+
+    def is_team_admin(self, team):
+        return self.team_role(team) == 'admin'
+
+    def has_team_permission(self, team, permission):
+        """Same rules as TeamMembership.has_permission, without a query"""
+        entry = self.team_roles.get(_pk(team))
+        if not entry:
+            return False
+        role, custom_permissions = entry
+        return (
+            permission in TeamMembership.ROLE_PERMISSIONS.get(role, [])
+            or permission in custom_permissions
+        )
+
+    def workspace_role(self, workspace):
+        return self.workspace_roles.get(_pk(workspace))
+
+    def is_workspace_member(self, workspace):
+        return _pk(workspace) in self.workspace_roles
+
+
+def get_membership_resolver(request):
+    """Return the resolver attached to ``request``, creating it on first use"""
+    resolver = getattr(request, '_membership_resolver', None)
+    # By pk: comparing instances would load a lazily resolved user
+    if resolver is None or resolver.user_id != request.user.pk:
+        resolver = MembershipResolver(request.user)
+        request._membership_resolver = resolver
+    return resolver
+
+
+def _count_subquery(queryset):
+    """Correlated COUNT(*) that avoids multiplying rows across joins"""
+    counts = queryset.order_by().values('workspace').annotate(total=Count('id')).values('total')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def user_workspaces(user, workspace_ids=None):
+    """
+    Workspaces visible to ``user`` with member/team counts annotated,
+    in a single query
+    """
+    if workspace_ids is None:
+        workspace_ids = get_workspace_ids(user)
+    return Workspace.objects.filter(
+        id__in=workspace_ids
+    ).annotate(
+        member_count=_count_subquery(
+            WorkspaceMembership.objects.filter(workspace=OuterRef('pk'))
+        ),
+        team_count=_count_subquery(
+            Team.objects.filter(workspace=OuterRef('pk'))
+        )
+    )
@@ -0,0 +1,70 @@
+# Generated by Django 5.0.6 on 2026-10-19 08:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        (
+            "authentication",
+            "0002_workspacemembership_workspace_team_workspace_and_more",
+        ),
+        ("contenttypes", "0002_remove_content_type_name"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="securitylog",
+            index=models.Index(
+                fields=["created_at", "id"], name="authenticat_created_2a2c08_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="securitylog",
+            index=models.Index(
+                fields=["user", "created_at", "id"],
+                name="authenticat_user_id_050942_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="securitylog",
+            index=models.Index(
+                fields=["severity", "is_resolved", "created_at", "id"],
+                name="authenticat_severit_523336_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="teamactivity",
+            index=models.Index(
+                fields=["created_at", "id"], name="authenticat_created_5001e9_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="teamactivity",
+            index=models.Index(
+                fields=["user", "created_at", "id"],
+                name="authenticat_user_id_3232ac_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                fields=["created_at", "id"], name="authenticat_created_1c499d_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="useractivity",
+            index=models.Index(
+                fields=["created_at", "id"], name="authenticat_created_3fdb15_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="useractivity",
+            index=models.Index(
+                fields=["user", "created_at", "id"],
+                name="authenticat_user_id_82837b_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.0.6 on 2026-10-19 08:44
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentication", "0003_cursor_pagination_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AnalyticsSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("is_active", models.BooleanField(default=True)),
+                ("name", models.CharField(max_length=50, unique=True)),
+                ("data", models.JSONField(default=dict)),
+                ("computed_at", models.DateTimeField()),
+            ],
+            options={
+                "verbose_name": "analytics snapshot",
+                "verbose_name_plural": "analytics snapshots",
+            },
+        ),
+        migrations.CreateModel(
+            name="DailyMetric",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("is_active", models.BooleanField(default=True)),
+                ("date", models.DateField()),
+                (
+                    "metric",
+                    models.CharField(
+                        choices=[
+                            ("new_users", "New users"),
+                            ("plan_upgrades", "Plan upgrades"),
+                            ("user_activities", "User activities"),
+                            ("critical_security_logs", "Critical security logs"),
+                        ],
+                        max_length=50,
+                    ),
+                ),
+                ("value", models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "daily metric",
+                "verbose_name_plural": "daily metrics",
+                "ordering": ["-date"],
+                "unique_together": {("date", "metric")},
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.6 on 2026-10-19 08:51
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def backfill_key_hashes(apps, schema_editor):
+    APIKey = apps.get_model("authentication", "APIKey")
+    keys = list(APIKey.objects.filter(key_hash__isnull=True).only("id", "key"))
+    for api_key in keys:
+        api_key.key_hash = hashlib.sha256(api_key.key.encode("utf-8")).hexdigest()
+    APIKey.objects.bulk_update(keys, ["key_hash"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentication", "0005_email_outbox"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="apikey",
+            name="key_hash",
+            field=models.CharField(
+                editable=False,
+                help_text="SHA-256 of the key, used by API key authentication",
+                max_length=64,
+                null=True,
+                unique=True,
+            ),
+        ),
+        migrations.RunPython(backfill_key_hashes, migrations.RunPython.noop),
+    ]
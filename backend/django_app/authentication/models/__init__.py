@@ -3,4 +3,6 @@ from .profile import UserProfile
 from .team import Team, TeamMembership
 from .security import APIKey, LoginHistory
 from .activity import UserActivity, TeamActivity, SecurityLog
-from .workspace import Workspace, WorkspaceMembership
\ No newline at end of file
+from .workspace import Workspace, WorkspaceMembership
+from .analytics import DailyMetric, AnalyticsSnapshot
+from .outbox import EmailOutbox
@@ -36,6 +36,9 @@ class BaseActivity(BaseModel):
         indexes = [
             models.Index(fields=['user', 'action', 'created_at']),
             models.Index(fields=['content_type', 'object_id']),
+            # Keyset pagination on (created_at, id)
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['user', 'created_at', 'id']),
         ]
 
 class UserActivity(BaseActivity):
@@ -79,6 +82,9 @@ class SecurityLog(BaseActivity):
     class Meta(BaseActivity.Meta):
         verbose_name = _('security log')
         verbose_name_plural = _('security logs')
+        indexes = BaseActivity.Meta.indexes + [
+            models.Index(fields=['severity', 'is_resolved', 'created_at', 'id']),
+        ]
 
     def __str__(self):
         return f"{self.severity} - {self.action} - {self.created_at}"
\ No newline at end of file
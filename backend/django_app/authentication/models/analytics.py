@@ -0,0 +1,72 @@
+from django.db import models, transaction, IntegrityError
+from django.db.models import F, Sum
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from datetime import timedelta
+from .base import BaseModel
+
+class DailyMetric(BaseModel):
+    """
+    Per-day counters maintained incrementally by signals and
+    reconciled by the periodic analytics job
+    """
+    NEW_USERS = 'new_users'
+    PLAN_UPGRADES = 'plan_upgrades'
+    USER_ACTIVITIES = 'user_activities'
+    CRITICAL_SECURITY_LOGS = 'critical_security_logs'
+
+    METRIC_CHOICES = [
+        (NEW_USERS, _('New users')),
+        (PLAN_UPGRADES, _('Plan upgrades')),
+        (USER_ACTIVITIES, _('User activities')),
+        (CRITICAL_SECURITY_LOGS, _('Critical security logs')),
+    ]
+
+    date = models.DateField()
+    metric = models.CharField(max_length=50, choices=METRIC_CHOICES)
+    value = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-date']
+        unique_together = ('date', 'metric')
+        verbose_name = _('daily metric')
+        verbose_name_plural = _('daily metrics')
+
+    def __str__(self):
+        return f"{self.date} - {self.metric}: {self.value}"
+
+    @classmethod
+    def increment(cls, metric, amount=1, date=None):
+        """Atomically add to a counter, creating the row on first use"""
+        date = date or timezone.now().date()
+        if cls.objects.filter(date=date, metric=metric).update(value=F('value') + amount):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(date=date, metric=metric, value=amount)
+        except IntegrityError:
+            # Another writer created the row first
+            cls.objects.filter(date=date, metric=metric).update(value=F('value') + amount)
+
+    @classmethod
+    def window_total(cls, metric, days):
+        """Sum of a counter over the last ``days`` days, today included"""
+        start = timezone.now().date() - timedelta(days=days - 1)
+        total = cls.objects.filter(
+            metric=metric,
+            date__gte=start
+        ).aggregate(total=Sum('value'))['total']
+        return total or 0
+
+class AnalyticsSnapshot(BaseModel):
+    """Precomputed admin analytics payloads served by the analytics endpoints"""
+    name = models.CharField(max_length=50, unique=True)
+    data = models.JSONField(default=dict)
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = _('analytics snapshot')
+        verbose_name_plural = _('analytics snapshots')
+
+    def __str__(self):
+        return f"{self.name} @ {self.computed_at}"
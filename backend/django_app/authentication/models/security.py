@@ -3,11 +3,16 @@ from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError
 from .base import BaseModel
 from datetime import timezone
+import hashlib
 import secrets
 
 def generate_api_key():
     return secrets.token_urlsafe(32)
 
+def hash_api_key(key):
+    """SHA-256 digest used to look keys up without comparing plaintext"""
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
 class APIKey(BaseModel):
     user = models.ForeignKey(
         'User', 
@@ -20,6 +25,13 @@ class APIKey(BaseModel):
         unique=True,
         default=generate_api_key
     )
+    key_hash = models.CharField(
+        max_length=64,
+        unique=True,
+        null=True,
+        editable=False,
+        help_text=_("SHA-256 of the key, used by API key authentication")
+    )
     scopes = models.JSONField(
         default=list,
         help_text=_("List of allowed scopes for this API key")
@@ -41,6 +53,13 @@ class APIKey(BaseModel):
             models.Index(fields=['key']),
         ]
 
+    def save(self, *args, **kwargs):
+        self.key_hash = hash_api_key(self.key)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'key' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'key_hash'}
+        super().save(*args, **kwargs)
+
     def clean(self):
         if self.expires_at and self.expires_at < timezone.now():
             raise ValidationError(_("Expiration date cannot be in the past"))
@@ -128,9 +147,11 @@ class LoginHistory(BaseModel):
                          location=None, device_type=None, login_method='email', 
                          failure_reason=None):
         """
-        Helper method to create a login history entry
+        Helper method to record a login history entry. The row is written
+        by the batched audit writer, not inline.
         """
-        return cls.objects.create(
+        from ..audit import log_login_attempt  # Import here to avoid circular imports
+        return log_login_attempt(
             user=user,
             status=status,
             ip_address=ip_address,
@@ -144,14 +165,11 @@ class LoginHistory(BaseModel):
     @classmethod
     def get_recent_failures(cls, user, minutes=30):
         """
-        Get recent failed login attempts for a user
+        Get recent failed login attempts for a user, from the Redis login
+        throttle counters rather than a scan of this table
         """
-        cutoff_time = timezone.now() - timezone.timedelta(minutes=minutes)
-        return cls.objects.filter(
-            user=user,
-            status='failed',
-            created_at__gte=cutoff_time
-        ).count()
+        from ..throttling import login_throttle  # Import here to avoid circular imports
+        return login_throttle.recent_failures(minutes * 60, email=user.email)
 
     @classmethod
     def is_ip_suspicious(cls, ip_address, timeframe_minutes=30, threshold=10):
@@ -161,11 +179,11 @@ class LoginHistory(BaseModel):
         if not ip_address:
             return False
             
-        cutoff_time = timezone.now() - timezone.timedelta(minutes=timeframe_minutes)
-        failed_attempts = cls.objects.filter(
+        from ..throttling import login_throttle  # Import here to avoid circular imports
+        failed_attempts = login_throttle.recent_failures(
+            timeframe_minutes * 60,
             ip_address=ip_address,
-            status='failed',
-            created_at__gte=cutoff_time
-        ).count()
+            scope='ip'
+        )
         
-        return failed_attempts >= threshold
\ No newline at end of file
+        return failed_attempts >= threshold
@@ -4,7 +4,6 @@ from django.utils.translation import gettext_lazy as _
 from .base import BaseModel
 from .security import LoginHistory
 from django.db import models
-from django.core.mail import send_mail
 from django.utils import timezone
 from datetime import timedelta
 import secrets
@@ -112,6 +111,7 @@ class User(AbstractUser, BaseModel):
         indexes = [
             models.Index(fields=['email', 'is_active']),
             models.Index(fields=['created_at']),
+            models.Index(fields=['created_at', 'id']),
         ]
 
     def __str__(self):
@@ -127,15 +127,14 @@ class User(AbstractUser, BaseModel):
     def get_short_name(self):
         return self.first_name
 
-    def increment_failed_login(self):
-        self.failed_login_attempts += 1
-        self.last_failed_login = timezone.now()
-        self.save()
+    def increment_failed_login(self, ip_address=None):
+        """Count a failed login in the Redis login throttle (no row write)"""
+        from ..throttling import login_throttle  # Import here to avoid circular imports
+        login_throttle.record_failure(self.email, ip_address)
 
     def reset_failed_login(self):
-        self.failed_login_attempts = 0
-        self.last_failed_login = None
-        self.save()
+        from ..throttling import login_throttle  # Import here to avoid circular imports
+        login_throttle.reset(self.email)
         
     def log_login_success(self, ip_address=None, user_agent=None, location=None, 
                          device_type=None, login_method='email'):
@@ -146,8 +145,7 @@ class User(AbstractUser, BaseModel):
         self.failed_login_attempts = 0
         self.save()
         
-        from .security import LoginHistory  # Import here to avoid circular imports
-        return LoginHistory.objects.create(
+        return LoginHistory.log_login_attempt(
             user=self,
             status='success',
             ip_address=ip_address,
@@ -164,8 +162,7 @@ class User(AbstractUser, BaseModel):
         self.last_failed_login = timezone.now()  # Using Django's timezone
         self.save()
         
-        from .security import LoginHistory  # Import here to avoid circular imports
-        return LoginHistory.objects.create(
+        return LoginHistory.log_login_attempt(
             user=self,
             status='failed',
             ip_address=ip_address,
@@ -177,16 +174,9 @@ class User(AbstractUser, BaseModel):
         )
 
     def is_login_allowed(self):
-        """Check if login is allowed based on failed attempts"""
-        if self.failed_login_attempts >= 5:  # Can be moved to settings
-            if self.last_failed_login:
-                blocking_period = timezone.timedelta(minutes=30)  # Can be moved to settings
-                if timezone.now() - self.last_failed_login < blocking_period:
-                    return False
-                # Reset counter if blocking period has passed
-                self.failed_login_attempts = 0
-                self.save()
-        return True
+        """Check if login is allowed based on recent failed attempts"""
+        from ..throttling import login_throttle  # Import here to avoid circular imports
+        return not login_throttle.check(email=self.email)
     
     def generate_verification_token(self):
         """Generate a new verification token"""
@@ -228,23 +218,23 @@ class User(AbstractUser, BaseModel):
             If you didn't create an account, you can safely ignore this email.
             """
 
-            logger.info(f"Sending verification email to {self.email}")
+            logger.info(f"Queueing verification email to {self.email}")
             logger.debug(f"Verification URL: {verification_url}")
             
-            send_mail(
+            from ..outbox import enqueue_email  # Import here to avoid circular imports
+            enqueue_email(
                 subject=email_subject,
                 message=email_body,
                 from_email=settings.DEFAULT_FROM_EMAIL or 'noreply@example.com',
                 recipient_list=[self.email],
-                fail_silently=False
+                dedup_key=f'email_verification:{self.email_verification_token}'
             )
-
-            logger.info(f"Verification email sent successfully to {self.email}")
             
             # Log success in security log
-            SecurityLog.objects.create(
+            from ..audit import log_security_event  # Import here to avoid circular imports
+            log_security_event(
                 user=self,
-                action='verification_email_sent',
+                action='verification_email_queued',
                 details={
                     'email': self.email,
                     'verification_url': verification_url
@@ -252,9 +242,10 @@ class User(AbstractUser, BaseModel):
             )
 
         except Exception as e:
-            logger.error(f"Failed to send verification email to {self.email}: {str(e)}")
+            logger.error(f"Failed to queue verification email to {self.email}: {str(e)}")
             # Log failure in security log
-            SecurityLog.objects.create(
+            from ..audit import log_security_event  # Import here to avoid circular imports
+            log_security_event(
                 user=self,
                 action='verification_email_failed',
                 details={
@@ -0,0 +1,156 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_DISPATCH_KEY = 'authentication:email-outbox:dispatch'
+
+
+def _dispatch_worker():
+    """
+    Schedule the outbox task once per dispatch window, so a burst of
+    enqueued emails is delivered by one worker run
+    """
+    delay = settings.EMAIL_OUTBOX_DISPATCH_DELAY
+    if not cache.add(OUTBOX_DISPATCH_KEY, True, timeout=delay):
+        return
+    try:
+        from tasks.email_tasks import send_outbox_emails
+        send_outbox_emails.apply_async(countdown=delay)
+    except Exception as e:
+        # The periodic sweep delivers anything left behind
+        logger.warning(f"Failed to dispatch email outbox worker: {str(e)}")
+
+
+def enqueue_email(subject, message, recipient_list, from_email=None, dedup_key=None):
+    """
+    Store an email in the outbox; it is sent by a Celery worker once the
+    current transaction commits. Returns None when dedup_key was already used.
+    """
+    email = EmailOutbox(
+        subject=subject,
+        body=message,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipients=list(recipient_list),
+        dedup_key=dedup_key
+    )
+    try:
+        with transaction.atomic():
+            email.save()
+    except IntegrityError:
+        logger.info(f"Skipping duplicate email {dedup_key}")
+        return None
+    transaction.on_commit(_dispatch_worker)
+    return email
+
+
+def _claim_batch(batch_size):
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True).filter(
+                status=EmailOutbox.PENDING,
+                send_after__lte=now
+            ).order_by('send_after')[:batch_size]
+        )
+        EmailOutbox.objects.filter(id__in=[email.id for email in batch]).update(
+            status=EmailOutbox.SENDING,
+            claimed_at=now
+        )
+    return batch
+
+
+def _mark_failed(email, error):
+    """Back off exponentially, giving up after EMAIL_OUTBOX_MAX_ATTEMPTS"""
+    attempts = email.attempts + 1
+    if attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        status = EmailOutbox.FAILED
+        logger.error(f"Giving up on email {email.id} after {attempts} attempts: {error}")
+    else:
+        status = EmailOutbox.PENDING
+    delay = settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    EmailOutbox.objects.filter(id=email.id).update(
+        status=status,
+        attempts=attempts,
+        last_error=str(error),
+        send_after=timezone.now() + timedelta(seconds=delay),
+        claimed_at=None
+    )
+
+
+def _send_batch(batch):
+    """Send a claimed batch over a single SMTP connection"""
+    sent = 0
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        for email in batch:
+            _mark_failed(email, e)
+        return sent
+
+    try:
+        for email in batch:
+            try:
+                EmailMessage(
+                    subject=email.subject,
+                    body=email.body,
+                    from_email=email.from_email,
+                    to=email.recipients,
+                    connection=connection
+                ).send()
+            except Exception as e:
+                _mark_failed(email, e)
+                continue
+            # Drop the body once delivered; it may carry reset/verification links
+            EmailOutbox.objects.filter(id=email.id).update(
+                status=EmailOutbox.SENT,
+                body='',
+                attempts=email.attempts + 1,
+                sent_at=timezone.now(),
+                claimed_at=None
+            )
+            sent += 1
+    finally:
+        connection.close()
+    return sent
+
+
+def release_stale_claims():
+    """Return emails claimed by a worker that died mid-batch to the queue"""
+    cutoff = timezone.now() - timedelta(seconds=settings.EMAIL_OUTBOX_STALE_AFTER)
+    return EmailOutbox.objects.filter(
+        status=EmailOutbox.SENDING,
+        claimed_at__lt=cutoff
+    ).update(status=EmailOutbox.PENDING, claimed_at=None)
+
+
+def purge_finished_emails():
+    """Delete sent and abandoned emails older than EMAIL_OUTBOX_RETENTION"""
+    cutoff = timezone.now() - timedelta(seconds=settings.EMAIL_OUTBOX_RETENTION)
+    deleted, _ = EmailOutbox.objects.filter(
+        status__in=[EmailOutbox.SENT, EmailOutbox.FAILED],
+        created_at__lt=cutoff
+    ).delete()
+    return deleted
+
+
+def send_pending_emails(batch_size=None):
+    """Deliver due outbox emails in batches until none are left"""
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    result = {'sent': 0, 'claimed': 0}
+    while True:
+        batch = _claim_batch(batch_size)
+        if not batch:
+            break
+        result['claimed'] += len(batch)
+        result['sent'] += _send_batch(batch)
+    return result
@@ -1,5 +1,5 @@
 from rest_framework import permissions
-from .models.team import TeamMembership
+from .membership import get_membership_resolver
 
 class IsTeamAdmin(permissions.BasePermission):
     """Custom permission to only allow team admins to perform certain actions"""
@@ -11,14 +11,7 @@ class IsTeamAdmin(permissions.BasePermission):
         if request.user.is_superuser:
             return True
             
-        try:
-            membership = TeamMembership.objects.get(
-                team=obj,
-                user=request.user
-            )
-            return membership.has_permission('manage_team')
-        except TeamMembership.DoesNotExist:
-            return False
+        return get_membership_resolver(request).has_team_permission(obj, 'manage_team')
 
 class IsTeamMember(permissions.BasePermission):
     """Permission to only allow team members to access"""
@@ -30,18 +23,10 @@ class IsTeamMember(permissions.BasePermission):
         if request.user.is_superuser:
             return True
             
-        try:
-            membership = TeamMembership.objects.get(
-                team=obj,
-                user=request.user
-            )
-            
-            if request.method in permissions.SAFE_METHODS:
-                return membership.has_permission('view_workflows')
-            return membership.has_permission('edit_workflows')
-            
-        except TeamMembership.DoesNotExist:
-            return False
+        resolver = get_membership_resolver(request)
+        if request.method in permissions.SAFE_METHODS:
+            return resolver.has_team_permission(obj, 'view_workflows')
+        return resolver.has_team_permission(obj, 'edit_workflows')
 
 class IsAPIKeyOwner(permissions.BasePermission):
     """Permission to only allow owners of an API key to access it"""
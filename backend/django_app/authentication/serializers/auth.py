@@ -10,6 +10,7 @@ from dj_rest_auth.registration.serializers import RegisterSerializer as DefaultR
 from .profile import UserProfileSerializer
 from datetime import timedelta
 from ..models import UserProfile
+from ..throttling import client_ip
 
 User = get_user_model()
 
@@ -117,8 +118,7 @@ class EmailTokenObtainPairSerializer(TokenObtainPairSerializer):
     def get_client_info(self, request):
         """Get client session information"""
         return {
-            'ip_address': request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')[0] 
-                        or request.META.get('REMOTE_ADDR'),
+            'ip_address': client_ip(request),
             'user_agent': request.META.get('HTTP_USER_AGENT', ''),
             'device_type': self.get_device_type(request),
             'location': self._get_location_from_ip(request)
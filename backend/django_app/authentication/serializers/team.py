@@ -46,6 +46,8 @@ class TeamSerializer(TimestampedSerializer):
         }
     
     def get_members_count(self, obj):
+        if hasattr(obj, 'members_total'):
+            return obj.members_total
         return obj.members.count()
 
     def validate(self, attrs):
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from ..models.workspace import Workspace, WorkspaceMembership
+from ..membership import get_membership_resolver
 
 class WorkspaceSerializer(serializers.ModelSerializer):
     role = serializers.SerializerMethodField()
@@ -18,17 +19,16 @@ class WorkspaceSerializer(serializers.ModelSerializer):
         if not request or not request.user:
             return None
             
-        if obj.owner == request.user:
+        if obj.owner_id == request.user.id:
             return 'admin'
-            
-        membership = obj.workspace_members.filter(user=request.user).first()
-        return membership.role if membership else None
+
+        return get_membership_resolver(request).workspace_role(obj)
 
     def get_is_owner(self, obj):
         request = self.context.get('request')
         if not request or not request.user:
             return False
-        return obj.owner == request.user
+        return obj.owner_id == request.user.id
 
 class WorkspaceMemberSerializer(serializers.ModelSerializer):
     class Meta:
@@ -1,11 +1,20 @@
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
-from django.core.mail import send_mail
-from django.conf import settings
 from django.utils import timezone
 from datetime import datetime
-from .models import TeamMembership, User, UserProfile, SecurityLog
+from .models import (
+    TeamMembership, User, UserProfile, SecurityLog, UserActivity, DailyMetric,
+    Workspace, WorkspaceMembership, APIKey
+)
+from .audit import log_security_event
+from .outbox import enqueue_email
+from .membership import invalidate_workspace_roles, invalidate_team_roles
+from .api_keys import api_key_cache
+from .jwt import publish_user_claims, retract_user_claims
 from django.db import transaction
+import logging
+
+logger = logging.getLogger(__name__)
 
 @receiver(post_save, sender=User)
 def create_or_update_user_profile(sender, instance, created, **kwargs):
@@ -29,7 +38,7 @@ def create_or_update_user_profile(sender, instance, created, **kwargs):
         )
                 
                 # Log user creation
-                SecurityLog.objects.create(
+                log_security_event(
                     user=instance,
                     action='user_created',
                     details={
@@ -51,12 +60,11 @@ def handle_team_membership(sender, instance, created, **kwargs):
         with transaction.atomic():
             if created:
                 # Send email notification
-                send_mail(
+                enqueue_email(
                     subject=f'Added to team: {instance.team.name}',
                     message=f'You have been added to the team {instance.team.name} as {instance.role}',
-                    from_email=settings.DEFAULT_FROM_EMAIL,
                     recipient_list=[instance.user.email],
-                    fail_silently=True,
+                    dedup_key=f'team_joined:{instance.id}'
                 )
                 
                 # Update user's profile stats
@@ -72,7 +80,7 @@ def handle_team_membership(sender, instance, created, **kwargs):
                     instance.user.profile.save()
                 
                 # Log membership creation
-                SecurityLog.objects.create(
+                log_security_event(
                     user=instance.user,
                     action='team_joined',
                     details={
@@ -90,12 +98,11 @@ def handle_team_membership_removal(sender, instance, **kwargs):
     try:
         with transaction.atomic():
             # Send notification
-            send_mail(
+            enqueue_email(
                 subject=f'Removed from team: {instance.team.name}',
                 message=f'You have been removed from the team {instance.team.name}',
-                from_email=settings.DEFAULT_FROM_EMAIL,
                 recipient_list=[instance.user.email],
-                fail_silently=True,
+                dedup_key=f'team_left:{instance.id}'
             )
             
             # Update user's profile stats
@@ -110,7 +117,7 @@ def handle_team_membership_removal(sender, instance, **kwargs):
                 instance.user.profile.save()
             
             # Log membership removal
-            SecurityLog.objects.create(
+            log_security_event(
                 user=instance.user,
                 action='team_left',
                 details={
@@ -120,4 +127,81 @@ def handle_team_membership_removal(sender, instance, **kwargs):
                 }
             )
     except Exception as e:
-        print(f"Error in handle_team_membership_removal: {str(e)}")
\ No newline at end of file
+        print(f"Error in handle_team_membership_removal: {str(e)}")
+
+def _increment_metric(metric):
+    """Bump an analytics counter without breaking the surrounding transaction"""
+    try:
+        with transaction.atomic():
+            DailyMetric.increment(metric)
+    except Exception as e:
+        logger.warning(f"Failed to increment {metric} metric: {str(e)}")
+
+@receiver(post_save, sender=User)
+def track_user_metrics(sender, instance, created, **kwargs):
+    """Count new signups for admin analytics"""
+    if created:
+        _increment_metric(DailyMetric.NEW_USERS)
+
+@receiver(post_save, sender=UserActivity)
+def track_activity_metrics(sender, instance, created, **kwargs):
+    """Count user activities and plan upgrades for admin analytics"""
+    if not created:
+        return
+    _increment_metric(DailyMetric.USER_ACTIVITIES)
+    if instance.action == 'plan_upgraded':
+        _increment_metric(DailyMetric.PLAN_UPGRADES)
+
+@receiver(post_save, sender=SecurityLog)
+def track_security_metrics(sender, instance, created, **kwargs):
+    """Count critical security events for admin analytics"""
+    if created and instance.severity == 'critical':
+        _increment_metric(DailyMetric.CRITICAL_SECURITY_LOGS)
+
+@receiver([post_save, post_delete], sender=WorkspaceMembership)
+def invalidate_member_workspaces(sender, instance, **kwargs):
+    """Drop the cached workspace roles of a user whose membership changed"""
+    invalidate_workspace_roles(instance.user_id)
+
+@receiver(pre_save, sender=Workspace)
+def remember_workspace_owner(sender, instance, **kwargs):
+    instance._previous_owner_id = (
+        Workspace.objects.filter(pk=instance.pk).values_list('owner_id', flat=True).first()
+        if instance.pk else None
+    )
+
+@receiver([post_save, post_delete], sender=Workspace)
+def invalidate_owner_workspaces(sender, instance, **kwargs):
+    """Drop the cached workspace roles of a workspace owner, and of the previous one on transfer"""
+    invalidate_workspace_roles(instance.owner_id, getattr(instance, '_previous_owner_id', None))
+
+@receiver([post_save, post_delete], sender=TeamMembership)
+def invalidate_member_teams(sender, instance, **kwargs):
+    """Drop the cached team roles of a user whose membership changed"""
+    invalidate_team_roles(instance.user_id)
+
+@receiver(pre_save, sender=APIKey)
+def remember_api_key(sender, instance, **kwargs):
+    instance._previous_key = (
+        APIKey.objects.filter(pk=instance.pk).values_list('key', flat=True).first()
+        if instance.pk else None
+    )
+
+@receiver([post_save, post_delete], sender=APIKey)
+def invalidate_cached_api_key(sender, instance, **kwargs):
+    """Forget a changed or revoked key in this process's auth cache, and the old key on rotation"""
+    api_key_cache.invalidate(instance.key)
+    previous_key = getattr(instance, '_previous_key', None)
+    if previous_key and previous_key != instance.key:
+        api_key_cache.invalidate(previous_key)
+
+@receiver(post_save, sender=User)
+def share_user_claims(sender, instance, **kwargs):
+    """Keep the claims the FastAPI service authorizes with up to date"""
+    transaction.on_commit(lambda: publish_user_claims(instance))
+
+@receiver(post_delete, sender=User)
+def retract_deleted_user_claims(sender, instance, **kwargs):
+    """Deleted users must not keep authenticating against published claims"""
+    user_id = instance.pk
+    transaction.on_commit(lambda: retract_user_claims(user_id))
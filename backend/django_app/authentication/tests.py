@@ -1,8 +1,36 @@
-from django.test import TestCase
+import gzip
+import json
+import os
+import tempfile
+import time
+from unittest import mock
+from datetime import timedelta
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache
+from django.http import HttpRequest
+from django.test import TestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework.test import APITestCase
-from rest_framework import status
-from .models import User, UserProfile
+from rest_framework import exceptions, status
+from .models import (
+    User, UserProfile, UserActivity, SecurityLog, LoginHistory, DailyMetric, EmailOutbox,
+    Workspace, WorkspaceMembership, Team, TeamMembership, APIKey
+)
+from .models.security import generate_api_key
+from .audit import audit_log_writer, log_security_event
+from .exports import cleanup_exports, create_export_token, read_export_token
+from .outbox import enqueue_email, purge_finished_emails, send_pending_emails
+from .membership import MembershipResolver, get_membership_resolver, get_workspace_roles
+from .api_keys import APIKeyAuthentication, api_key_cache, last_used_tracker
+from .bulk import run_bulk_operation
+from .jwt import CachedJWTAuthentication
+from jose import jwt as jose_jwt
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from shared.auth.claims import UserClaimsResolver
+from .throttling import client_subnet, login_throttle
 
 class AuthenticationTests(APITestCase):
     def setUp(self):
@@ -63,4 +91,531 @@ class UserLimitsTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn('limits', response.data)
         self.assertIn('workflows', response.data['limits'])
-        self.assertIn('api_keys', response.data['limits'])
\ No newline at end of file
+        self.assertIn('api_keys', response.data['limits'])
+
+class ActivityExportTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            email='admin@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.admin)
+        UserActivity.objects.create(user=self.admin, action='login', details={'ok': True})
+        self.url = reverse('admin-activity-export-logs')
+
+    def test_csv_export_is_streamed(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'id,user_email,action,details,ip_address,created_at')
+        self.assertIn('admin@example.com', lines[1])
+
+    def test_gzip_ndjson_export(self):
+        response = self.client.get(self.url, {'export_format': 'ndjson', 'compress': 'true'})
+        content = gzip.decompress(b''.join(response.streaming_content)).decode()
+        self.assertEqual(json.loads(content.splitlines()[0])['action'], 'login')
+
+    def test_failed_background_export_is_reported(self):
+        from tasks.export_tasks import export_activity_logs
+
+        with tempfile.TemporaryDirectory() as export_dir, override_settings(ACTIVITY_EXPORT_DIR=export_dir):
+            token = create_export_token('csv')
+            filename = read_export_token(token)['file']
+            url = reverse('admin-activity-download-export')
+            self.assertEqual(self.client.get(url, {'token': token}).status_code, status.HTTP_202_ACCEPTED)
+
+            # The last allowed attempt
+            export_activity_logs.push_request(retries=2)
+            self.addCleanup(export_activity_logs.pop_request)
+            with mock.patch('tasks.export_tasks.write_export', side_effect=OSError('disk full')):
+                with self.assertRaises(OSError):
+                    export_activity_logs.run(filename, 'csv')
+
+            response = self.client.get(url, {'token': token})
+            self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+            self.assertEqual(response.data, {'status': 'failed', 'error': 'disk full'})
+
+    def test_expired_export_files_are_removed(self):
+        with tempfile.TemporaryDirectory() as export_dir, override_settings(ACTIVITY_EXPORT_DIR=export_dir):
+            for name in ('old.csv', 'old.csv.partial', 'new.csv'):
+                open(os.path.join(export_dir, name), 'w').close()
+            day_ago = time.time() - 60 * 60 * 25
+            for name in ('old.csv', 'old.csv.partial'):
+                os.utime(os.path.join(export_dir, name), (day_ago, day_ago))
+            self.assertEqual(cleanup_exports(), 2)
+            self.assertEqual(os.listdir(export_dir), ['new.csv'])
+
+
+class AdminAnalyticsTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            email='admin@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.admin)
+
+    def test_user_metrics_served_from_rollups(self):
+        User.objects.create_user(email='new@example.com', password='testpass123')
+        self.assertEqual(
+            DailyMetric.window_total(DailyMetric.NEW_USERS, 7), 2
+        )
+        response = self.client.get(reverse('admin-analytics-user-metrics'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['last_7_days']['new_users'], 2)
+        self.assertIn('generated_at', response.data)
+
+
+class AdminBulkUserTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            email='admin@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.admin)
+        self.users = [
+            User.objects.create_user(email=f'user{index}@example.com', password='testpass123')
+            for index in range(3)
+        ]
+
+    def test_bulk_plan_update(self):
+        response = self.client.post(reverse('admin-user-bulk'), {
+            'operation': 'update_plan',
+            'user_ids': [str(user.id) for user in self.users],
+            'data': {'plan_type': 'premium'}
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['processed'], 3)
+        self.assertEqual(
+            UserProfile.objects.filter(plan_type='premium').count(), 3
+        )
+        self.assertEqual(
+            SecurityLog.objects.filter(action='plan_updated').count(), 3
+        )
+
+    def test_bulk_rejects_unknown_operation(self):
+        response = self.client.post(reverse('admin-user-bulk'), {
+            'operation': 'delete',
+            'user_ids': [str(self.users[0].id)]
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(AUDIT_LOG_ASYNC=True, AUDIT_LOG_FLUSH_INTERVAL=3600)
+class AuditLogTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='audit@example.com',
+            password='testpass123'
+        )
+        # Stop the writer before the test database goes away
+        self.addCleanup(audit_log_writer.close)
+
+    def test_events_are_written_in_batches(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            log_security_event(action='login_success', user=self.user)
+            LoginHistory.log_login_attempt(user=self.user, status='success')
+        self.assertFalse(SecurityLog.objects.filter(action='login_success').exists())
+
+        audit_log_writer.flush()
+        self.assertTrue(SecurityLog.objects.filter(action='login_success').exists())
+        self.assertEqual(LoginHistory.objects.filter(user=self.user).count(), 1)
+
+    def test_close_stops_writer_and_writes_buffer(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            log_security_event(action='password_changed', user=self.user)
+        writer = audit_log_writer._thread
+        self.assertTrue(writer.is_alive())
+
+        audit_log_writer.close()
+        self.assertFalse(writer.is_alive())
+        self.assertTrue(SecurityLog.objects.filter(action='password_changed').exists())
+
+    @override_settings(AUDIT_LOG_ASYNC=False)
+    def test_sync_mode_starts_no_writer(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            log_security_event(action='login_success', user=self.user)
+        self.assertIsNone(audit_log_writer._thread)
+        self.assertTrue(SecurityLog.objects.filter(action='login_success').exists())
+
+    def test_critical_events_are_written_inline(self):
+        log_security_event(action='suspicious_login', user=self.user, severity='critical')
+        self.assertTrue(SecurityLog.objects.filter(action='suspicious_login').exists())
+
+
+class EmailOutboxTests(TestCase):
+    def test_enqueue_is_deduplicated(self):
+        enqueue_email('Hello', 'Body', ['a@example.com'], dedup_key='greeting:a')
+        self.assertIsNone(
+            enqueue_email('Hello', 'Body', ['a@example.com'], dedup_key='greeting:a')
+        )
+        self.assertEqual(EmailOutbox.objects.count(), 1)
+
+    def test_batch_is_sent_over_one_connection(self):
+        for index in range(5):
+            enqueue_email('Hello', 'Body', [f'user{index}@example.com'])
+
+        with mock.patch(
+            'authentication.outbox.get_connection',
+            wraps=mail.get_connection
+        ) as get_connection:
+            result = send_pending_emails()
+
+        self.assertEqual(get_connection.call_count, 1)
+        self.assertEqual(result['sent'], 5)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(EmailOutbox.objects.filter(status=EmailOutbox.SENT, body='').count(), 5)
+
+    def test_failed_send_is_retried_later(self):
+        enqueue_email('Hello', 'Body', ['a@example.com'])
+        with mock.patch('authentication.outbox.EmailMessage.send', side_effect=OSError('down')):
+            send_pending_emails()
+
+        email = EmailOutbox.objects.get()
+        self.assertEqual(email.status, EmailOutbox.PENDING)
+        self.assertEqual(email.attempts, 1)
+        self.assertGreater(email.send_after, email.created_at)
+
+    def test_finished_emails_are_purged(self):
+        for index in range(3):
+            enqueue_email('Hello', 'Body', [f'user{index}@example.com'])
+        send_pending_emails()
+        enqueue_email('Hello', 'Body', ['pending@example.com'])
+        EmailOutbox.objects.filter(status=EmailOutbox.SENT).update(
+            created_at=timezone.now() - timedelta(seconds=settings.EMAIL_OUTBOX_RETENTION + 60)
+        )
+        EmailOutbox.objects.filter(recipients=['user0@example.com']).update(created_at=timezone.now())
+
+        self.assertEqual(purge_finished_emails(), 2)
+        self.assertEqual(
+            sorted(email.recipients[0] for email in EmailOutbox.objects.all()),
+            ['pending@example.com', 'user0@example.com']
+        )
+
+
+class WorkspaceListTests(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            email='owner@example.com',
+            password='testpass123'
+        )
+        self.member = User.objects.create_user(
+            email='member@example.com',
+            password='testpass123'
+        )
+        self.workspace = Workspace.objects.create(name='Acme', owner=self.owner)
+        WorkspaceMembership.objects.create(
+            workspace=self.workspace, user=self.owner, role='admin'
+        )
+        Team.objects.create(name='Core', workspace=self.workspace, owner=self.owner)
+
+    def test_member_sees_workspace_after_joining(self):
+        self.client.force_authenticate(user=self.member)
+        response = self.client.get(reverse('workspace-list'))
+        self.assertEqual(len(response.data['results']), 0)
+
+        WorkspaceMembership.objects.create(
+            workspace=self.workspace, user=self.member, role='member'
+        )
+        response = self.client.get(reverse('workspace-list'))
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['role'], 'member')
+        self.assertFalse(response.data['results'][0]['is_owner'])
+
+    def test_workspace_roles_are_not_cached_in_process(self):
+        membership = WorkspaceMembership.objects.create(
+            workspace=self.workspace, user=self.member, role='member'
+        )
+        self.assertEqual(get_workspace_roles(self.member), {str(self.workspace.id): 'member'})
+        # As if changed by another worker, whose invalidation this process never sees
+        WorkspaceMembership.objects.filter(pk=membership.pk).update(role='viewer')
+        self.assertEqual(get_workspace_roles(self.member), {str(self.workspace.id): 'viewer'})
+
+    def test_ownership_transfer_drops_previous_owners_cached_role(self):
+        workspace = Workspace.objects.create(name='Side', owner=self.owner)
+        self.addCleanup(cache.clear)
+        # As with a shared cache, whose entries only invalidation removes
+        with mock.patch('authentication.membership.roles_cache', return_value=cache):
+            self.assertEqual(get_workspace_roles(self.owner)[str(workspace.id)], 'admin')
+            workspace.owner = self.member
+            workspace.save()
+            self.assertNotIn(str(workspace.id), get_workspace_roles(self.owner))
+            self.assertEqual(get_workspace_roles(self.member)[str(workspace.id)], 'admin')
+
+    def test_stats_use_annotated_counts(self):
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.get(reverse('workspace-stats', args=[self.workspace.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['members']['total'], 1)
+        self.assertEqual(response.data['teams']['total'], 1)
+
+
+class TeamPermissionTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            email='teamadmin@example.com',
+            password='testpass123'
+        )
+        self.viewer = User.objects.create_user(
+            email='viewer@example.com',
+            password='testpass123'
+        )
+        self.workspace = Workspace.objects.create(name='Acme', owner=self.admin)
+        for user in (self.admin, self.viewer):
+            WorkspaceMembership.objects.create(workspace=self.workspace, user=user)
+        self.teams = [
+            Team.objects.create(name=f'Team {index}', workspace=self.workspace, owner=self.admin)
+            for index in range(3)
+        ]
+        for team in self.teams:
+            TeamMembership.objects.create(team=team, user=self.admin, role='admin')
+            TeamMembership.objects.create(team=team, user=self.viewer, role='viewer')
+
+    def test_resolver_loads_roles_once(self):
+        resolver = MembershipResolver(self.viewer)
+        with self.assertNumQueries(1):
+            for team in self.teams:
+                self.assertTrue(resolver.has_team_permission(team, 'view_workflows'))
+                self.assertFalse(resolver.is_team_admin(team))
+
+    def test_viewer_cannot_update_team(self):
+        self.client.force_authenticate(user=self.viewer)
+        url = reverse('team-detail', args=[self.teams[0].id])
+        response = self.client.patch(url, {'name': 'Renamed'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_list_annotates_member_counts(self):
+        self.client.force_authenticate(user=self.viewer)
+        response = self.client.get(reverse('team-list'), {'workspace': str(self.workspace.id)})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertEqual(response.data['results'][0]['members_count'], 2)
+
+    def test_demotion_elsewhere_is_enforced_on_next_request(self):
+        self.client.force_authenticate(user=self.admin)
+        url = reverse('team-detail', args=[self.teams[0].id])
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+        # As if changed by another worker, whose invalidation this process never sees
+        TeamMembership.objects.filter(team=self.teams[0], user=self.admin).update(role='viewer')
+        response = self.client.patch(url, {'name': 'Renamed'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_role_change_is_visible_to_next_request(self):
+        membership = TeamMembership.objects.get(team=self.teams[0], user=self.viewer)
+        self.assertFalse(MembershipResolver(self.viewer).is_team_admin(self.teams[0]))
+        membership.role = 'admin'
+        membership.save()
+        self.assertTrue(MembershipResolver(self.viewer).is_team_admin(self.teams[0]))
+
+
+class APIKeyAuthenticationTests(APITestCase):
+    def setUp(self):
+        api_key_cache.clear()
+        self.claims = UserClaimsResolver(InMemoryClaimsRedis(), local_ttl=0.001)
+        patcher = mock.patch('authentication.jwt._claims_resolver', self.claims)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = User.objects.create_user(
+            email='machine@example.com',
+            password='testpass123'
+        )
+        self.api_key = APIKey.objects.create(user=self.user, name='CI', scopes=['read'])
+        self.url = reverse('workspace-list')
+
+    def test_authenticates_with_cached_key(self):
+        headers = {'HTTP_AUTHORIZATION': f'Api-Key {self.api_key.key}'}
+        response = self.client.get(self.url, **headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with mock.patch.object(APIKey.objects, 'select_related') as lookup:
+            response = self.client.get(self.url, HTTP_X_API_KEY=self.api_key.key)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lookup.assert_not_called()
+
+    def test_revoked_key_is_rejected(self):
+        self.client.get(self.url, HTTP_X_API_KEY=self.api_key.key)
+        self.api_key.is_active = False
+        self.api_key.save()
+        response = self.client.get(self.url, HTTP_X_API_KEY=self.api_key.key)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_rotated_key_is_rejected(self):
+        old_key = self.api_key.key
+        self.client.get(self.url, HTTP_X_API_KEY=old_key)
+        self.api_key.key = generate_api_key()
+        self.api_key.save()
+        response = self.client.get(self.url, HTTP_X_API_KEY=old_key)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.get(self.url, HTTP_X_API_KEY=self.api_key.key)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_each_request_gets_its_own_user(self):
+        authentication = APIKeyAuthentication()
+        request = HttpRequest()
+        request.META['HTTP_X_API_KEY'] = self.api_key.key
+        first, _ = authentication.authenticate(request)
+        second, resolved = authentication.authenticate(request)
+        self.assertIsNot(first, second)
+        self.assertEqual((first.pk, second.pk), (self.user.pk, self.user.pk))
+        self.assertEqual(resolved.user_claims['is_active'], True)
+
+        # Deactivation published to the claims store applies before the cache expires
+        self.claims.publish(str(self.user.pk), {'is_active': False})
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            authentication.authenticate(request)
+
+    def test_last_used_is_written_in_batches(self):
+        self.client.get(self.url, HTTP_X_API_KEY=self.api_key.key)
+        last_used_tracker.flush()
+        self.api_key.refresh_from_db()
+        self.assertIsNotNone(self.api_key.last_used)
+
+
+class JWTAuthenticationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='jwt@example.com',
+            password='testpass123'
+        )
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+        self.url = reverse('workspace-list')
+
+    def test_verified_token_is_cached(self):
+        with mock.patch('shared.auth.tokens.jwt.decode', wraps=jose_jwt.decode) as decode:
+            for _ in range(3):
+                response = self.client.get(self.url, HTTP_AUTHORIZATION=f'Bearer {self.token}')
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(decode.call_count, 1)
+
+    def test_denied_token_is_rejected(self):
+        with mock.patch('authentication.jwt.TokenDenylist.is_revoked', return_value=True):
+            response = self.client.get(self.url, HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_tampered_token_is_rejected(self):
+        response = self.client.get(self.url, HTTP_AUTHORIZATION=f'Bearer {self.token[:-2]}xx')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class InMemoryClaimsRedis:
+    """Stands in for the auth Redis client used by UserClaimsResolver"""
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def execute(self):
+        pass
+
+
+class UserClaimsTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='claims@example.com', password='testpass123')
+        self.resolver = UserClaimsResolver(InMemoryClaimsRedis(), local_ttl=0.001)
+        patcher = mock.patch('authentication.jwt._claims_resolver', self.resolver)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.refresh = RefreshToken.for_user(self.user)
+        self.access = AccessToken(str(self.refresh.access_token))
+
+    def test_user_is_resolved_from_claims(self):
+        self.resolver.publish(str(self.user.pk), {'email': self.user.email, 'is_active': True, 'is_staff': True})
+        with self.assertNumQueries(0):
+            user = CachedJWTAuthentication().get_user(self.access)
+            self.assertEqual(user.pk, self.user.pk)
+            self.assertTrue(user.is_staff)
+            self.assertTrue(user.is_authenticated)
+        self.assertEqual(user.email, 'claims@example.com')
+
+    def test_membership_resolver_does_not_load_user(self):
+        self.resolver.publish(str(self.user.pk), {'email': self.user.email, 'is_active': True})
+        request = HttpRequest()
+        request.user = CachedJWTAuthentication().get_user(self.access)
+        resolver = get_membership_resolver(request)
+        # Only the role queries; the User row is never fetched
+        with self.assertNumQueries(3):
+            self.assertIs(get_membership_resolver(request), resolver)
+            self.assertEqual(resolver.workspace_roles, {})
+            self.assertEqual(resolver.team_roles, {})
+
+    def test_claims_miss_loads_user_and_publishes(self):
+        self.resolver.invalidate(str(self.user.pk))
+        user = CachedJWTAuthentication().get_user(self.access)
+        self.assertEqual(user, self.user)
+        self.assertTrue(self.resolver.resolve(str(self.user.pk))['is_active'])
+
+    def test_bulk_deactivation_is_published(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            run_bulk_operation('deactivate', [str(self.user.pk)], {}, self.user.pk)
+        self.assertFalse(self.resolver.resolve(str(self.user.pk))['is_active'])
+        with self.assertRaises(AuthenticationFailed):
+            CachedJWTAuthentication().get_user(self.access)
+
+    def test_refresh_republishes_claims(self):
+        self.resolver.invalidate(str(self.user.pk))
+        response = self.client.post(reverse('token_refresh'), {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.resolver.resolve(str(self.user.pk))['email'], 'claims@example.com')
+
+    def test_refresh_is_refused_for_inactive_user(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        response = self.client.post(reverse('token_refresh'), {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class LoginThrottleTests(APITestCase):
+    def setUp(self):
+        self.url = reverse('auth_login')
+        self.credentials = {'email': 'victim@example.com', 'password': 'wrong'}
+
+    def test_throttled_attempt_skips_database(self):
+        with mock.patch.object(login_throttle, 'check', return_value=120):
+            with self.assertNumQueries(0):
+                response = self.client.post(self.url, self.credentials, format='json')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '120')
+
+    def test_failed_attempt_is_counted(self):
+        with mock.patch.object(login_throttle, 'check', return_value=0), \
+                mock.patch.object(login_throttle, 'record_failure') as record_failure:
+            response = self.client.post(
+                self.url, self.credentials, format='json', REMOTE_ADDR='203.0.113.7'
+            )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        record_failure.assert_called_once_with('victim@example.com', '203.0.113.7')
+
+    def test_spoofed_forwarded_for_does_not_change_key(self):
+        for forwarded in ('', '198.51.100.1', "'; FLUSHALL", '198.51.100.1, 10.0.0.1'):
+            with mock.patch.object(login_throttle, 'check', return_value=0), \
+                    mock.patch.object(login_throttle, 'record_failure') as record_failure:
+                self.client.post(
+                    self.url, self.credentials, format='json',
+                    REMOTE_ADDR='203.0.113.7', HTTP_X_FORWARDED_FOR=forwarded
+                )
+            record_failure.assert_called_once_with('victim@example.com', '203.0.113.7')
+
+    @override_settings(TRUSTED_PROXY_COUNT=1)
+    def test_client_ip_behind_trusted_proxy(self):
+        with mock.patch.object(login_throttle, 'check', return_value=0), \
+                mock.patch.object(login_throttle, 'record_failure') as record_failure:
+            self.client.post(
+                self.url, self.credentials, format='json',
+                REMOTE_ADDR='10.0.0.2', HTTP_X_FORWARDED_FOR='198.51.100.1, 203.0.113.7'
+            )
+        record_failure.assert_called_once_with('victim@example.com', '203.0.113.7')
+        self.assertEqual(login_throttle._keys(ip_address='not an ip'), [])
+
+    def test_client_subnet(self):
+        self.assertEqual(client_subnet('203.0.113.7'), '203.0.113.0/24')
+        self.assertEqual(client_subnet('2001:db8::1'), '2001:db8::/64')
+        self.assertIsNone(client_subnet('not-an-ip'))
@@ -0,0 +1,141 @@
+import ipaddress
+import logging
+import math
+import time
+import uuid
+
+from django.conf import settings
+
+from .jwt import get_auth_redis
+
+logger = logging.getLogger(__name__)
+
+LOGIN_FAILURES_PREFIX = 'auth:login-failures'
+
+
+def normalize_ip(value):
+    """Canonical form of an IP address, or None when it is not one"""
+    try:
+        return str(ipaddress.ip_address(str(value).strip()))
+    except ValueError:
+        return None
+
+
+def client_ip(request):
+    """
+    The client's IP address: the X-Forwarded-For entry added by the
+    outermost of TRUSTED_PROXY_COUNT proxies, or REMOTE_ADDR when there are
+    none. Entries left of it are client-supplied and never used.
+    """
+    proxies = settings.TRUSTED_PROXY_COUNT
+    if proxies > 0:
+        forwarded = [hop for hop in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if hop.strip()]
+        if len(forwarded) >= proxies:
+            return normalize_ip(forwarded[-proxies])
+    return normalize_ip(request.META.get('REMOTE_ADDR', ''))
+
+
+def client_subnet(ip_address):
+    """The /24 (IPv4) or /64 (IPv6) network an address belongs to"""
+    try:
+        address = ipaddress.ip_address(ip_address)
+    except (TypeError, ValueError):
+        return None
+    prefix = 24 if address.version == 4 else 64
+    return str(ipaddress.ip_network(f'{address}/{prefix}', strict=False))
+
+
+class LoginThrottle:
+    """
+    Sliding-window counters of failed logins per account, per IP and per
+    subnet, kept in Redis sorted sets (one member per failure, scored by
+    time). Checking and recording are one pipelined round trip each; the
+    database is never consulted. Redis errors fail open.
+    """
+
+    def __init__(self, client=None):
+        self._client = client
+
+    @property
+    def redis(self):
+        return self._client or get_auth_redis()
+
+    def _keys(self, email=None, ip_address=None):
+        """(scope, key) pairs that apply to an attempt"""
+        keys = []
+        if isinstance(email, str) and email.strip():
+            keys.append(('user', f'{LOGIN_FAILURES_PREFIX}:user:{email.lower().strip()}'))
+        ip_address = normalize_ip(ip_address) if ip_address else None
+        if ip_address:
+            keys.append(('ip', f'{LOGIN_FAILURES_PREFIX}:ip:{ip_address}'))
+            subnet = client_subnet(ip_address)
+            if subnet:
+                keys.append(('subnet', f'{LOGIN_FAILURES_PREFIX}:subnet:{subnet}'))
+        return keys
+
+    def check(self, email=None, ip_address=None, now=None):
+        """
+        Return the number of seconds until another attempt is allowed, or
+        0 when no limit in LOGIN_THROTTLE_LIMITS is exceeded
+        """
+        now = now or time.time()
+        keys = self._keys(email, ip_address)
+        if not keys:
+            return 0
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for scope, key in keys:
+                window = settings.LOGIN_THROTTLE_LIMITS[scope][1]
+                pipe.zremrangebyscore(key, '-inf', now - window)
+                pipe.zcard(key)
+                pipe.zrange(key, 0, 0, withscores=True)
+            results = pipe.execute()
+        except Exception as e:
+            logger.warning(f"Login throttle unavailable: {str(e)}")
+            return 0
+
+        retry_after = 0
+        for index, (scope, _key) in enumerate(keys):
+            limit, window = settings.LOGIN_THROTTLE_LIMITS[scope]
+            count, oldest = results[index * 3 + 1], results[index * 3 + 2]
+            if count >= limit and oldest:
+                retry_after = max(retry_after, math.ceil(oldest[0][1] + window - now))
+        return retry_after
+
+    def record_failure(self, email=None, ip_address=None, now=None):
+        now = now or time.time()
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for scope, key in self._keys(email, ip_address):
+                window = settings.LOGIN_THROTTLE_LIMITS[scope][1]
+                pipe.zadd(key, {uuid.uuid4().hex: now})
+                pipe.zremrangebyscore(key, '-inf', now - window)
+                pipe.expire(key, window)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to record login failure: {str(e)}")
+
+    def recent_failures(self, seconds, email=None, ip_address=None, scope=None):
+        """Failures in the last ``seconds`` for one scope ('user', 'ip' or 'subnet')"""
+        keys = dict(self._keys(email, ip_address))
+        key = keys.get(scope or ('user' if email else 'ip'))
+        if not key:
+            return 0
+        try:
+            return self.redis.zcount(key, time.time() - seconds, '+inf')
+        except Exception as e:
+            logger.warning(f"Login throttle unavailable: {str(e)}")
+            return 0
+
+    def reset(self, email):
+        """Clear an account's failures after a successful login"""
+        keys = [key for scope, key in self._keys(email=email)]
+        if not keys:
+            return
+        try:
+            self.redis.delete(*keys)
+        except Exception as e:
+            logger.warning(f"Failed to reset login failures: {str(e)}")
+
+
+login_throttle = LoginThrottle()
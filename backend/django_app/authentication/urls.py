@@ -2,10 +2,11 @@
 
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from rest_framework_simplejwt.views import TokenRefreshView, TokenVerifyView
+from rest_framework_simplejwt.views import TokenVerifyView
 from .views import (
     RegisterView,
     LoginView,
+    RefreshView,
     LogoutView,
     UserViewSet,
     APIKeyViewSet,
@@ -42,7 +43,7 @@ urlpatterns = [
     path('logout/', LogoutView.as_view(), name='auth_logout'),
     
     # Token endpoints
-    path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('token/refresh/', RefreshView.as_view(), name='token_refresh'),
     path('token/verify/', TokenVerifyView.as_view(), name='token_verify'),
     
     # Password management
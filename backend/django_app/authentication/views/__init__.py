@@ -1,4 +1,4 @@
-from .auth import RegisterView, LoginView, LogoutView, EmailVerificationView, PasswordResetView, PasswordResetConfirmView
+from .auth import RegisterView, LoginView, RefreshView, LogoutView, EmailVerificationView, PasswordResetView, PasswordResetConfirmView
 from .social import GoogleLoginView, GitHubLoginView
 from .user import UserViewSet, UserMeView, UserLimitsView
 from .team import TeamViewSet
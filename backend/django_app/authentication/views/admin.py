@@ -1,5 +1,6 @@
+import os
 from datetime import datetime, timedelta
-from django.db.models import Count, Q, Avg
+from django.db.models import Q
 from ..serializers import (
     UserExportSerializer,
     DetailedTeamSerializer,
@@ -8,7 +9,10 @@ from ..serializers import (
 from ..models import UserProfile, SecurityLog ,TeamActivity, TeamMembership, Team
 from .base import BaseViewSet
 from rest_framework.response import Response
+from django.conf import settings
 from django.utils import timezone
+from django.core import signing
+from django.http import StreamingHttpResponse, FileResponse
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from rest_framework import status
@@ -17,6 +21,18 @@ from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from django.contrib.auth import get_user_model
 from ..models import Workspace, UserActivity
 from ..serializers import UserActivitySerializer,TeamAuditLogSerializer, SecurityLogSerializer, DetailedWorkspaceSerializer 
+from ..analytics import overview_response, user_metrics_response
+from ..bulk import BULK_OPERATIONS, validate_bulk_request, run_bulk_operation
+from ..audit import log_security_event
+from ..exports import (
+    EXPORT_FORMATS,
+    iter_export,
+    export_filename,
+    export_path,
+    export_failure,
+    create_export_token,
+    read_export_token
+)
 
 User = get_user_model()
 
@@ -90,7 +106,7 @@ class AdminUserViewSet(BaseViewSet):
             properties={
                 'operation': openapi.Schema(
                     type=openapi.TYPE_STRING,
-                    enum=['activate', 'deactivate', 'delete', 'update_plan']
+                    enum=BULK_OPERATIONS
                 ),
                 'user_ids': openapi.Schema(
                     type=openapi.TYPE_ARRAY,
@@ -98,11 +114,21 @@ class AdminUserViewSet(BaseViewSet):
                 ),
                 'data': openapi.Schema(
                     type=openapi.TYPE_OBJECT,
-                    description='Additional data for the operation'
+                    description='Additional data for the operation, e.g. {"plan_type": "premium"}'
                 )
             }
         ),
         responses={
+            202: openapi.Response(
+                description="Large selection queued as a background job",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'job_id': openapi.Schema(type=openapi.TYPE_STRING),
+                        'total': openapi.Schema(type=openapi.TYPE_INTEGER)
+                    }
+                )
+            ),
             200: openapi.Response(
                 description="Operation completed successfully",
                 schema=openapi.Schema(
@@ -125,7 +151,64 @@ class AdminUserViewSet(BaseViewSet):
     )
     @action(detail=False, methods=['post'])
     def bulk(self, request):
-        pass
+        operation = request.data.get('operation')
+        user_ids = request.data.get('user_ids')
+        data = request.data.get('data') or {}
+        
+        error = validate_bulk_request(operation, user_ids, data)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+            
+        if len(user_ids) > settings.BULK_USER_ASYNC_THRESHOLD:
+            from tasks.admin_tasks import bulk_user_operation
+            
+            job = bulk_user_operation.delay(
+                operation,
+                [str(user_id) for user_id in user_ids],
+                data,
+                str(request.user.id)
+            )
+            return Response(
+                {'job_id': job.id, 'total': len(user_ids)},
+                status=status.HTTP_202_ACCEPTED
+            )
+            
+        result = run_bulk_operation(operation, user_ids, data, request.user.id)
+        return Response({'success': True, **result})
+
+    @swagger_auto_schema(
+        operation_summary="Bulk operation status",
+        operation_description="Get progress of a background bulk user operation",
+        manual_parameters=[
+            openapi.Parameter(
+                'job_id', openapi.IN_QUERY,
+                description="Job ID returned by the bulk endpoint",
+                type=openapi.TYPE_STRING,
+                required=True
+            )
+        ],
+        tags=['Admin - Users']
+    )
+    @action(detail=False, methods=['get'])
+    def bulk_status(self, request):
+        from celery.result import AsyncResult
+        
+        job_id = request.query_params.get('job_id')
+        if not job_id:
+            return Response(
+                {'error': 'job_id is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+            
+        job = AsyncResult(job_id)
+        response = {'job_id': job_id, 'status': job.state}
+        if job.state == 'PROGRESS':
+            response['progress'] = job.info
+        elif job.successful():
+            response['result'] = job.result
+        elif job.failed():
+            response['error'] = str(job.result)
+        return Response(response)
 
     @swagger_auto_schema(
         operation_summary="User statistics",
@@ -228,7 +311,7 @@ class AdminUserViewSet(BaseViewSet):
             user.profile.save()
             
             # Log plan change
-            SecurityLog.objects.create(
+            log_security_event(
                 user=user,
                 action='plan_updated',
                 details={
@@ -481,7 +564,7 @@ class AdminWorkspaceViewSet(BaseViewSet):
         workspace.plan_type = new_plan
         workspace.save()
         
-        SecurityLog.objects.create(
+        log_security_event(
             user=request.user,
             action='workspace_plan_updated',
             severity='medium',
@@ -534,6 +617,10 @@ class AdminAnalyticsViewSet(BaseViewSet):
                                 'total': openapi.Schema(type=openapi.TYPE_INTEGER),
                                 'avg_size': openapi.Schema(type=openapi.TYPE_NUMBER)
                             }
+                        ),
+                        'generated_at': openapi.Schema(
+                            type=openapi.TYPE_STRING,
+                            format='date-time'
                         )
                     }
                 )
@@ -544,38 +631,9 @@ class AdminAnalyticsViewSet(BaseViewSet):
     )
     @action(detail=False)
     def overview(self, request):
-        """System-wide analytics overview"""
-        end_date = timezone.now()
-        start_date = end_date - timedelta(days=30)
-        
-        stats = {
-            'users': {
-                'total': User.objects.count(),
-                'active': User.objects.filter(is_active=True).count(),
-                'new_last_30_days': User.objects.filter(
-                    created_at__gte=start_date
-                ).count()
-            },
-            'workspaces': {
-                'total': Workspace.objects.count(),
-                'by_plan': dict(Workspace.objects.values_list(
-                    'plan_type'
-                ).annotate(count=Count('id')))
-            },
-            'teams': {
-                'total': Team.objects.count(),
-                'average_size': TeamMembership.objects.values(
-                    'team'
-                ).annotate(size=Count('id')).aggregate(avg=Avg('size'))['avg']
-            },
-            'security': {
-                'critical_logs': SecurityLog.objects.filter(
-                    severity='critical',
-                    created_at__gte=start_date
-                ).count()
-            }
-        }
-        return Response(stats)
+        """System-wide analytics overview served from the analytics snapshot"""
+        force_refresh = request.query_params.get('refresh') == 'true'
+        return Response(overview_response(force_refresh))
     
     @swagger_auto_schema(
         operation_summary="User analytics",
@@ -629,26 +687,9 @@ class AdminAnalyticsViewSet(BaseViewSet):
 
     @action(detail=False)
     def user_metrics(self, request):
-        """Detailed user-related metrics"""
-        time_periods = [7, 30, 90]
-        metrics = {}
-        
-        for days in time_periods:
-            date_threshold = timezone.now() - timedelta(days=days)
-            metrics[f'last_{days}_days'] = {
-                'new_users': User.objects.filter(
-                    created_at__gte=date_threshold
-                ).count(),
-                'active_users': UserActivity.objects.filter(
-                    created_at__gte=date_threshold
-                ).values('user').distinct().count(),
-                'upgrades': UserActivity.objects.filter(
-                    action='plan_upgraded',
-                    created_at__gte=date_threshold
-                ).count()
-            }
-            
-        return Response(metrics)
+        """Detailed user-related metrics served from daily rollups"""
+        force_refresh = request.query_params.get('refresh') == 'true'
+        return Response(user_metrics_response(force_refresh))
     
 class AdminSystemViewSet(BaseViewSet):
     permission_classes = [IsAdminUser]
@@ -729,34 +770,131 @@ class AdminActivityViewSet(BaseViewSet):
     
     @action(detail=False)
     def user_activity(self, request):
-        activities = UserActivity.objects.all().select_related(
-            'user'
-        ).order_by('-created_at')
+        activities = UserActivity.objects.all().select_related('user')
         
-        return Response(UserActivitySerializer(activities, many=True).data)
+        page = self.paginate_queryset(activities)
+        return self.get_paginated_response(
+            UserActivitySerializer(page, many=True).data
+        )
 
     @action(detail=False)
     def security_alerts(self, request):
         alerts = SecurityLog.objects.filter(
             severity__in=['high', 'critical'],
             is_resolved=False
-        ).order_by('-created_at')
+        ).select_related('user')
         
-        return Response(SecurityLogSerializer(alerts, many=True).data)
+        page = self.paginate_queryset(alerts)
+        return self.get_paginated_response(
+            SecurityLogSerializer(page, many=True).data
+        )
 
+    @swagger_auto_schema(
+        operation_summary="Export activity logs",
+        operation_description=(
+            "Stream activity logs as CSV or NDJSON. With mode=async the export "
+            "is written in the background and a download token is returned."
+        ),
+        manual_parameters=[
+            openapi.Parameter(
+                'start_date', openapi.IN_QUERY,
+                description="Filter by start date",
+                type=openapi.TYPE_STRING,
+                format='date'
+            ),
+            openapi.Parameter(
+                'end_date', openapi.IN_QUERY,
+                description="Filter by end date",
+                type=openapi.TYPE_STRING,
+                format='date'
+            ),
+            openapi.Parameter(
+                'export_format', openapi.IN_QUERY,
+                description="Output format",
+                type=openapi.TYPE_STRING,
+                enum=list(EXPORT_FORMATS)
+            ),
+            openapi.Parameter(
+                'compress', openapi.IN_QUERY,
+                description="Gzip the export",
+                type=openapi.TYPE_BOOLEAN
+            ),
+            openapi.Parameter(
+                'mode', openapi.IN_QUERY,
+                description="Stream the response or export in the background",
+                type=openapi.TYPE_STRING,
+                enum=['stream', 'async']
+            )
+        ],
+        tags=['Admin - Activity']
+    )
     @action(detail=False)
     def export_logs(self, request):
         """Export activity logs"""
         start_date = request.query_params.get('start_date')
         end_date = request.query_params.get('end_date')
+        export_format = request.query_params.get('export_format', 'csv')
+        compress = request.query_params.get('compress') == 'true'
+        mode = request.query_params.get('mode', 'stream')
         
-        query = UserActivity.objects.all()
-        if start_date:
-            query = query.filter(created_at__gte=start_date)
-        if end_date:
-            query = query.filter(created_at__lte=end_date)
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {'error': f'export_format must be one of {list(EXPORT_FORMATS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
             
-        activities = query.select_related('user').order_by('-created_at')
-        serializer = UserActivitySerializer(activities, many=True)
-        
-        return Response(serializer.data)
\ No newline at end of file
+        if mode == 'async':
+            from tasks.export_tasks import export_activity_logs
+            
+            token = create_export_token(export_format, compress)
+            export_activity_logs.delay(
+                read_export_token(token)['file'],
+                export_format,
+                start_date,
+                end_date,
+                compress
+            )
+            return Response(
+                {'token': token, 'status': 'pending'},
+                status=status.HTTP_202_ACCEPTED
+            )
+            
+        response = StreamingHttpResponse(
+            iter_export(export_format, start_date, end_date, compress),
+            content_type='application/gzip' if compress else EXPORT_FORMATS[export_format]
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{export_filename(export_format, compress)}"'
+        )
+        return response
+
+    @action(detail=False)
+    def download_export(self, request):
+        """Download a background export once it has finished"""
+        try:
+            export = read_export_token(request.query_params.get('token', ''))
+        except signing.BadSignature:
+            return Response(
+                {'error': 'Invalid or expired export token'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+            
+        path = export_path(export['file'])
+        if not os.path.exists(path):
+            error = export_failure(export['file'])
+            if error is not None:
+                return Response(
+                    {'status': 'failed', 'error': error},
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                )
+            return Response(
+                {'status': 'pending'},
+                status=status.HTTP_202_ACCEPTED
+            )
+            
+        return FileResponse(
+            open(path, 'rb'),
+            as_attachment=True,
+            filename=export_filename(export['format'], export['compress']),
+            content_type='application/gzip' if export['compress'] else EXPORT_FORMATS[export['format']]
+        )
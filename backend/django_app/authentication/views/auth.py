@@ -1,11 +1,11 @@
 from rest_framework import generics, viewsets, status
-from rest_framework_simplejwt.views import TokenObtainPairView
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 from rest_framework import serializers
 from rest_framework.throttling import AnonRateThrottle
 from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from rest_framework.response import Response
-from django.core.mail import send_mail
 from django.core.exceptions import ValidationError
 from django.db import transaction
 from django.conf import settings
@@ -14,7 +14,12 @@ from django.contrib.auth import get_user_model
 from django.utils.encoding import force_bytes
 from django.contrib.auth.tokens import default_token_generator
 from rest_framework.decorators import api_view
-from ..models.activity import SecurityLog, UserActivity
+from ..models.activity import UserActivity
+from ..audit import log_security_event
+from ..outbox import enqueue_email
+from ..jwt import publish_user_claims, revoke_access_token
+from ..throttling import client_ip, login_throttle
+from ..models.security import LoginHistory
 from ..models.profile import UserProfile
 from ..models.workspace import Workspace, WorkspaceMembership
 from rest_framework.views import APIView
@@ -31,7 +36,6 @@ from ..serializers.auth import (
 )
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
-from datetime import datetime
 
 User = get_user_model()
 
@@ -131,7 +135,7 @@ class RegisterView(generics.CreateAPIView):
                 user.send_verification_email()
                 
                 # Log registration
-                SecurityLog.objects.create(
+                log_security_event(
                     user=user,
                     action='user_registered',
                     details={
@@ -195,8 +199,7 @@ class LoginView(TokenObtainPairView):
 
     def get_client_info(self, request):
         return {
-            'ip_address': request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')[0] 
-                        or request.META.get('REMOTE_ADDR'),
+            'ip_address': client_ip(request),
             'user_agent': request.META.get('HTTP_USER_AGENT', ''),
             'device_type': self.get_device_type(request),
             'location': self._get_location_from_ip(request)
@@ -223,14 +226,30 @@ class LoginView(TokenObtainPairView):
             response["Access-Control-Allow-Credentials"] = "true"
             return response
     def post(self, request, *args, **kwargs):
+        email = request.data.get('email')
+        client_info = self.get_client_info(request)
+        ip_address = client_info['ip_address']
+
+        # Throttled attempts are rejected from Redis alone, before any DB work
+        retry_after = login_throttle.check(email, ip_address)
+        if retry_after:
+            response = Response(
+                {'error': 'Too many failed login attempts. Try again later.'},
+                status=status.HTTP_429_TOO_MANY_REQUESTS
+            )
+            response['Retry-After'] = str(retry_after)
+            return response
+
         serializer = self.get_serializer(data=request.data)
 
         try:
             serializer.is_valid(raise_exception=True)
             user = serializer.user
+            login_throttle.reset(email)
+            publish_user_claims(user)
 
-            # Log successful login
-            SecurityLog.objects.create(
+            # Log successful login (last_login is updated by simplejwt)
+            log_security_event(
                 user=user,
                 action='login_success',
                 details={
@@ -238,23 +257,24 @@ class LoginView(TokenObtainPairView):
                     'user_agent': request.META.get('HTTP_USER_AGENT', ''),
                 }
             )
-
-            # Update user's last login
-            user.last_login = datetime.now()
-            user.save(update_fields=['last_login'])
+            LoginHistory.log_login_attempt(
+                user=user,
+                status='success',
+                ip_address=ip_address,
+                user_agent=client_info['user_agent'],
+                device_type=client_info['device_type']
+            )
 
             return Response(serializer.validated_data, status=status.HTTP_200_OK)
 
         except serializers.ValidationError as e:
+            login_throttle.record_failure(email, ip_address)
+
             # Get user if email is provided
-            email = request.data.get('email')
-            from django.contrib.auth import get_user_model
-            User = get_user_model()
-            
-            try:
-                user = User.objects.get(email=email)
+            user = User.objects.filter(email=email).first() if email else None
+            if user:
                 # Log failed login attempt
-                SecurityLog.objects.create(
+                log_security_event(
                     user=user,
                     action='login_failed',
                     details={
@@ -263,8 +283,14 @@ class LoginView(TokenObtainPairView):
                         'reason': str(e)
                     }
                 )
-            except User.DoesNotExist:
-                pass
+                LoginHistory.log_login_attempt(
+                    user=user,
+                    status='failed',
+                    ip_address=ip_address,
+                    user_agent=client_info['user_agent'],
+                    device_type=client_info['device_type'],
+                    failure_reason='invalid_credentials'
+                )
 
             return Response(
                 {'error': 'Invalid email or password'},
@@ -276,6 +302,29 @@ class LoginView(TokenObtainPairView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+class RefreshView(TokenRefreshView):
+    """
+    simplejwt's token refresh, refused for users that were deactivated or
+    deleted since login; every new access token comes with freshly
+    published claims
+    """
+
+    def post(self, request, *args, **kwargs):
+        response = super().post(request, *args, **kwargs)
+        if response.status_code != status.HTTP_200_OK:
+            return response
+
+        # Just issued by the serializer; no need to verify it again
+        user_id = AccessToken(response.data['access'], verify=False)[api_settings.USER_ID_CLAIM]
+        user = User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+        if user is None or not user.is_active:
+            return Response(
+                {'error': 'User inactive or deleted'},
+                status=status.HTTP_401_UNAUTHORIZED
+            )
+        publish_user_claims(user)
+        return response
+
 class LogoutView(APIView):
     permission_classes = [IsAuthenticated]
     
@@ -304,9 +353,13 @@ class LogoutView(APIView):
             refresh_token = request.data["refresh_token"]
             token = RefreshToken(refresh_token)
             token.blacklist()
+
+            # The access token stays valid until it expires unless denied
+            if request.auth is not None and hasattr(request.auth, 'payload'):
+                revoke_access_token(request.auth)
             
             # Log logout
-            SecurityLog.objects.create(
+            log_security_event(
                 user=request.user,
                 action='logout',
                 ip_address=request.META.get('REMOTE_ADDR')
@@ -357,15 +410,14 @@ class PasswordResetView(APIView):
             reset_url = f'{settings.FRONTEND_URL}/reset-password?uid={uid}&token={token}'
             
             # Send email
-            send_mail(
+            enqueue_email(
                 subject='Password Reset Request',
                 message=f'Click the following link to reset your password: {reset_url}',
-                from_email=settings.DEFAULT_FROM_EMAIL,
                 recipient_list=[email],
-                fail_silently=False,
+                dedup_key=f'password_reset:{user.pk}:{token}'
             )
             
-            SecurityLog.objects.create(
+            log_security_event(
                 user=user,
                 action='password_reset_requested',
                 ip_address=request.META.get('REMOTE_ADDR')
@@ -426,7 +478,7 @@ class EmailVerificationView(APIView):
                 user.save()
                 
                 # Log verification success
-                SecurityLog.objects.create(
+                log_security_event(
                     user=user,
                     action='email_verified',
                     details={
@@ -441,7 +493,7 @@ class EmailVerificationView(APIView):
                 
             except User.DoesNotExist:
                 # Log failed attempt
-                SecurityLog.objects.create(
+                log_security_event(
                     action='email_verification_failed',
                     details={
                         'reason': 'invalid_token',
@@ -494,7 +546,7 @@ class EmailVerificationView(APIView):
             user.generate_verification_token()
             user.send_verification_email()
             
-            SecurityLog.objects.create(
+            log_security_event(
                 user=user,
                 action='verification_email_resent',
                 details={
@@ -600,7 +652,7 @@ class PasswordResetConfirmView(APIView):
             # Verify token
             if not default_token_generator.check_token(user, token.split('-')[1]):
                 # Log failed attempt
-                SecurityLog.objects.create(
+                log_security_event(
                     user=user,
                     action='password_reset_failed',
                     details={
@@ -618,7 +670,7 @@ class PasswordResetConfirmView(APIView):
             user.session_set.all().delete()
             
             # Log successful password reset
-            SecurityLog.objects.create(
+            log_security_event(
                 user=user,
                 action='password_reset_successful',
                 details={
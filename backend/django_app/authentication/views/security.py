@@ -1,4 +1,5 @@
-from ..models import APIKey, SecurityLog
+from ..models import APIKey
+from ..audit import log_security_event
 from ..serializers.security import APIKeySerializer
 import uuid
 from .base import BaseViewSet
@@ -18,14 +19,14 @@ class APIKeyViewSet(BaseViewSet):
             key=uuid.uuid4().hex
         )
         
-        SecurityLog.objects.create(
+        log_security_event(
             user=self.request.user,
             action='api_key_created',
             details={'key_name': api_key.name}
         )
 
     def perform_destroy(self, instance):
-        SecurityLog.objects.create(
+        log_security_event(
             user=self.request.user,
             action='api_key_deleted',
             details={'key_name': instance.name}
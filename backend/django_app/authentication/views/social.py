@@ -6,7 +6,9 @@ from dj_rest_auth.registration.views import SocialLoginView
 from dj_rest_auth.registration.serializers import SocialLoginSerializer
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.response import Response
-from ..models import SecurityLog
+from ..audit import log_security_event
+from ..jwt import publish_user_claims
+from ..throttling import client_ip
 from ..models.user import User
 from rest_framework import status
 from django.conf import settings
@@ -23,8 +25,7 @@ class BaseSocialLoginView(SocialLoginView):
 
     def get_client_info(self):
         return {
-            'ip_address': self.request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')[0].strip() 
-                         or self.request.META.get('REMOTE_ADDR'),
+            'ip_address': client_ip(self.request),
             'user_agent': self.request.META.get('HTTP_USER_AGENT', ''),
             'provider': self.adapter_class.__name__.replace('OAuth2Adapter', '').lower()
         }
@@ -40,7 +41,7 @@ class BaseSocialLoginView(SocialLoginView):
             client_info = self.get_client_info()
             
             # Log the successful authentication
-            SecurityLog.objects.create(
+            log_security_event(
                 user=user,
                 action=f"{client_info['provider']}_auth_success",
                 details={
@@ -95,7 +96,9 @@ class GoogleLoginView(APIView):
                 }
             )
 
-            # Generate JWT tokens
+            # Generate JWT tokens; the FastAPI service authorizes them
+            # against the claims published here
+            publish_user_claims(user)
             refresh = RefreshToken.for_user(user)
             
             return Response({
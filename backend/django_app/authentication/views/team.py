@@ -1,4 +1,6 @@
-from ..models import Team, TeamMembership, TeamActivity, Workspace, User
+from ..models import Team, TeamMembership, Workspace, User
+from ..audit import log_team_activity
+from ..membership import get_membership_resolver
 from ..serializers.team import (
     TeamSerializer, 
     TeamMembershipDetailSerializer,
@@ -34,22 +36,21 @@ class TeamViewSet(BaseViewSet):
     def get_queryset(self):
         """Optimized queryset based on action"""
         workspace_id = self.request.query_params.get('workspace')
-        user = self.request.user
         
         # Require workspace param only for list action
         if self.action == 'list':
             if not workspace_id:
                 raise ValidationError({'workspace': 'Workspace ID is required for listing teams'})
 
-        # Get teams through memberships table to avoid duplicates
-        queryset = Team.objects.filter(memberships__user=user)
+        # Teams and workspaces come from the request's membership resolver
+        resolver = get_membership_resolver(self.request)
+        queryset = Team.objects.filter(id__in=list(resolver.team_roles))
 
         # Apply workspace filter 
         if workspace_id:
-            queryset = queryset.filter(
-                workspace_id=workspace_id,
-                workspace__members=user
-            )
+            if not resolver.is_workspace_member(workspace_id):
+                return queryset.none()
+            queryset = queryset.filter(workspace_id=workspace_id)
 
         # Optimize queries based on action
         if self.action == 'retrieve':
@@ -59,7 +60,9 @@ class TeamViewSet(BaseViewSet):
                 'memberships__user'
             )
         elif self.action == 'list':
-            return queryset.select_related('owner')
+            return queryset.select_related('owner').annotate(
+                members_total=models.Count('memberships')
+            )
                     
         return queryset
 
@@ -116,7 +119,7 @@ class TeamViewSet(BaseViewSet):
     )
     def update(self, request, *args, **kwargs):
         team = self.get_object()
-        if not team.memberships.filter(user=request.user, role='admin').exists():
+        if not get_membership_resolver(request).is_team_admin(team):
             return Response(
                 {'error': 'Only team admins can update team'},
                 status=status.HTTP_403_FORBIDDEN
@@ -136,7 +139,7 @@ class TeamViewSet(BaseViewSet):
     )
     def partial_update(self, request, *args, **kwargs):
         team = self.get_object()
-        if not team.memberships.filter(user=request.user, role='admin').exists():
+        if not get_membership_resolver(request).is_team_admin(team):
             return Response(
                 {'error': 'Only team admins can update team'},
                 status=status.HTTP_403_FORBIDDEN
@@ -155,13 +158,13 @@ class TeamViewSet(BaseViewSet):
     )
     def destroy(self, request, *args, **kwargs):
         team = self.get_object()
-        if not team.memberships.filter(user=request.user, role='admin').exists():
+        if not get_membership_resolver(request).is_team_admin(team):
             return Response(
                 {'error': 'Only team admins can delete team'},
                 status=status.HTTP_403_FORBIDDEN
             )
             
-        TeamActivity.objects.create(
+        log_team_activity(
             team=team,
             user=request.user,
             action='team_deleted',
@@ -204,7 +207,7 @@ class TeamViewSet(BaseViewSet):
     def add_member(self, request, pk=None):
         """Add member to team with workspace validation"""
         team = self.get_object()
-        if not team.memberships.filter(user=request.user, role='admin').exists():
+        if not get_membership_resolver(request).is_team_admin(team):
             return Response(
                 {'error': 'Only team admins can add members'},
                 status=status.HTTP_403_FORBIDDEN
@@ -234,7 +237,7 @@ class TeamViewSet(BaseViewSet):
                 role=request.data.get('role', 'viewer')
             )
             
-            TeamActivity.objects.create(
+            log_team_activity(
                 team=team,
                 user=request.user,
                 action='member_added',
@@ -262,7 +265,7 @@ class TeamViewSet(BaseViewSet):
             workspace = Workspace.objects.get(id=workspace_id)
             
             # Check if user is workspace member
-            if not workspace.members.filter(id=self.request.user.id).exists():
+            if not get_membership_resolver(self.request).is_workspace_member(workspace):
                 raise PermissionDenied("Must be a workspace member to create team")
             
             # Check workspace team limit
@@ -290,7 +293,7 @@ class TeamViewSet(BaseViewSet):
             )
             
             # Log activity
-            TeamActivity.objects.create(
+            log_team_activity(
                 team=team,
                 user=self.request.user,
                 action='team_created',
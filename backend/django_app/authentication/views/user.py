@@ -1,6 +1,8 @@
 from ..serializers.profile import UserProfileSerializer
 from ..serializers.auth import UserSerializer, UserUpdateSerializer
+from ..serializers.admin import SecurityLogSerializer
 from ..models import UserProfile, SecurityLog, APIKey
+from ..audit import log_security_event
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from django.db import transaction
@@ -89,7 +91,7 @@ class UserViewSet(BaseViewSet):
             )
             
             # Log API key generation
-            SecurityLog.objects.create(
+            log_security_event(
                 user=user,
                 action='api_key_generated',
                 details={
@@ -168,10 +170,10 @@ class UserViewSet(BaseViewSet):
         operation_description="Get user's activity history",
         manual_parameters=[
             openapi.Parameter(
-                'page',
+                'cursor',
                 openapi.IN_QUERY,
-                description="Page number",
-                type=openapi.TYPE_INTEGER
+                description="Pagination cursor from the previous response",
+                type=openapi.TYPE_STRING
             ),
             openapi.Parameter(
                 'page_size',
@@ -186,7 +188,8 @@ class UserViewSet(BaseViewSet):
                 schema=openapi.Schema(
                     type=openapi.TYPE_OBJECT,
                     properties={
-                        'count': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'next': openapi.Schema(type=openapi.TYPE_STRING),
+                        'previous': openapi.Schema(type=openapi.TYPE_STRING),
                         'results': openapi.Schema(
                             type=openapi.TYPE_ARRAY,
                             items=openapi.Schema(
@@ -208,15 +211,15 @@ class UserViewSet(BaseViewSet):
         """Get user's activity history"""
         user = self.get_object()
         
-        activities = SecurityLog.objects.filter(user=user).order_by('-created_at')
+        activities = SecurityLog.objects.filter(user=user).select_related('user')
         
         # Pagination
         page = self.paginate_queryset(activities)
         if page is not None:
-            serializer = self.get_serializer(page, many=True)
+            serializer = SecurityLogSerializer(page, many=True)
             return self.get_paginated_response(serializer.data)
         
-        serializer = self.get_serializer(activities, many=True)
+        serializer = SecurityLogSerializer(activities, many=True)
         return Response(serializer.data)
 
     @action(detail=True, methods=['post'])
@@ -230,7 +233,7 @@ class UserViewSet(BaseViewSet):
                 user.save()
                 
                 # Log account deactivation
-                SecurityLog.objects.create(
+                log_security_event(
                     user=user,
                     action='account_deactivated',
                     details={
@@ -264,7 +267,7 @@ class UserViewSet(BaseViewSet):
             user.save()
             
             # Log account reactivation
-            SecurityLog.objects.create(
+            log_security_event(
                 user=user,
                 action='account_reactivated',
                 details={
@@ -326,7 +329,7 @@ class UserViewSet(BaseViewSet):
         user.save()
         
         # Log password change
-        SecurityLog.objects.create(
+        log_security_event(
             user=user,
             action='password_changed',
             details={'changed_at': timezone.now().isoformat()}
@@ -363,10 +366,10 @@ class UserMeView(APIView):
             user_serializer.save()
             
             # Log profile update
-            SecurityLog.objects.create(
+            log_security_event(
                 user=request.user,
                 action='profile_updated',
-                details={'updated_fields': request.data.keys()}
+                details={'updated_fields': list(request.data.keys())}
             )
             
             return Response(user_serializer.data)
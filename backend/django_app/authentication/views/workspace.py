@@ -1,6 +1,5 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
-from django.db import models
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.db import transaction
@@ -9,7 +8,8 @@ from ..serializers.workspace import WorkspaceSerializer, WorkspaceMemberSerializ
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from django.utils import timezone
-from ..models.activity import SecurityLog
+from ..audit import log_security_event
+from ..membership import get_membership_resolver, user_workspaces
 from django.contrib.auth import get_user_model
 
 class WorkspaceViewSet(viewsets.ModelViewSet):
@@ -19,30 +19,9 @@ class WorkspaceViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Return workspaces where user is either member or owner"""
-        user = self.request.user
-        print(f"\nDEBUG: Authenticated User ID: {user.id}")
-        
-        # Check owner workspaces
-        owner_workspaces = Workspace.objects.filter(owner=user)
-        print(f"DEBUG: Owner Workspaces: {owner_workspaces.count()}")
-        for w in owner_workspaces:
-            print(f"Owner Workspace: {w.id} - {w.name}")
-        
-        # Check member workspaces
-        member_workspaces = Workspace.objects.filter(workspace_members__user=user)
-        print(f"DEBUG: Member Workspaces: {member_workspaces.count()}")
-        for w in member_workspaces:
-            print(f"Member Workspace: {w.id} - {w.name}")
-        
-        # Get final queryset
-        workspaces = Workspace.objects.filter(
-            models.Q(owner=user) | 
-            models.Q(workspace_members__user=user)
-        ).distinct()
-        
-        print(f"DEBUG: Final Workspaces Count: {workspaces.count()}\n")
-        
-        return workspaces
+        resolver = get_membership_resolver(self.request)
+        return user_workspaces(self.request.user, list(resolver.workspace_roles))
+
     def perform_create(self, serializer):
         """Creating new workspace and adding current user as admin"""
         with transaction.atomic():
@@ -55,7 +34,7 @@ class WorkspaceViewSet(viewsets.ModelViewSet):
             )
             
             
-            SecurityLog.objects.create(
+            log_security_event(
                 user=self.request.user,
                 action='workspace_created',
                 details={
@@ -93,11 +72,11 @@ class WorkspaceViewSet(viewsets.ModelViewSet):
         response_data = {
             'plan': workspace.plan_type,
             'members': {
-                'total': workspace.workspace_members.count(),
+                'total': workspace.member_count,
                 'limit': self._get_member_limit(workspace)
             },
             'teams': {
-                'total': workspace.workspace_teams.count(),
+                'total': workspace.team_count,
                 'limit': self._get_team_limit(workspace)
             }
         }
@@ -123,17 +102,13 @@ class WorkspaceViewSet(viewsets.ModelViewSet):
         """Add member to workspace"""
         workspace = self.get_object()
         
-        user_membership = workspace.workspace_members.filter(
-            user=request.user
-        ).first()
-        
-        if not user_membership or user_membership.role != 'admin':
+        if get_membership_resolver(request).workspace_role(workspace) != 'admin':
             return Response(
                 {'error': 'Only workspace admins can add members'},
                 status=status.HTTP_403_FORBIDDEN
             )
             
-        current_members = workspace.members.count()
+        current_members = workspace.member_count
         member_limit = self._get_member_limit(workspace)
         
         if current_members >= member_limit:
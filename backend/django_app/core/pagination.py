@@ -0,0 +1,27 @@
+from rest_framework.pagination import CursorPagination
+
+
+class DefaultCursorPagination(CursorPagination):
+    """
+    Keyset pagination for list endpoints.
+    Cursors stay cheap on large tables, unlike offset pagination.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('-created_at', '-id')
+
+
+class WorkflowTaskCursorPagination(DefaultCursorPagination):
+    """Workflow tasks are listed in execution order"""
+    ordering = ('order', 'id')
+
+
+class WebhookLogCursorPagination(DefaultCursorPagination):
+    """Webhook logs are listed newest first"""
+    ordering = ('-timestamp', '-id')
+
+
+class WorkflowRunCursorPagination(DefaultCursorPagination):
+    """Workflow runs are listed most recent first"""
+    ordering = ('-started_at', '-id')
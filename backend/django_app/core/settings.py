@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
 import os
+import sys
 from pathlib import Path
 from dotenv import load_dotenv
 from datetime import timedelta
@@ -21,6 +22,12 @@ load_dotenv()
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# backend/shared holds code used by both the Django and FastAPI services
+if str(BASE_DIR.parent) not in sys.path:
+    sys.path.append(str(BASE_DIR.parent))
+
+from shared.config.settings import get_settings as get_service_settings
+
 BASE_URL = os.getenv('BASE_URL', default='http://localhost:8000')
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.1/howto/deployment/checklist/
@@ -31,6 +38,9 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = os.getenv("DEBUG", "False") == "True"
 
+# Running under the test runner
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
+
 #Hosts allowed to access the application
 ALLOWED_HOSTS = ['localhost', '127.0.0.1']
 
@@ -146,6 +156,128 @@ WORKFLOW_LIMITS = {
 }
 DEFAULT_WORKFLOW_LIMIT = 10
 
+# Activity log exports
+ACTIVITY_EXPORT_DIR = os.getenv('ACTIVITY_EXPORT_DIR', os.path.join(BASE_DIR, 'exports'))
+ACTIVITY_EXPORT_CHUNK_SIZE = 2000
+# Download tokens are valid for a day; export files older than that are
+# deleted hourly by Celery beat
+ACTIVITY_EXPORT_TOKEN_MAX_AGE = 60 * 60 * 24
+
+# Admin analytics snapshots are refreshed hourly by Celery beat; endpoints
+# rebuild them inline only when older than this many seconds
+ANALYTICS_SNAPSHOT_MAX_AGE = 60 * 60 * 2
+
+# Bulk admin user operations: selections larger than the threshold run
+# as a Celery job; each batch is one UPDATE plus one audit log INSERT
+BULK_USER_ASYNC_THRESHOLD = 1000
+BULK_USER_BATCH_SIZE = 1000
+
+# Audit logs (SecurityLog, TeamActivity, LoginHistory) are buffered in
+# process and written with bulk_create by a background thread; critical
+# security events are always written inline. Tests write synchronously so no
+# writer outlives the test database
+AUDIT_LOG_ASYNC = os.getenv('AUDIT_LOG_ASYNC', 'True') == 'True' and not TESTING
+AUDIT_LOG_BATCH_SIZE = 200
+AUDIT_LOG_FLUSH_INTERVAL = 2.0  # seconds
+
+# Transactional email outbox: emails are stored on commit and delivered by
+# a Celery worker, one SMTP connection per batch, with exponential backoff.
+# Sent emails lose their body; sent and failed rows are deleted after
+# EMAIL_OUTBOX_RETENTION
+EMAIL_OUTBOX_BATCH_SIZE = 100
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_DELAY = 60  # seconds, doubled on every attempt
+EMAIL_OUTBOX_DISPATCH_DELAY = 2  # seconds to coalesce bursts into one run
+EMAIL_OUTBOX_STALE_AFTER = 60 * 10  # seconds before a claimed batch is retried
+EMAIL_OUTBOX_RETENTION = 60 * 60 * 24 * 7  # seconds
+
+# Per-user workspace/team membership sets are cached for this many seconds
+# and invalidated by membership signals. Only with a shared cache (CACHE_URL):
+# a process-local cache would miss invalidations made by other workers
+MEMBERSHIP_CACHE_TIMEOUT = 60 * 5
+
+# API key authentication resolves keys by SHA-256 hash and keeps them in an
+# in-process cache; revoked keys stop working in other processes within
+# API_KEY_CACHE_TTL seconds. last_used is written in batches.
+API_KEY_CACHE_TTL = 30
+API_KEY_CACHE_SIZE = 10000
+API_KEY_LAST_USED_FLUSH_INTERVAL = 60
+
+# Verified access tokens are cached until they expire; revoked token IDs and
+# current user claims are shared with the FastAPI service through Redis,
+# configured once in the shared service settings (AUTH_REDIS_URL)
+AUTH_REDIS_URL = get_service_settings().AUTH_REDIS_URL
+JWT_VERIFY_CACHE_SIZE = 10000
+
+# Published user claims are refreshed on every login and token refresh, so
+# this must exceed SIMPLE_JWT['ACCESS_TOKEN_LIFETIME']
+USER_CLAIMS_TTL = 60 * 60 * 24
+
+# Failed-login limits as (max failures, window in seconds), counted in Redis
+# sliding windows per account, per client IP and per /24 (IPv6 /64) subnet
+LOGIN_THROTTLE_LIMITS = {
+    'user': (5, 60 * 30),
+    'ip': (20, 60 * 30),
+    'subnet': (100, 60 * 30),
+}
+
+# Reverse proxies in front of Django that append to X-Forwarded-For. The
+# client IP is the address the outermost of them saw; with 0, REMOTE_ADDR
+# is used and X-Forwarded-For (client-controlled) is ignored
+TRUSTED_PROXY_COUNT = int(os.getenv('TRUSTED_PROXY_COUNT', 0))
+
+# Workflow execution: steps whose dependencies are done run concurrently, at
+# most WORKFLOW_MAX_PARALLEL_STEPS at a time per run; run state is kept in
+# Redis for WORKFLOW_STATE_TTL seconds
+WORKFLOW_MAX_PARALLEL_STEPS = 10
+WORKFLOW_STATE_TTL = 60 * 60 * 24
+
+# AI steps run on the ai_tasks queue; the workflow waits up to
+# WORKFLOW_AI_STEP_TIMEOUT seconds for the result (polling the result
+# backend every WORKFLOW_AI_POLL_INTERVAL seconds) unless the step sets its
+# own timeout
+WORKFLOW_AI_STEP_TIMEOUT = 60 * 10
+WORKFLOW_AI_POLL_INTERVAL = 0.5
+
+# State history per workflow run: newest WORKFLOW_STATE_HISTORY_LIMIT entries,
+# stored as JSON patches with a full snapshot every
+# WORKFLOW_STATE_SNAPSHOT_INTERVAL versions
+WORKFLOW_STATE_HISTORY_LIMIT = 100
+WORKFLOW_STATE_SNAPSHOT_INTERVAL = 10
+
+# Compiled workflow plans are cached per process (LRU) and in Redis,
+# versioned by Workflow.updated_at and invalidated on workflow/task saves
+WORKFLOW_PLAN_CACHE_SIZE = 1000
+WORKFLOW_PLAN_CACHE_TTL = 60 * 60 * 24
+
+# Step results are memoized by (step config, input) hash. Step types listed
+# here are memoized by default for that many seconds; other steps (e.g.
+# transformers, HTTP actions) opt in with config['memoize'] and any step can
+# opt out with memoize: false. AI steps wait for the AI worker's result, so
+# the same prompt on the same input is served from the memo
+WORKFLOW_MEMO_TTLS = {
+    'ai_process': 60 * 60,
+}
+WORKFLOW_MEMO_DEFAULT_TTL = 60 * 5
+
+# Finished runs are recorded in WorkflowRun/WorkflowStepRun; their input and
+# output payloads are kept out of line in Redis for WORKFLOW_RUN_PAYLOAD_TTL
+# seconds and referenced from the rows
+WORKFLOW_RUN_PAYLOAD_TTL = 60 * 60 * 24 * 7
+
+# Workflow schedules (cron/interval triggers): one beat task ticks every
+# WORKFLOW_SCHEDULER_TICK seconds and fires due schedules from a Redis sorted
+# set, at most WORKFLOW_SCHEDULER_BATCH_SIZE per claim, holding a
+# WORKFLOW_SCHEDULER_LEASE-second lease. Fires are spread over up to
+# WORKFLOW_SCHEDULE_JITTER seconds per schedule; runs firing later than
+# WORKFLOW_SCHEDULE_MISFIRE_GRACE seconds after their jittered time are skipped
+WORKFLOW_SCHEDULER_TICK = 5.0
+WORKFLOW_SCHEDULER_LEASE = 30
+WORKFLOW_SCHEDULER_BATCH_SIZE = 500
+WORKFLOW_SCHEDULE_JITTER = 10
+WORKFLOW_SCHEDULE_MIN_INTERVAL = 60
+WORKFLOW_SCHEDULE_MISFIRE_GRACE = 60 * 5
+
 # Email Configuration
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'  # For development
 # DEFAULT_FROM_EMAIL = 'noreply@aizapier.com'
@@ -334,6 +466,19 @@ DATABASES = {
     }
 }
 
+# Cache shared by all processes (per-user membership lookups, task
+# dispatch coalescing); falls back to local memory when CACHE_URL is unset,
+# in which case membership roles are not cached at all
+CACHE_URL = os.getenv('CACHE_URL')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': CACHE_URL,
+    } if CACHE_URL else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -379,7 +524,8 @@ CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND', 'redis://localhost:63
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authentication.jwt.CachedJWTAuthentication',
+        'authentication.api_keys.APIKeyAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -399,6 +545,8 @@ REST_FRAMEWORK = {
         'rest_framework.parsers.FormParser',
         'rest_framework.parsers.MultiPartParser',
     ],
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.DefaultCursorPagination',
+    'PAGE_SIZE': 50,
     'DEFAULT_VERSIONING_CLASS': 'rest_framework.versioning.URLPathVersioning',
     'DEFAULT_VERSION': 'v1',
     'ALLOWED_VERSIONS': ['v1'],
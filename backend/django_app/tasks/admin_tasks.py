@@ -0,0 +1,33 @@
+from .base import BaseTask
+from celery import shared_task
+from typing import Dict, Any, List
+from authentication.bulk import run_bulk_operation
+
+@shared_task(
+    bind=True,
+    base=BaseTask,
+    name='tasks.bulk_user_operation',
+    queue='default'
+)
+def bulk_user_operation(
+    self,
+    operation: str,
+    user_ids: List[str],
+    data: Dict[str, Any],
+    performed_by_id: str
+) -> Dict[str, Any]:
+    """Run a bulk admin user operation, reporting progress through task state"""
+    def report_progress(done: int, total: int):
+        self.update_state(
+            state='PROGRESS',
+            meta={'done': done, 'total': total}
+        )
+
+    result = run_bulk_operation(
+        operation,
+        user_ids,
+        data,
+        performed_by_id,
+        on_progress=report_progress
+    )
+    return {'success': True, **result}
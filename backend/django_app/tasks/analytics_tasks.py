@@ -0,0 +1,22 @@
+from .base import BaseTask
+from celery import shared_task
+from typing import Dict, Any
+from authentication.analytics import SNAPSHOT_BUILDERS, refresh_snapshot, rebuild_daily_metrics
+
+@shared_task(
+    bind=True,
+    base=BaseTask,
+    name='tasks.refresh_admin_analytics',
+    queue='default'
+)
+def refresh_admin_analytics(self, days: int = 2) -> Dict[str, Any]:
+    """Reconcile recent daily counters and rebuild admin analytics snapshots"""
+    try:
+        rebuild_daily_metrics(days)
+        refreshed = [refresh_snapshot(name).name for name in SNAPSHOT_BUILDERS]
+        return {
+            'status': 'success',
+            'snapshots': refreshed
+        }
+    except Exception as exc:
+        self.retry(exc=exc, countdown=300, max_retries=2)
@@ -1,5 +1,6 @@
 from celery import Celery
-from celery.signals import task_success, task_failure, task_retry
+from celery.schedules import crontab
+from celery.signals import task_success, task_failure, task_retry, worker_process_shutdown
 from django.conf import settings
 from typing import Dict, Any
 import logging
@@ -14,6 +15,12 @@ app = Celery('zapnium')
 app.config_from_object(settings, namespace='CELERY')
 app.autodiscover_tasks(lambda:settings.INSTALLED_APPS)
 
+@worker_process_shutdown.connect
+def flush_audit_logs(**kwargs):
+    """Prefork children exit without running atexit handlers"""
+    from authentication.audit import audit_log_writer
+    audit_log_writer.close()
+
 class TaskPriority:
     HIGH = 'high'
     NORMAL = 'normal'
@@ -56,6 +63,32 @@ app.conf.update(
     task_annotations={
         'tasks.ai.*': {'rate_limit': '10/m'},
         'tasks.webhook.*': {'rate_limit': '30/m'}
+    },
+    
+    # Periodic tasks
+    beat_schedule={
+        'refresh-admin-analytics': {
+            'task': 'tasks.refresh_admin_analytics',
+            'schedule': crontab(minute=0),
+        },
+        'sweep-email-outbox': {
+            'task': 'tasks.send_outbox_emails',
+            'schedule': 60.0,
+        },
+        'cleanup-activity-exports': {
+            'task': 'tasks.cleanup_activity_exports',
+            'schedule': crontab(minute=30),
+        },
+        # One entry drives every workflow schedule (see WorkflowScheduler)
+        'tick-workflow-schedules': {
+            'task': 'tasks.workflow_schedule_tick',
+            'schedule': settings.WORKFLOW_SCHEDULER_TICK,
+            'options': {'expires': settings.WORKFLOW_SCHEDULER_TICK},
+        },
+        'sync-workflow-schedules': {
+            'task': 'tasks.workflow_schedule_sync',
+            'schedule': crontab(minute='*/15'),
+        },
     }
 )
 
@@ -0,0 +1,20 @@
+from .base import BaseTask
+from celery import shared_task
+from typing import Dict, Any
+from authentication.outbox import purge_finished_emails, release_stale_claims, send_pending_emails
+
+@shared_task(
+    bind=True,
+    base=BaseTask,
+    name='tasks.send_outbox_emails',
+    queue='default'
+)
+def send_outbox_emails(self) -> Dict[str, Any]:
+    """Deliver pending transactional emails from the outbox and purge old ones"""
+    try:
+        released = release_stale_claims()
+        result = send_pending_emails()
+        purged = purge_finished_emails()
+        return {'status': 'success', 'released': released, 'purged': purged, **result}
+    except Exception as exc:
+        self.retry(exc=exc, countdown=60, max_retries=3)
@@ -0,0 +1,43 @@
+from .base import BaseTask
+from celery import shared_task
+from typing import Dict, Any, Optional
+from authentication.exports import cleanup_exports, mark_export_failed, write_export
+
+@shared_task(
+    bind=True,
+    base=BaseTask,
+    name='tasks.export_activity_logs',
+    queue='default'
+)
+def export_activity_logs(
+    self,
+    filename: str,
+    export_format: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    compress: bool = False
+) -> Dict[str, Any]:
+    """Write an activity log export to disk for later download"""
+    try:
+        path = write_export(filename, export_format, start_date, end_date, compress)
+        return {
+            'status': 'success',
+            'filename': filename,
+            'path': path
+        }
+    except Exception as exc:
+        if self.request.retries >= 2:
+            # Out of retries: let download_export report it instead of 'pending'
+            mark_export_failed(filename, str(exc))
+            raise
+        self.retry(exc=exc, countdown=60, max_retries=2)
+
+@shared_task(
+    bind=True,
+    base=BaseTask,
+    name='tasks.cleanup_activity_exports',
+    queue='default'
+)
+def cleanup_activity_exports(self) -> Dict[str, Any]:
+    """Delete export files whose download tokens have expired"""
+    return {'status': 'success', 'removed': cleanup_exports()}
@@ -1,72 +1,84 @@
-# # backend/django_app/tasks/workflow_tasks.py
+# backend/django_app/tasks/workflow_tasks.py
 
-# from .base import BaseTask
-# from celery import shared_task, chain
-# from typing import Dict, Any, List
-# from django.conf import settings
+from .base import BaseTask
+from celery import shared_task
+from typing import Dict, Any
+import logging
 
-# @shared_task(
-#     bind=True,
-#     base=BaseTask,
-#     name='tasks.workflow_execute',
-#     queue='workflow_tasks'
-# )
-# def execute_workflow(self, task_data: Dict[str, Any]) -> Dict[str, Any]:
-#     """Execute complete workflow"""
-#     try:
-#         workflow_id = task_data.get('workflow_id')
-#         workflow_data = task_data.get('workflow_data')
-        
-#         # Create task chain based on workflow steps
-#         task_chain = _create_task_chain(workflow_data['steps'])
-        
-#         # Execute the chain
-#         result = task_chain.apply_async()
-        
-#         return {
-#             'status': 'success',
-#             'workflow_id': workflow_id,
-#             'chain_id': result.id
-#         }
-        
-#     except Exception as exc:
-#         self.retry(exc=exc, countdown=60, max_retries=3)
+logger = logging.getLogger(__name__)
 
-# def _create_task_chain(steps: List[Dict[str, Any]]) -> chain:
-#     """Create a chain of tasks from workflow steps"""
-#     task_chain = []
-    
-#     for step in steps:
-#         if step['type'] == 'ai_process':
-#             task_chain.append(process_ai_request.s(step['config']))
-#         elif step['type'] == 'webhook':
-#             task_chain.append(process_webhook.s(step['config']))
-#         elif step['type'] == 'transform':
-#             task_chain.append(transform_data.s(step['config']))
-            
-#     return chain(*task_chain)
+@shared_task(
+    bind=True,
+    base=BaseTask,
+    name='tasks.workflow_execute',
+    queue='workflow_tasks'
+)
+def execute_workflow(self, task_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Execute a workflow run: plan the workflow (from the plan cache) and run
+    its DAG, independent branches concurrently, persisting step state in Redis.
+    Only planning is retried; once steps have started, their side effects
+    must not be repeated, so a failure ends the run as failed.
+    """
+    from workflow_engine.models import Workflow
+    from workflow_engine.execution.dag import WorkflowCompileError
+    from workflow_engine.execution.executor import run_plan, run_async
+    from workflow_engine.execution.plan_cache import plan_cache
 
-# @shared_task(
-#     bind=True,
-#     base=BaseTask,
-#     name='tasks.workflow_step',
-#     queue='workflow_tasks'
-# )
-# def execute_workflow_step(self, step_data: Dict[str, Any]) -> Dict[str, Any]:
-#     """Execute individual workflow step"""
-#     try:
-#         step_type = step_data.get('type')
-#         step_config = step_data.get('config')
-        
-#         # Execute step based on type
-#         if step_type == 'ai_process':
-#             return process_ai_request.delay(step_config)
-#         elif step_type == 'webhook':
-#             return process_webhook.delay(step_config)
-#         elif step_type == 'transform':
-#             return transform_data.delay(step_config)
-#         else:
-#             raise ValueError(f"Unknown step type: {step_type}")
-            
-#     except Exception as exc:
-#         self.retry(exc=exc, countdown=60, max_retries=3)
\ No newline at end of file
+    workflow_id = task_data.get('workflow_id')
+    run_id = task_data.get('run_id')
+    try:
+        plan = run_async(plan_cache.get_plan(workflow_id))
+    except Workflow.DoesNotExist:
+        logger.warning(f"Workflow {workflow_id} not found; run skipped")
+        return {'status': 'skipped', 'workflow_id': workflow_id}
+    except WorkflowCompileError as e:
+        logger.error(f"Workflow {workflow_id} cannot be executed: {str(e)}")
+        return {'status': 'invalid', 'workflow_id': workflow_id, 'error': str(e)}
+    except Exception as exc:
+        # Nothing has run yet (e.g. Redis or the database was unavailable)
+        self.retry(exc=exc, countdown=60, max_retries=3)
+
+    try:
+        return run_async(run_plan(plan, task_data.get('payload') or {}, run_id=run_id))
+    except Exception as e:
+        logger.error(f"Workflow {workflow_id} run {run_id} failed: {str(e)}", exc_info=True)
+        return {'status': 'failed', 'workflow_id': workflow_id, 'run_id': run_id, 'error': str(e)}
+
+@shared_task(
+    bind=True,
+    base=BaseTask,
+    name='tasks.workflow_schedule_tick',
+    queue='workflow_tasks'
+)
+def tick_workflow_schedules(self) -> Dict[str, Any]:
+    """
+    Fire due workflow schedules; run every WORKFLOW_SCHEDULER_TICK seconds
+    by beat. Overlapping ticks on other replicas skip.
+    """
+    from workflow_engine.scheduling.scheduler import workflow_scheduler
+
+    try:
+        return workflow_scheduler.tick()
+    except Exception as e:
+        # The next tick picks up whatever is still due
+        logger.error(f"Workflow schedule tick failed: {str(e)}", exc_info=True)
+        return {'status': 'failed', 'error': str(e)}
+
+@shared_task(
+    bind=True,
+    base=BaseTask,
+    name='tasks.workflow_schedule_sync',
+    queue='workflow_tasks'
+)
+def sync_workflow_schedules(self) -> Dict[str, Any]:
+    """
+    Rebuild the Redis due set from Postgres (after a Redis flush, a
+    crashed tick or workflows being re-activated)
+    """
+    from workflow_engine.scheduling.scheduler import workflow_scheduler
+
+    try:
+        return workflow_scheduler.sync()
+    except Exception as exc:
+        self.retry(exc=exc, countdown=60, max_retries=3)
@@ -0,0 +1,202 @@
+# backend/django_app/workflow_engine/execution/dag.py
+
+from typing import Dict, Any, List, Optional, Iterable, Callable
+from dataclasses import dataclass, field
+from collections import deque
+
+STEP_TYPES = ('trigger', 'action', 'condition', 'transformer', 'ai_process')
+
+class WorkflowCompileError(ValueError):
+    """Raised when a workflow definition cannot be turned into a DAG"""
+    pass
+
+@dataclass
+class Step:
+    """
+    One node of a compiled workflow. ``branches`` maps a condition step
+    this step depends on to the outcome ('true'/'false') it must produce
+    for this step to run. ``handler`` and ``compiled`` (pre-parsed
+    expressions) are filled in when a plan is prepared for execution.
+    """
+    id: str
+    name: str
+    task_type: str
+    config: Dict[str, Any] = field(default_factory=dict)
+    depends_on: List[str] = field(default_factory=list)
+    branches: Dict[str, str] = field(default_factory=dict)
+    handler: Optional[Callable] = field(default=None, repr=False, compare=False)
+    compiled: Dict[str, Any] = field(default_factory=dict, repr=False, compare=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'name': self.name,
+            'task_type': self.task_type,
+            'config': self.config,
+            'depends_on': self.depends_on,
+            'branches': self.branches,
+        }
+
+@dataclass
+class ExecutionPlan:
+    """Steps of a workflow in topological order, with their dependents"""
+    workflow_id: str
+    steps: Dict[str, Step]
+    order: List[str]
+    dependents: Dict[str, List[str]]
+    version: str = ''
+    is_active: bool = True
+    owner_id: Optional[str] = None
+
+    @property
+    def roots(self) -> List[str]:
+        return [step_id for step_id in self.order if not self.steps[step_id].depends_on]
+
+    @property
+    def sinks(self) -> List[str]:
+        return [step_id for step_id in self.order if not self.dependents[step_id]]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable form, in topological order"""
+        return {
+            'workflow_id': self.workflow_id,
+            'version': self.version,
+            'is_active': self.is_active,
+            'owner_id': self.owner_id,
+            'steps': [self.steps[step_id].to_dict() for step_id in self.order],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ExecutionPlan':
+        steps = {step['id']: Step(**step) for step in data['steps']}
+        plan = build_plan(data['workflow_id'], steps, version=data.get('version', ''))
+        plan.is_active = data.get('is_active', True)
+        plan.owner_id = data.get('owner_id')
+        return plan
+
+def _steps_from_graph(workflow_data: Dict[str, Any]) -> Dict[str, Step]:
+    """Steps from the builder's ``{'nodes': [...], 'edges': [...]}`` document"""
+    steps = {}
+    for node in workflow_data.get('nodes', []):
+        node_id = str(node.get('id', ''))
+        if not node_id:
+            raise WorkflowCompileError("Workflow node without an id")
+        if node_id in steps:
+            raise WorkflowCompileError(f"Duplicate workflow node {node_id}")
+        data = node.get('data') or {}
+        steps[node_id] = Step(
+            id=node_id,
+            name=data.get('label') or node_id,
+            task_type=node.get('type'),
+            config=data.get('config') or {}
+        )
+
+    for edge in workflow_data.get('edges', []):
+        source, target = str(edge.get('source')), str(edge.get('target'))
+        if source not in steps or target not in steps:
+            raise WorkflowCompileError(f"Edge {source} -> {target} references an unknown node")
+        step = steps[target]
+        if source not in step.depends_on:
+            step.depends_on.append(source)
+        if steps[source].task_type == 'condition' and edge.get('sourceHandle') in ('true', 'false'):
+            step.branches[source] = edge['sourceHandle']
+    return steps
+
+def _steps_from_tasks(tasks: Iterable) -> Dict[str, Step]:
+    """
+    Steps from ``WorkflowTask`` rows. Explicit ``config['depends_on']``
+    (task ids or names) wins; otherwise tasks sharing an ``order`` value
+    run in parallel after every task of the previous order.
+    """
+    tasks = list(tasks)
+    by_name = {task.name: str(task.pk) for task in tasks}
+    steps = {}
+    previous_level, current_level, current_order = [], [], None
+
+    for task in sorted(tasks, key=lambda task: (task.order, task.pk)):
+        if task.order != current_order:
+            previous_level, current_level, current_order = current_level or previous_level, [], task.order
+
+        config = dict(task.config or {})
+        explicit = config.pop('depends_on', None)
+        branches = dict(config.pop('branches', None) or {})
+        if explicit is not None:
+            depends_on = []
+            for ref in explicit:
+                step_id = str(ref) if str(ref) in by_name.values() else by_name.get(ref)
+                if step_id is None:
+                    raise WorkflowCompileError(f"Task {task.name} depends on unknown task {ref}")
+                depends_on.append(step_id)
+        else:
+            depends_on = list(previous_level)
+
+        step_id = str(task.pk)
+        steps[step_id] = Step(
+            id=step_id,
+            name=task.name,
+            task_type=task.task_type,
+            config=config,
+            depends_on=depends_on,
+            branches=branches
+        )
+        current_level.append(step_id)
+    return steps
+
+def topological_order(steps: Dict[str, Step]) -> List[str]:
+    """Kahn's algorithm; raises WorkflowCompileError on cycles"""
+    indegree = {step_id: len(step.depends_on) for step_id, step in steps.items()}
+    dependents = {step_id: [] for step_id in steps}
+    for step in steps.values():
+        for dependency in step.depends_on:
+            dependents[dependency].append(step.id)
+
+    ready = deque(step_id for step_id, degree in indegree.items() if degree == 0)
+    order = []
+    while ready:
+        step_id = ready.popleft()
+        order.append(step_id)
+        for dependent in dependents[step_id]:
+            indegree[dependent] -= 1
+            if indegree[dependent] == 0:
+                ready.append(dependent)
+
+    if len(order) != len(steps):
+        cyclic = sorted(step_id for step_id, degree in indegree.items() if degree)
+        raise WorkflowCompileError(f"Workflow contains a cycle through steps {', '.join(cyclic)}")
+    return order
+
+def build_plan(workflow_id: str, steps: Dict[str, Step], version: str = '') -> ExecutionPlan:
+    for step in steps.values():
+        if step.task_type not in STEP_TYPES:
+            raise WorkflowCompileError(f"Unknown step type {step.task_type!r} for step {step.id}")
+        for dependency in step.depends_on:
+            if dependency not in steps:
+                raise WorkflowCompileError(f"Step {step.id} depends on unknown step {dependency}")
+
+    order = topological_order(steps)
+    dependents = {step_id: [] for step_id in order}
+    for step_id in order:
+        for dependency in steps[step_id].depends_on:
+            dependents[dependency].append(step_id)
+    return ExecutionPlan(str(workflow_id), steps, order, dependents, version=version)
+
+def plan_version(workflow) -> str:
+    """Plans are versioned by the workflow's last modification"""
+    return workflow.updated_at.isoformat() if workflow.updated_at else ''
+
+def compile_workflow(workflow, tasks: Optional[Iterable] = None) -> ExecutionPlan:
+    """
+    Compile a ``Workflow`` into an ExecutionPlan: from the builder graph in
+    ``workflow_data`` when it has nodes, otherwise from its active tasks
+    """
+    workflow_data = workflow.workflow_data or {}
+    if workflow_data.get('nodes'):
+        steps = _steps_from_graph(workflow_data)
+    else:
+        if tasks is None:
+            tasks = workflow.tasks.filter(is_active=True)
+        steps = _steps_from_tasks(tasks)
+    plan = build_plan(workflow.pk, steps, version=plan_version(workflow))
+    plan.is_active = workflow.is_active
+    plan.owner_id = str(workflow.created_by_id)
+    return plan
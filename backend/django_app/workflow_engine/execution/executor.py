@@ -0,0 +1,272 @@
+# backend/django_app/workflow_engine/execution/executor.py
+
+from typing import Dict, Any, List, Optional
+from datetime import datetime, timezone
+import asyncio
+import logging
+import os
+import time
+import uuid
+from django.conf import settings
+from ..transformers.data_transformers import DataTransformer
+from .dag import ExecutionPlan, Step
+from .handlers import STEP_HANDLERS
+from .plan_cache import plan_cache
+from .memo import StepMemo
+from .history import RunRecorder, run_recorder
+
+logger = logging.getLogger(__name__)
+
+def run_state_id(workflow_id: str, run_id: str) -> str:
+    """Identifier a run's state is saved under in WorkflowStateManager"""
+    return f"{workflow_id}:{run_id}"
+
+class WorkflowExecutor:
+    """
+    Runs an ExecutionPlan on one event loop. Every step starts as soon as
+    all of its dependencies have finished, so independent branches run
+    concurrently (at most ``max_parallel`` steps at a time). A step's input
+    is the output of its single dependency, ``{step_id: output}`` for
+    several, or the trigger payload for roots; ``config['transform']`` rules
+    are applied to it through DataTransformer before the step runs. With a
+    StepMemo, results of memoizable steps are reused for identical
+    (config, input) pairs, and with a RunRecorder finished runs are
+    written to WorkflowRun/WorkflowStepRun.
+
+    Steps downstream of a failed, skipped or not-taken condition branch are
+    skipped; after a failure no new steps are started.
+    """
+
+    def __init__(
+        self,
+        plan: ExecutionPlan,
+        state_manager=None,
+        transformer: Optional[DataTransformer] = None,
+        handlers: Optional[Dict[str, Any]] = None,
+        max_parallel: Optional[int] = None,
+        memo: Optional[StepMemo] = None,
+        recorder: Optional[RunRecorder] = None
+    ):
+        self.plan = plan
+        self.state_manager = state_manager
+        self.transformer = transformer or DataTransformer()
+        self.handlers = handlers
+        self.max_parallel = max_parallel or settings.WORKFLOW_MAX_PARALLEL_STEPS
+        self.memo = memo
+        self.recorder = recorder
+
+    async def run(self, payload: Any, run_id: Optional[str] = None) -> Dict[str, Any]:
+        run_id = run_id or str(uuid.uuid4())
+        started_at = datetime.now(timezone.utc)
+        context = {
+            'workflow_id': self.plan.workflow_id,
+            'run_id': run_id,
+            'transformer': self.transformer,
+        }
+        semaphore = asyncio.Semaphore(self.max_parallel)
+        results: Dict[str, Dict[str, Any]] = {}
+        remaining = {step_id: len(step.depends_on) for step_id, step in self.plan.steps.items()}
+        ready: List[str] = list(self.plan.roots)
+        running: Dict[asyncio.Task, str] = {}
+        failed = False
+
+        self._persist_enabled = self.state_manager is not None
+        await self._persist(run_id, 'running', results)
+
+        while ready or running:
+            while ready and not failed:
+                step = self.plan.steps[ready.pop(0)]
+                if self._should_skip(step, results):
+                    results[step.id] = {'status': 'skipped'}
+                    ready.extend(self._release(step.id, remaining))
+                    continue
+                task = asyncio.create_task(
+                    self._run_step(step, self._step_input(step, results, payload), context, semaphore)
+                )
+                running[task] = step.id
+
+            if not running:
+                break
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                step_id = running.pop(task)
+                results[step_id] = task.result()
+                if results[step_id]['status'] == 'failed':
+                    failed = True
+                ready.extend(self._release(step_id, remaining))
+            await self._persist(run_id, 'running', results)
+
+        for step_id in self.plan.order:
+            results.setdefault(step_id, {'status': 'cancelled'})
+
+        status = 'failed' if failed else 'completed'
+        await self._persist(run_id, status, results)
+        outputs = {
+            step_id: results[step_id]['output']
+            for step_id in self.plan.sinks
+            if results[step_id]['status'] == 'completed'
+        }
+        if self.recorder is not None:
+            await self.recorder.record(
+                self.plan, run_id, payload, results, outputs, status,
+                started_at, datetime.now(timezone.utc)
+            )
+        return {
+            'run_id': run_id,
+            'workflow_id': self.plan.workflow_id,
+            'status': status,
+            'steps': self._step_summaries(results),
+            'outputs': outputs
+        }
+
+    def _release(self, step_id: str, remaining: Dict[str, int]) -> List[str]:
+        """Dependents of ``step_id`` whose last dependency just finished"""
+        released = []
+        for dependent in self.plan.dependents[step_id]:
+            remaining[dependent] -= 1
+            if remaining[dependent] == 0:
+                released.append(dependent)
+        return released
+
+    def _handler_for(self, step: Step):
+        """Explicit handlers win over those resolved when the plan was prepared"""
+        if self.handlers is not None:
+            return self.handlers.get(step.task_type)
+        return step.handler or STEP_HANDLERS.get(step.task_type)
+
+    def _should_skip(self, step: Step, results: Dict[str, Dict[str, Any]]) -> bool:
+        for dependency in step.depends_on:
+            result = results[dependency]
+            if result['status'] != 'completed':
+                return True
+            branch = step.branches.get(dependency)
+            if branch is not None and result.get('branch') != branch:
+                return True
+        return False
+
+    def _step_input(self, step: Step, results: Dict[str, Dict[str, Any]], payload: Any) -> Any:
+        if not step.depends_on:
+            return payload
+        if len(step.depends_on) == 1:
+            return results[step.depends_on[0]]['output']
+        return {dependency: results[dependency]['output'] for dependency in step.depends_on}
+
+    async def _run_step(
+        self,
+        step: Step,
+        data: Any,
+        context: Dict[str, Any],
+        semaphore: asyncio.Semaphore
+    ) -> Dict[str, Any]:
+        async with semaphore:
+            started_at, started = datetime.now(timezone.utc).isoformat(), time.monotonic()
+            result = {'status': 'completed', 'started_at': started_at}
+            try:
+                handler = self._handler_for(step)
+                if handler is None:
+                    raise ValueError(f"No handler for step type {step.task_type}")
+
+                if step.compiled.get('transform') is not None:
+                    data = await step.compiled['transform'].transform(data)
+                elif step.config.get('transform'):
+                    data = await self.transformer.transform(data, step.config['transform'])
+
+                ttl = self.memo.ttl_for(step) if self.memo is not None else None
+                hit = False
+                if ttl:
+                    memo_key = self.memo.key(step, data)
+                    hit, output = await self.memo.lookup(step, memo_key)
+                    result['memoized'] = hit
+
+                if not hit:
+                    coroutine = handler(step, data, context)
+                    timeout = step.config.get('timeout')
+                    output = await (asyncio.wait_for(coroutine, timeout) if timeout else coroutine)
+                    if ttl:
+                        await self.memo.store(memo_key, output, ttl)
+
+                if step.task_type == 'condition':
+                    result.update(output=data, branch='true' if output else 'false')
+                else:
+                    result['output'] = output
+            except Exception as e:
+                logger.warning(
+                    f"Workflow {self.plan.workflow_id} step {step.id} failed: {str(e)}",
+                    exc_info=True
+                )
+                result.update(status='failed', error=str(e))
+
+            result.update(
+                finished_at=datetime.now(timezone.utc).isoformat(),
+                duration_ms=int((time.monotonic() - started) * 1000)
+            )
+            return result
+
+    def _step_summaries(self, results: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        return {
+            step_id: {key: value for key, value in result.items() if key != 'output'}
+            for step_id, result in results.items()
+        }
+
+    async def _persist(self, run_id: str, status: str, results: Dict[str, Dict[str, Any]]):
+        """Save run state; a state store outage stops persisting but not the run"""
+        if not self._persist_enabled:
+            return
+        state = {
+            'workflow_id': self.plan.workflow_id,
+            'run_id': run_id,
+            'user_id': self.plan.owner_id,
+            'status': status,
+            'steps': self._step_summaries(results),
+        }
+        try:
+            await self.state_manager.save_workflow_state(
+                run_state_id(self.plan.workflow_id, run_id),
+                state,
+                expires=settings.WORKFLOW_STATE_TTL
+            )
+        except Exception as e:
+            logger.warning(f"Failed to persist state for workflow run {run_id}: {str(e)}")
+            self._persist_enabled = False
+
+_loop = None
+_loop_pid = None
+
+def run_async(coroutine):
+    """
+    Run a coroutine to completion on this process's event loop. Reusing one
+    loop (instead of ``asyncio.run`` per call) keeps Redis connection pools
+    of process-level clients valid between workflow runs.
+    """
+    global _loop, _loop_pid
+    if _loop is None or _loop.is_closed() or _loop_pid != os.getpid():
+        _loop, _loop_pid = asyncio.new_event_loop(), os.getpid()
+    return _loop.run_until_complete(coroutine)
+
+_state_manager = None
+step_memo = StepMemo()
+
+def get_state_manager():
+    global _state_manager
+    if _state_manager is None:
+        from redis_service.state.workflow_state_manager import WorkflowStateManager
+        _state_manager = WorkflowStateManager(
+            history_limit=settings.WORKFLOW_STATE_HISTORY_LIMIT,
+            snapshot_interval=settings.WORKFLOW_STATE_SNAPSHOT_INTERVAL
+        )
+    return _state_manager
+
+async def execute_workflow_run(workflow_id, payload: Any, run_id: Optional[str] = None) -> Dict[str, Any]:
+    """Plan (from the plan cache) and run a workflow"""
+    plan = await plan_cache.get_plan(workflow_id)
+    return await run_plan(plan, payload, run_id=run_id)
+
+async def run_plan(plan: ExecutionPlan, payload: Any, run_id: Optional[str] = None) -> Dict[str, Any]:
+    """Run an already planned workflow with the process-wide state, memo and recorder"""
+    if not plan.is_active:
+        return {'status': 'skipped', 'workflow_id': plan.workflow_id, 'reason': 'inactive'}
+    executor = WorkflowExecutor(
+        plan, state_manager=get_state_manager(), memo=step_memo, recorder=run_recorder
+    )
+    return await executor.run(payload, run_id=run_id)
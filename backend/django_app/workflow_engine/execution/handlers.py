@@ -0,0 +1,118 @@
+# backend/django_app/workflow_engine/execution/handlers.py
+
+from typing import Dict, Any, Callable, Awaitable
+import asyncio
+import jmespath
+from celery import current_app
+from django.conf import settings
+from ..transformers.data_transformers import DataTransformer
+from .dag import Step
+
+StepHandler = Callable[[Step, Any, Dict[str, Any]], Awaitable[Any]]
+
+STEP_HANDLERS: Dict[str, StepHandler] = {}
+
+class UnsupportedStepError(ValueError):
+    """Raised when a step's configuration has nothing to execute"""
+    pass
+
+def register_handler(task_type: str):
+    """Register the coroutine that executes steps of ``task_type``"""
+    def decorator(handler: StepHandler) -> StepHandler:
+        STEP_HANDLERS[task_type] = handler
+        return handler
+    return decorator
+
+@register_handler('trigger')
+async def run_trigger(step: Step, data: Any, context: Dict[str, Any]) -> Any:
+    """Triggers hand the incoming payload to the rest of the workflow"""
+    return data
+
+@register_handler('transformer')
+async def run_transformer(step: Step, data: Any, context: Dict[str, Any]) -> Any:
+    """
+    Apply the step's rules to the input, or record by record to a list
+    input or to the list under ``config['items']``
+    """
+    pipeline = step.compiled.get('rules')
+    if pipeline is None:
+        transformer = context.get('transformer') or DataTransformer()
+        pipeline = transformer.get_pipeline(step.config.get('rules', []))
+    if isinstance(data, list):
+        return pipeline.apply_to_items(data)
+    if step.config.get('items'):
+        return pipeline.apply_to_items(data, step.config['items'])
+    return await pipeline.transform(data)
+
+@register_handler('condition')
+async def run_condition(step: Step, data: Any, context: Dict[str, Any]) -> bool:
+    """
+    Evaluate ``config['expression']`` (JMESPath) against the input; without
+    one the builder's ``defaultPath`` decides
+    """
+    expression = step.compiled.get('expression')
+    if expression is not None:
+        return bool(expression.search(data))
+    if step.config.get('expression'):
+        return bool(jmespath.search(step.config['expression'], data))
+    return step.config.get('defaultPath', 'true') == 'true'
+
+@register_handler('action')
+async def run_action(step: Step, data: Any, context: Dict[str, Any]) -> Dict[str, Any]:
+    """Outgoing HTTP request to ``config['url']`` (or the builder's ``webhook`` config)"""
+    if step.config.get('ai'):
+        return await run_ai_process(step, data, context)
+
+    webhook = step.config.get('webhook') or {}
+    url = step.config.get('url') or webhook.get('url')
+    if not url:
+        raise UnsupportedStepError(f"Action step {step.name} has no target url")
+
+    import httpx  # Imported lazily; only action steps need it
+
+    async with httpx.AsyncClient(timeout=step.config.get('timeout', 30)) as client:
+        response = await client.request(
+            step.config.get('method') or webhook.get('method', 'POST'),
+            url,
+            json=data,
+            headers=step.config.get('headers') or webhook.get('headers') or {}
+        )
+    response.raise_for_status()
+    try:
+        body = response.json()
+    except ValueError:
+        body = response.text
+    return {'status_code': response.status_code, 'body': body}
+
+@register_handler('ai_process')
+async def run_ai_process(step: Step, data: Any, context: Dict[str, Any]) -> Any:
+    """
+    Run the step on the AI worker and wait for its result, so downstream
+    steps receive the AI output rather than a task id
+    """
+    result = current_app.send_task(
+        'tasks.ai_process',
+        args=[{
+            'workflow_id': context.get('workflow_id'),
+            'run_id': context.get('run_id'),
+            'step_id': step.id,
+            'config': step.config.get('ai', step.config),
+            'input': data,
+        }],
+        queue='ai_tasks'
+    )
+    timeout = step.config.get('timeout') or settings.WORKFLOW_AI_STEP_TIMEOUT
+    try:
+        return await asyncio.wait_for(_await_result(result), timeout)
+    except asyncio.TimeoutError:
+        result.revoke()
+        raise TimeoutError(f"AI task {result.id} for step {step.name} timed out after {timeout}s")
+
+async def _await_result(result) -> Any:
+    """Poll the result backend without blocking the event loop"""
+    while not await asyncio.to_thread(result.ready):
+        await asyncio.sleep(settings.WORKFLOW_AI_POLL_INTERVAL)
+    failed, value = await asyncio.to_thread(lambda: (result.failed(), result.result))
+    if failed:
+        raise RuntimeError(f"AI task {result.id} failed: {value}")
+    return value
@@ -0,0 +1,102 @@
+# backend/django_app/workflow_engine/execution/history.py
+
+from typing import Dict, Any, Optional
+from datetime import datetime, timezone
+import logging
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from redis_service.cache.workflow_cache import WorkflowCache
+from .dag import ExecutionPlan
+
+logger = logging.getLogger(__name__)
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    """Step timestamps are UTC ISO strings (naive in states saved by older workers)"""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+class RunRecorder:
+    """
+    Writes finished runs to WorkflowRun/WorkflowStepRun: the run row and
+    all of its step rows in one transaction (one INSERT plus one bulk
+    INSERT, however many steps). Input, sink outputs and step outputs are
+    stored out of line in WorkflowCache for WORKFLOW_RUN_PAYLOAD_TTL
+    seconds; rows keep references. Recording never fails a run.
+    """
+
+    def __init__(self, cache: Optional[WorkflowCache] = None):
+        self._cache = cache
+
+    @property
+    def cache(self) -> WorkflowCache:
+        if self._cache is None:
+            self._cache = WorkflowCache()
+        return self._cache
+
+    async def record(
+        self,
+        plan: ExecutionPlan,
+        run_id: str,
+        payload: Any,
+        results: Dict[str, Dict[str, Any]],
+        outputs: Dict[str, Any],
+        status: str,
+        started_at: datetime,
+        finished_at: datetime
+    ):
+        payloads = {f"{run_id}:input": payload, f"{run_id}:output": outputs}
+        for step_id, result in results.items():
+            if 'output' in result:
+                payloads[f"{run_id}:step:{step_id}"] = result['output']
+        try:
+            refs = await self.cache.store_payloads(payloads, expires=settings.WORKFLOW_RUN_PAYLOAD_TTL)
+        except Exception as e:
+            logger.warning(f"Failed to store payloads for workflow run {run_id}: {str(e)}")
+            refs = {}
+
+        try:
+            await sync_to_async(self._write)(
+                plan, run_id, results, refs, status, started_at, finished_at
+            )
+        except Exception as e:
+            logger.warning(f"Failed to record workflow run {run_id}: {str(e)}")
+
+    def _write(self, plan, run_id, results, refs, status, started_at, finished_at):
+        from ..models import WorkflowRun, WorkflowStepRun  # Import here to avoid circular imports
+
+        errors = [
+            f"{step_id}: {results[step_id]['error']}"
+            for step_id in plan.order if results[step_id].get('error')
+        ]
+        with transaction.atomic():
+            run = WorkflowRun.objects.create(
+                id=run_id,
+                workflow_id=plan.workflow_id,
+                status=status,
+                started_at=started_at,
+                finished_at=finished_at,
+                duration_ms=int((finished_at - started_at).total_seconds() * 1000),
+                input_ref=refs.get(f"{run_id}:input", ''),
+                output_ref=refs.get(f"{run_id}:output", ''),
+                error='; '.join(errors) or None
+            )
+            WorkflowStepRun.objects.bulk_create([
+                WorkflowStepRun(
+                    run=run,
+                    step_id=step_id,
+                    task_type=plan.steps[step_id].task_type,
+                    status=results[step_id]['status'],
+                    memoized=bool(results[step_id].get('memoized')),
+                    started_at=_parse_time(results[step_id].get('started_at')),
+                    finished_at=_parse_time(results[step_id].get('finished_at')),
+                    duration_ms=results[step_id].get('duration_ms'),
+                    output_ref=refs.get(f"{run_id}:step:{step_id}", ''),
+                    error=results[step_id].get('error')
+                )
+                for step_id in plan.order
+            ])
+
+run_recorder = RunRecorder()
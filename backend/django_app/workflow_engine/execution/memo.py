@@ -0,0 +1,89 @@
+# backend/django_app/workflow_engine/execution/memo.py
+
+from typing import Dict, Any, Optional, Tuple
+from collections import Counter
+import hashlib
+import json
+import logging
+from django.conf import settings
+from redis_service.cache.workflow_cache import WorkflowCache
+from .dag import Step
+
+logger = logging.getLogger(__name__)
+
+# Steps that are cheap and run on every event; never memoized
+UNMEMOIZED_STEP_TYPES = ('trigger', 'condition')
+
+def canonical_hash(value: Any) -> str:
+    """SHA-256 of a value's canonical JSON form (sorted keys, no whitespace)"""
+    encoded = json.dumps(value, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+def config_hash(step: Step) -> str:
+    """Hash of what determines a step's behaviour (its type and config)"""
+    config = {key: value for key, value in step.config.items() if key != 'memoize'}
+    return canonical_hash([step.task_type, config])
+
+class StepMemo:
+    """
+    Per-step result memoization keyed by (step config hash, input hash),
+    shared across runs and workflows through WorkflowCache. Step types in
+    WORKFLOW_MEMO_TTLS are memoized by default; others opt in with
+    ``config['memoize']`` (``true`` or ``{'ttl': seconds}``), and
+    ``memoize: false`` opts out. Lookups fail open.
+    """
+
+    def __init__(self, cache: Optional[WorkflowCache] = None):
+        self._cache = cache
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+
+    @property
+    def cache(self) -> WorkflowCache:
+        if self._cache is None:
+            self._cache = WorkflowCache()
+        return self._cache
+
+    def ttl_for(self, step: Step) -> Optional[int]:
+        """Seconds to keep the step's results, or None when not memoized"""
+        option = step.config.get('memoize')
+        if option is False or step.task_type in UNMEMOIZED_STEP_TYPES:
+            return None
+        if isinstance(option, dict):
+            return option.get('ttl', settings.WORKFLOW_MEMO_DEFAULT_TTL)
+        if option is True:
+            return settings.WORKFLOW_MEMO_TTLS.get(step.task_type, settings.WORKFLOW_MEMO_DEFAULT_TTL)
+        return settings.WORKFLOW_MEMO_TTLS.get(step.task_type)
+
+    def key(self, step: Step, data: Any) -> str:
+        digest = step.compiled.get('config_hash') or config_hash(step)
+        return f"{step.task_type}:{digest}:{canonical_hash(data)}"
+
+    async def lookup(self, step: Step, key: str) -> Tuple[bool, Any]:
+        """``(True, result)`` on a hit, ``(False, None)`` otherwise"""
+        try:
+            cached = await self.cache.get_step_result(key)
+        except Exception as e:
+            logger.warning(f"Step memo unavailable: {str(e)}")
+            return False, None
+
+        hit = cached is not None
+        (self.hits if hit else self.misses)[step.task_type] += 1
+        try:
+            await self.cache.record_memo_lookup(step.task_type, hit)
+        except Exception as e:
+            logger.debug(f"Failed to record memo lookup: {str(e)}")
+        return (True, cached['result']) if hit else (False, None)
+
+    async def store(self, key: str, result: Any, ttl: int):
+        try:
+            await self.cache.cache_step_result(key, result, expires=ttl)
+        except Exception as e:
+            logger.warning(f"Failed to memoize step result: {str(e)}")
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """This process's hit/miss counts per step type"""
+        return {
+            step_type: {'hits': self.hits[step_type], 'misses': self.misses[step_type]}
+            for step_type in sorted(set(self.hits) | set(self.misses))
+        }
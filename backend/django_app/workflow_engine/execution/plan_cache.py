@@ -0,0 +1,129 @@
+# backend/django_app/workflow_engine/execution/plan_cache.py
+
+from typing import Optional
+import logging
+import threading
+import jmespath
+from asgiref.sync import async_to_sync, sync_to_async
+from cachetools import LRUCache
+from django.conf import settings
+from redis_service.cache.workflow_cache import WorkflowCache
+from ..transformers.data_transformers import DataTransformer
+from .dag import ExecutionPlan, WorkflowCompileError, compile_workflow, plan_version
+from .handlers import STEP_HANDLERS
+from .memo import config_hash
+
+logger = logging.getLogger(__name__)
+
+_transformer = DataTransformer()
+
+def prepare_plan(plan: ExecutionPlan) -> ExecutionPlan:
+    """
+    Resolve step handlers, pre-parse condition expressions, compile
+    transformation rules and hash step configs once per plan
+    """
+    for step in plan.steps.values():
+        step.handler = STEP_HANDLERS.get(step.task_type)
+        step.compiled['config_hash'] = config_hash(step)
+        try:
+            if step.task_type == 'condition' and step.config.get('expression'):
+                step.compiled['expression'] = jmespath.compile(step.config['expression'])
+            if step.task_type == 'transformer':
+                step.compiled['rules'] = _transformer.compile(step.config.get('rules', []))
+            if step.config.get('transform'):
+                step.compiled['transform'] = _transformer.compile(step.config['transform'])
+        except (ValueError, jmespath.exceptions.JMESPathError) as e:
+            raise WorkflowCompileError(f"Invalid configuration for step {step.id}: {str(e)}")
+    return plan
+
+class PlanCache:
+    """
+    Compiled ExecutionPlans keyed by workflow, versioned by
+    ``Workflow.updated_at``. A lookup reads the current version from Redis
+    and serves the in-process LRU when it matches, then the serialized plan
+    in WorkflowCache; Postgres is only read when neither is current (or
+    Redis is unreachable, in which case one ``updated_at`` query validates
+    the local copy).
+    """
+
+    def __init__(self, maxsize: Optional[int] = None, cache: Optional[WorkflowCache] = None):
+        self._lock = threading.Lock()
+        self._local = LRUCache(maxsize=maxsize or settings.WORKFLOW_PLAN_CACHE_SIZE)
+        self._cache = cache
+
+    @property
+    def cache(self) -> WorkflowCache:
+        if self._cache is None:
+            self._cache = WorkflowCache()
+        return self._cache
+
+    def _get_local(self, workflow_id: str) -> Optional[ExecutionPlan]:
+        with self._lock:
+            return self._local.get(workflow_id)
+
+    def _set_local(self, plan: ExecutionPlan):
+        with self._lock:
+            self._local[plan.workflow_id] = plan
+
+    def _load(self, workflow_id: str, local: Optional[ExecutionPlan]) -> ExecutionPlan:
+        """Compile from Postgres, reusing ``local`` if it is still current"""
+        from ..models import Workflow  # Import here to avoid circular imports
+
+        workflow = Workflow.objects.get(pk=workflow_id)
+        if local is not None and local.version == plan_version(workflow):
+            return local
+        return prepare_plan(compile_workflow(workflow))
+
+    async def get_plan(self, workflow_id) -> ExecutionPlan:
+        """Raises ``Workflow.DoesNotExist`` or ``WorkflowCompileError``"""
+        workflow_id = str(workflow_id)
+        local = self._get_local(workflow_id)
+        try:
+            version = await self.cache.get_plan_version(workflow_id)
+        except Exception as e:
+            logger.warning(f"Workflow plan cache unavailable: {str(e)}")
+            plan = await sync_to_async(self._load)(workflow_id, local)
+            self._set_local(plan)
+            return plan
+
+        if version and local is not None and local.version == version:
+            return local
+
+        if version:
+            try:
+                data = await self.cache.get_cached_plan(workflow_id, version)
+            except Exception as e:
+                logger.warning(f"Workflow plan cache unavailable: {str(e)}")
+                data = None
+            if data:
+                plan = prepare_plan(ExecutionPlan.from_dict(data))
+                self._set_local(plan)
+                return plan
+
+        plan = await sync_to_async(self._load)(workflow_id, None)
+        try:
+            if await self.cache.cache_plan(
+                workflow_id, plan.to_dict(), plan.version, expires=settings.WORKFLOW_PLAN_CACHE_TTL
+            ):
+                self._set_local(plan)
+        except Exception as e:
+            logger.warning(f"Failed to cache plan for workflow {workflow_id}: {str(e)}")
+        return plan
+
+    def invalidate(self, workflow_id, version: Optional[str] = None):
+        """
+        Drop the local copy and publish the workflow's new version (None
+        when deleted). Called from synchronous code such as model signals.
+        """
+        workflow_id = str(workflow_id)
+        with self._lock:
+            self._local.pop(workflow_id, None)
+        try:
+            # A fresh client: async_to_sync runs this on its own event loop
+            async_to_sync(WorkflowCache().invalidate_plan)(
+                workflow_id, version, expires=settings.WORKFLOW_PLAN_CACHE_TTL
+            )
+        except Exception as e:
+            logger.warning(f"Failed to invalidate plan for workflow {workflow_id}: {str(e)}")
+
+plan_cache = PlanCache()
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.6 on 2026-10-19 08:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workflow_engine", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="webhooklog",
+            index=models.Index(
+                fields=["webhook", "-timestamp"], name="workflow_en_webhook_d38319_idx"
+            ),
+        ),
+    ]
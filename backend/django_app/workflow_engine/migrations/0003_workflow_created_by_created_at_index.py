@@ -0,0 +1,22 @@
+# Generated by Django 5.0.6 on 2026-10-19 08:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workflow_engine", "0002_webhooklog_webhook_timestamp_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="workflow",
+            index=models.Index(
+                fields=["created_by", "created_at", "id"],
+                name="workflow_en_created_d91460_idx",
+            ),
+        ),
+    ]
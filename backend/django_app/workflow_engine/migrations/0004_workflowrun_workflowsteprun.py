@@ -0,0 +1,122 @@
+# Generated by Django 5.0.6 on 2026-10-19 09:15
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workflow_engine", "0003_workflow_created_by_created_at_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WorkflowRun",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("completed", "Completed"), ("failed", "Failed")],
+                        max_length=20,
+                    ),
+                ),
+                ("started_at", models.DateTimeField()),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                ("duration_ms", models.IntegerField(null=True)),
+                ("input_ref", models.CharField(blank=True, default="", max_length=255)),
+                (
+                    "output_ref",
+                    models.CharField(blank=True, default="", max_length=255),
+                ),
+                ("error", models.TextField(blank=True, null=True)),
+                (
+                    "workflow",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="runs",
+                        to="workflow_engine.workflow",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-started_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="WorkflowStepRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("step_id", models.CharField(max_length=255)),
+                ("task_type", models.CharField(max_length=50)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("completed", "Completed"),
+                            ("failed", "Failed"),
+                            ("skipped", "Skipped"),
+                            ("cancelled", "Cancelled"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("memoized", models.BooleanField(default=False)),
+                ("started_at", models.DateTimeField(blank=True, null=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                ("duration_ms", models.IntegerField(null=True)),
+                (
+                    "output_ref",
+                    models.CharField(blank=True, default="", max_length=255),
+                ),
+                ("error", models.TextField(blank=True, null=True)),
+                (
+                    "run",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="steps",
+                        to="workflow_engine.workflowrun",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["started_at", "id"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="workflowrun",
+            index=models.Index(
+                fields=["workflow", "started_at"], name="workflow_en_workflo_41097a_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="workflowrun",
+            index=models.Index(
+                fields=["status", "started_at"], name="workflow_en_status_e051b1_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="workflowsteprun",
+            constraint=models.UniqueConstraint(
+                fields=("run", "step_id"), name="unique_step_per_run"
+            ),
+        ),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 5.0.6 on 2026-10-19 09:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workflow_engine", "0004_workflowrun_workflowsteprun"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WorkflowSchedule",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(blank=True, default="", max_length=255)),
+                (
+                    "schedule_type",
+                    models.CharField(
+                        choices=[("cron", "Cron"), ("interval", "Interval")],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "cron_expression",
+                    models.CharField(blank=True, default="", max_length=100),
+                ),
+                (
+                    "interval_seconds",
+                    models.PositiveIntegerField(blank=True, null=True),
+                ),
+                (
+                    "jitter_seconds",
+                    models.PositiveIntegerField(
+                        blank=True,
+                        help_text="Spread fires over this many seconds (default WORKFLOW_SCHEDULE_JITTER)",
+                        null=True,
+                    ),
+                ),
+                (
+                    "payload",
+                    models.JSONField(
+                        blank=True,
+                        default=dict,
+                        help_text="Trigger payload of each run",
+                    ),
+                ),
+                ("is_active", models.BooleanField(default=True)),
+                ("next_run_at", models.DateTimeField(blank=True, null=True)),
+                ("last_run_at", models.DateTimeField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "workflow",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="schedules",
+                        to="workflow_engine.workflow",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["next_run_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["is_active", "next_run_at"],
+                        name="workflow_en_is_acti_ca7fb6_idx",
+                    )
+                ],
+            },
+        ),
+    ]
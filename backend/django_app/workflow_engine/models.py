@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 import uuid
 
 class Workflow(models.Model):
@@ -19,6 +20,9 @@ class Workflow(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_by', 'created_at', 'id']),
+        ]
 
 class WorkflowTask(models.Model):
     """
@@ -100,4 +104,108 @@ class WebhookLog(models.Model):
     
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['webhook', '-timestamp']),
+        ]
 
+class WorkflowRun(models.Model):
+    """
+    One execution of a workflow, written by the execution engine when the
+    run finishes. Payloads live out of line (see ``*_ref``); live progress
+    is in the Redis run state.
+    """
+    STATUS_CHOICES = [
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    workflow = models.ForeignKey(Workflow, related_name='runs', on_delete=models.CASCADE)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField(null=True, blank=True)
+    duration_ms = models.IntegerField(null=True)
+    input_ref = models.CharField(max_length=255, blank=True, default='')
+    output_ref = models.CharField(max_length=255, blank=True, default='')
+    error = models.TextField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"{self.workflow_id} - {self.id}"
+    
+    class Meta:
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['workflow', 'started_at']),
+            models.Index(fields=['status', 'started_at']),
+        ]
+
+class WorkflowStepRun(models.Model):
+    """
+    Outcome of one step within a WorkflowRun
+    """
+    STATUS_CHOICES = [
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+        ('skipped', 'Skipped'),
+        ('cancelled', 'Cancelled'),
+    ]
+    
+    run = models.ForeignKey(WorkflowRun, related_name='steps', on_delete=models.CASCADE)
+    step_id = models.CharField(max_length=255)
+    task_type = models.CharField(max_length=50)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+    memoized = models.BooleanField(default=False)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    duration_ms = models.IntegerField(null=True)
+    output_ref = models.CharField(max_length=255, blank=True, default='')
+    error = models.TextField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"{self.run_id} - {self.step_id}"
+    
+    class Meta:
+        ordering = ['started_at', 'id']
+        constraints = [
+            models.UniqueConstraint(fields=['run', 'step_id'], name='unique_step_per_run'),
+        ]
+
+class WorkflowSchedule(models.Model):
+    """
+    Fires a workflow on a cron expression or a fixed interval (UTC).
+    ``next_run_at`` is the next nominal fire time; the scheduler adds a
+    per-schedule jitter so schedules sharing a time are spread out.
+    """
+    SCHEDULE_TYPES = [
+        ('cron', 'Cron'),
+        ('interval', 'Interval'),
+    ]
+    
+    workflow = models.ForeignKey(Workflow, related_name='schedules', on_delete=models.CASCADE)
+    name = models.CharField(max_length=255, blank=True, default='')
+    schedule_type = models.CharField(max_length=20, choices=SCHEDULE_TYPES)
+    cron_expression = models.CharField(max_length=100, blank=True, default='')
+    interval_seconds = models.PositiveIntegerField(null=True, blank=True)
+    jitter_seconds = models.PositiveIntegerField(
+        null=True, blank=True, help_text="Spread fires over this many seconds (default WORKFLOW_SCHEDULE_JITTER)"
+    )
+    payload = models.JSONField(default=dict, blank=True, help_text="Trigger payload of each run")
+    is_active = models.BooleanField(default=True)
+    next_run_at = models.DateTimeField(null=True, blank=True)
+    last_run_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.workflow.name} - {self.cron_expression or f'every {self.interval_seconds}s'}"
+    
+    def save(self, *args, **kwargs):
+        if self.is_active and self.next_run_at is None:
+            from .scheduling.scheduler import next_fire_time  # Import here to avoid circular imports
+            self.next_run_at = next_fire_time(self, timezone.now())
+        super().save(*args, **kwargs)
+    
+    class Meta:
+        ordering = ['next_run_at']
+        indexes = [
+            models.Index(fields=['is_active', 'next_run_at']),
+        ]
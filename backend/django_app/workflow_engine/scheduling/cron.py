@@ -0,0 +1,103 @@
+# backend/django_app/workflow_engine/scheduling/cron.py
+
+from typing import FrozenSet, Tuple
+from datetime import datetime, timedelta
+
+class InvalidSchedule(ValueError):
+    """Raised for cron expressions or intervals that can never fire"""
+
+# (name, lowest, highest) of the five cron fields
+FIELDS = (
+    ('minute', 0, 59),
+    ('hour', 0, 23),
+    ('day of month', 1, 31),
+    ('month', 1, 12),
+    ('day of week', 0, 6),
+)
+
+# How far ahead next_after looks before giving up (e.g. ``0 0 30 2 *``)
+SEARCH_YEARS = 5
+
+def _parse_field(text: str, name: str, lowest: int, highest: int) -> FrozenSet[int]:
+    # Day of week also accepts 7 for Sunday
+    top = 7 if name == 'day of week' else highest
+    values = set()
+    for part in text.split(','):
+        expression, slash, step = part.partition('/')
+        try:
+            step = int(step) if slash else 1
+            if expression == '*':
+                start, end = lowest, highest
+            elif '-' in expression:
+                start, end = (int(value) for value in expression.split('-', 1))
+            else:
+                # ``5/15`` runs from 5 to the end of the range
+                start = int(expression)
+                end = highest if slash else start
+        except ValueError:
+            raise InvalidSchedule(f"Invalid {name} field: {text!r}")
+        if step < 1 or not lowest <= start <= end <= top:
+            raise InvalidSchedule(f"Invalid {name} field: {text!r}")
+        values.update(range(start, end + 1, step))
+    if name == 'day of week':
+        values = {value % 7 for value in values}
+    return frozenset(values)
+
+class CronExpression:
+    """
+    A standard five-field cron expression (minute, hour, day of month,
+    month, day of week; ``*``, lists, ranges and ``/`` steps), evaluated in
+    UTC. As in cron, when both day fields are restricted a day matching
+    either one fires.
+    """
+
+    def __init__(self, expression: str):
+        parts = expression.split()
+        if len(parts) != len(FIELDS):
+            raise InvalidSchedule(f"Cron expression needs {len(FIELDS)} fields: {expression!r}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            _parse_field(part, *field) for part, field in zip(parts, FIELDS)
+        )
+        self._any_day = parts[2] == '*'
+        self._any_weekday = parts[4] == '*'
+        self._sorted_minutes: Tuple[int, ...] = tuple(sorted(self.minutes))
+        self._sorted_hours: Tuple[int, ...] = tuple(sorted(self.hours))
+
+    def _day_matches(self, moment: datetime) -> bool:
+        # Python: Monday is 0; cron: Sunday is 0
+        day = moment.day in self.days
+        weekday = (moment.weekday() + 1) % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def next_after(self, moment: datetime) -> datetime:
+        """First matching minute strictly after ``moment``"""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=366 * SEARCH_YEARS)
+        while candidate <= limit:
+            if candidate.month not in self.months:
+                month = candidate.month % 12 + 1
+                year = candidate.year + (month == 1)
+                candidate = candidate.replace(year=year, month=month, day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if candidate.hour not in self.hours:
+                later = [hour for hour in self._sorted_hours if hour > candidate.hour]
+                if later:
+                    candidate = candidate.replace(hour=later[0], minute=0)
+                else:
+                    candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if candidate.minute not in self.minutes:
+                later = [minute for minute in self._sorted_minutes if minute > candidate.minute]
+                if later:
+                    candidate = candidate.replace(minute=later[0])
+                else:
+                    candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+                continue
+            return candidate
+        raise InvalidSchedule(f"Cron expression never fires: {self.expression!r}")
@@ -0,0 +1,257 @@
+# backend/django_app/workflow_engine/scheduling/scheduler.py
+
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, timedelta
+import logging
+import math
+import uuid
+import zlib
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.utils import timezone
+from redis_service.queue.schedule_store import ScheduleStore
+from ..execution.executor import run_async
+from .cron import CronExpression, InvalidSchedule
+
+logger = logging.getLogger(__name__)
+
+def validate_schedule(schedule_type: str, cron_expression: str = '', interval_seconds: Optional[int] = None):
+    """Raise InvalidSchedule unless the definition can fire"""
+    if schedule_type == 'cron':
+        CronExpression(cron_expression or '').next_after(timezone.now())
+    elif schedule_type == 'interval':
+        if not interval_seconds or interval_seconds < settings.WORKFLOW_SCHEDULE_MIN_INTERVAL:
+            raise InvalidSchedule(
+                f"Interval must be at least {settings.WORKFLOW_SCHEDULE_MIN_INTERVAL} seconds"
+            )
+    else:
+        raise InvalidSchedule(f"Unknown schedule type: {schedule_type}")
+
+def next_fire_time(schedule, after: datetime, previous: Optional[datetime] = None) -> datetime:
+    """
+    Next nominal fire time strictly after ``after``. Intervals keep their
+    cadence from ``previous`` (the last nominal time) when given; missed
+    occurrences are skipped, not replayed.
+    """
+    if schedule.schedule_type == 'interval':
+        step = timedelta(seconds=schedule.interval_seconds)
+        if previous is None:
+            return after + step
+        missed = max(0, math.floor((after - previous) / step))
+        return previous + step * (missed + 1)
+    return CronExpression(schedule.cron_expression).next_after(after)
+
+def jitter_offset(schedule) -> int:
+    """
+    Stable per-schedule delay in seconds, so schedules sharing a fire time
+    (``0 * * * *``) are spread over the jitter window instead of all firing
+    on the same tick
+    """
+    window = schedule.jitter_seconds
+    if window is None:
+        window = settings.WORKFLOW_SCHEDULE_JITTER
+    if schedule.schedule_type == 'interval':
+        window = min(window, schedule.interval_seconds // 2)
+    if window <= 0:
+        return 0
+    return zlib.crc32(str(schedule.pk).encode('utf-8')) % (window + 1)
+
+def due_time(schedule) -> datetime:
+    """When the scheduler actually fires ``next_run_at``: the nominal time plus jitter"""
+    return schedule.next_run_at + timedelta(seconds=jitter_offset(schedule))
+
+def due_score(schedule) -> float:
+    return due_time(schedule).timestamp()
+
+class WorkflowScheduler:
+    """
+    Fires WorkflowSchedules from ScheduleStore's due set. A tick holds a
+    short lease so only one replica ticks at a time, claims due schedules
+    atomically, enqueues each occurrence once (``mark_fired``) and puts
+    the schedules back at their next due time. Postgres keeps
+    ``next_run_at`` so the due set can be rebuilt with ``sync``.
+    """
+
+    lease_name = 'tick'
+
+    def __init__(self, store: Optional[ScheduleStore] = None):
+        self._store = store
+
+    @property
+    def store(self) -> ScheduleStore:
+        if self._store is None:
+            self._store = ScheduleStore()
+        return self._store
+
+    def tick(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Fire everything due at ``now``; call from one periodic task"""
+        now = now or timezone.now()
+        owner = uuid.uuid4().hex
+        if not run_async(self.store.acquire_lease(self.lease_name, owner, settings.WORKFLOW_SCHEDULER_LEASE)):
+            return {'status': 'skipped', 'reason': 'tick in progress elsewhere'}
+
+        stats = {'status': 'completed', 'claimed': 0, 'fired': 0, 'missed': 0}
+        try:
+            batch_size = settings.WORKFLOW_SCHEDULER_BATCH_SIZE
+            while True:
+                claimed = run_async(self.store.claim_due(now.timestamp(), batch_size))
+                stats['claimed'] += len(claimed)
+                if claimed:
+                    fired, missed = self._fire_or_restore(claimed, now)
+                    stats['fired'] += fired
+                    stats['missed'] += missed
+                if len(claimed) < batch_size:
+                    break
+        finally:
+            run_async(self.store.release_lease(self.lease_name, owner))
+        return stats
+
+    def _fire_or_restore(self, claimed: List[Tuple[str, float]], now: datetime) -> Tuple[int, int]:
+        """
+        ``_fire``, putting the claimed schedules back at their old due
+        time if it fails before their new one is saved; claim_due already
+        removed them, so they would otherwise not fire again until ``sync``
+        """
+        try:
+            return self._fire(claimed, now)
+        except Exception:
+            try:
+                run_async(self.store.schedule_many(dict(claimed)))
+            except Exception as e:
+                logger.error(f"Failed to restore {len(claimed)} claimed workflow schedules: {str(e)}")
+            raise
+
+    def _fire(self, claimed: List[Tuple[str, float]], now: datetime) -> Tuple[int, int]:
+        from ..models import WorkflowSchedule  # Import here to avoid circular imports
+        from tasks.workflow_tasks import execute_workflow
+
+        schedules = WorkflowSchedule.objects.select_related('workflow').in_bulk(
+            [int(schedule_id) for schedule_id, _ in claimed]
+        )
+        grace = timedelta(seconds=settings.WORKFLOW_SCHEDULE_MISFIRE_GRACE)
+        fired, missed, updated, due = 0, 0, [], {}
+
+        for schedule_id, _ in claimed:
+            schedule = schedules.get(int(schedule_id))
+            # Deleted or paused; saving it active again reschedules it
+            if schedule is None or not schedule.is_active or not schedule.workflow.is_active:
+                continue
+
+            if schedule.next_run_at is None or due_time(schedule) > now:
+                # A stale entry (e.g. re-added by sync); the schedule has moved on
+                if schedule.next_run_at is not None:
+                    due[schedule_id] = due_score(schedule)
+                continue
+
+            nominal = schedule.next_run_at
+            # Late relative to when it was due to fire, so jitter never counts as lateness
+            if now - due_time(schedule) > grace:
+                missed += 1
+                logger.warning(f"Workflow schedule {schedule_id} missed its {nominal.isoformat()} run")
+            elif run_async(self.store.mark_fired(
+                schedule_id, nominal.timestamp(), expires=settings.WORKFLOW_SCHEDULE_MISFIRE_GRACE * 2
+            )):
+                try:
+                    execute_workflow.delay({
+                        'workflow_id': schedule.workflow_id,
+                        'run_id': str(uuid.uuid4()),
+                        'payload': schedule.payload,
+                        'schedule_id': schedule.pk,
+                        'scheduled_for': nominal.isoformat(),
+                    })
+                except Exception:
+                    # Not enqueued: let the restored claim fire it next tick
+                    run_async(self.store.clear_fired(schedule_id, nominal.timestamp()))
+                    raise
+                schedule.last_run_at = nominal
+                fired += 1
+
+            try:
+                schedule.next_run_at = next_fire_time(schedule, now, previous=nominal)
+            except InvalidSchedule as e:
+                logger.error(f"Workflow schedule {schedule_id} disabled: {str(e)}")
+                schedule.is_active = False
+                schedule.next_run_at = None
+            else:
+                due[schedule_id] = due_score(schedule)
+            updated.append(schedule)
+
+        WorkflowSchedule.objects.bulk_update(updated, ['next_run_at', 'last_run_at', 'is_active'])
+        run_async(self.store.schedule_many(due))
+        return fired, missed
+
+    def sync(self) -> Dict[str, int]:
+        """
+        Re-add every active schedule at its due time and drop inactive ones;
+        repairs the due set after a Redis flush or a crashed tick
+        """
+        from ..models import WorkflowSchedule  # Import here to avoid circular imports
+
+        active = WorkflowSchedule.objects.filter(
+            is_active=True, workflow__is_active=True, next_run_at__isnull=False
+        )
+        due, scheduled = {}, 0
+        for schedule in active.iterator(chunk_size=1000):
+            due[str(schedule.pk)] = due_score(schedule)
+            if len(due) >= 1000:
+                run_async(self.store.schedule_many(due))
+                scheduled, due = scheduled + len(due), {}
+        run_async(self.store.schedule_many(due))
+        scheduled += len(due)
+
+        inactive = [
+            str(schedule_id) for schedule_id in WorkflowSchedule.objects.exclude(
+                pk__in=active.values('pk')
+            ).values_list('pk', flat=True)
+        ]
+        for start in range(0, len(inactive), 1000):
+            run_async(self.store.unschedule(*inactive[start:start + 1000]))
+        return {'scheduled': scheduled, 'unscheduled': len(inactive)}
+
+def register_schedule(schedule):
+    """Add or remove a saved schedule in the due set (synchronous callers)"""
+    # A fresh client: async_to_sync runs this on its own event loop
+    store = ScheduleStore()
+    try:
+        if schedule.is_active and schedule.workflow.is_active and schedule.next_run_at:
+            async_to_sync(store.schedule_many)({str(schedule.pk): due_score(schedule)})
+        else:
+            async_to_sync(store.unschedule)(str(schedule.pk))
+    except Exception as e:
+        logger.warning(f"Failed to register workflow schedule {schedule.pk}: {str(e)}")
+
+def register_workflow_schedules(workflow):
+    """
+    Add or remove a workflow's schedules after it is (de)activated. Runs
+    missed while it was inactive are skipped rather than counted as misfires.
+    """
+    from ..models import WorkflowSchedule  # Import here to avoid circular imports
+
+    schedules = list(workflow.schedules.filter(is_active=True, next_run_at__isnull=False))
+    if not schedules:
+        return
+    store = ScheduleStore()
+    try:
+        if not workflow.is_active:
+            async_to_sync(store.unschedule)(*[str(schedule.pk) for schedule in schedules])
+            return
+
+        now = timezone.now()
+        grace = timedelta(seconds=settings.WORKFLOW_SCHEDULE_MISFIRE_GRACE)
+        moved = []
+        for schedule in schedules:
+            if now - due_time(schedule) > grace:
+                schedule.next_run_at = next_fire_time(schedule, now, previous=schedule.next_run_at)
+                moved.append(schedule)
+        WorkflowSchedule.objects.bulk_update(moved, ['next_run_at'])
+        async_to_sync(store.schedule_many)({str(schedule.pk): due_score(schedule) for schedule in schedules})
+    except Exception as e:
+        logger.warning(f"Failed to register schedules of workflow {workflow.pk}: {str(e)}")
+
+def unregister_schedule(schedule_id):
+    try:
+        async_to_sync(ScheduleStore().unschedule)(str(schedule_id))
+    except Exception as e:
+        logger.warning(f"Failed to unregister workflow schedule {schedule_id}: {str(e)}")
+
+workflow_scheduler = WorkflowScheduler()
@@ -1,6 +1,28 @@
 from rest_framework import serializers
 from django.conf import settings
-from .models import Workflow, WorkflowTask, Webhook, WebhookLog
+from .models import Workflow, WorkflowTask, Webhook, WebhookLog, WorkflowRun, WorkflowStepRun, WorkflowSchedule
+from .scheduling.cron import InvalidSchedule
+from .scheduling.scheduler import validate_schedule
+
+
+class ExpandableFieldsMixin:
+    """
+    Adds nested representations only when requested through ``?expand=``.
+    Subclasses declare ``expandable_fields`` as name -> serializer factory.
+    """
+    expandable_fields = {}
+
+    def get_expanded_fields(self):
+        expand = self.context.get('expand') or set()
+        return [name for name in self.expandable_fields if name in expand]
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        for name in self.get_expanded_fields():
+            serializer = self.expandable_fields[name](context=self.context)
+            data[name] = serializer.to_representation(getattr(instance, name).all())
+        return data
+
 
 class WorkflowTaskSerializer(serializers.ModelSerializer):
     """
@@ -38,12 +60,17 @@ class WebhookLogSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'timestamp']
         
-class WebhookSerializer(serializers.ModelSerializer):
+class WebhookSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for Webhook model
-    Includes logs as nested serializer
+    Returns log summary fields; recent logs only with ?expand=logs
     """
-    logs = WebhookLogSerializer(many=True, read_only=True)
+    expandable_fields = {
+        'logs': lambda **kwargs: WebhookLogSerializer(many=True, **kwargs),
+    }
+    log_count = serializers.SerializerMethodField()
+    last_triggered_at = serializers.SerializerMethodField()
+
     class Meta:
         model = Webhook
         fields = [
@@ -60,19 +87,124 @@ class WebhookSerializer(serializers.ModelSerializer):
             'created_at',
             'is_active',
             'config',
-            'logs'
+            'log_count',
+            'last_triggered_at'
         ]
         read_only_fields = ['id', 'secret_key', 'created_at', 'created_by', 'trigger_url']
-        
-class WorkflowSerializer(serializers.ModelSerializer):
+
+    def get_log_count(self, obj):
+        """Use the queryset annotation when present"""
+        if hasattr(obj, 'log_count'):
+            return obj.log_count
+        return obj.logs.count()
+
+    def get_last_triggered_at(self, obj):
+        if hasattr(obj, 'last_triggered_at'):
+            return obj.last_triggered_at
+        latest = obj.logs.order_by('-timestamp').values_list('timestamp', flat=True).first()
+        return latest
+
+class WorkflowStepRunSerializer(serializers.ModelSerializer):
+    """
+    Serializer for WorkflowStepRun model
+    """
+    class Meta:
+        model = WorkflowStepRun
+        fields = [
+            'step_id',
+            'task_type',
+            'status',
+            'memoized',
+            'started_at',
+            'finished_at',
+            'duration_ms',
+            'output_ref',
+            'error'
+        ]
+        read_only_fields = fields
+
+class WorkflowRunSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
+    """
+    Serializer for WorkflowRun model
+    Step results are nested only with ?expand=steps
+    """
+    expandable_fields = {
+        'steps': lambda **kwargs: WorkflowStepRunSerializer(many=True, **kwargs),
+    }
+
+    class Meta:
+        model = WorkflowRun
+        fields = [
+            'id',
+            'workflow',
+            'status',
+            'started_at',
+            'finished_at',
+            'duration_ms',
+            'input_ref',
+            'output_ref',
+            'error'
+        ]
+        read_only_fields = fields
+
+class WorkflowScheduleSerializer(serializers.ModelSerializer):
+    """
+    Serializer for WorkflowSchedule model
+    Changing when a schedule fires (or re-activating it) recomputes next_run_at
+    """
+    schedule_fields = ('schedule_type', 'cron_expression', 'interval_seconds', 'is_active')
+
+    class Meta:
+        model = WorkflowSchedule
+        fields = [
+            'id',
+            'workflow',
+            'name',
+            'schedule_type',
+            'cron_expression',
+            'interval_seconds',
+            'jitter_seconds',
+            'payload',
+            'is_active',
+            'next_run_at',
+            'last_run_at',
+            'created_at'
+        ]
+        read_only_fields = ['id', 'next_run_at', 'last_run_at', 'created_at']
+
+    def validate(self, attrs):
+        def value(name):
+            if name in attrs:
+                return attrs[name]
+            return getattr(self.instance, name, None)
+
+        try:
+            validate_schedule(value('schedule_type'), value('cron_expression'), value('interval_seconds'))
+        except InvalidSchedule as e:
+            raise serializers.ValidationError({'schedule': str(e)})
+        return attrs
+
+    def update(self, instance, validated_data):
+        if any(
+            name in validated_data and validated_data[name] != getattr(instance, name)
+            for name in self.schedule_fields
+        ):
+            instance.next_run_at = None
+        return super().update(instance, validated_data)
+
+class WorkflowSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for Workflow model
-    Includes nested serializers for tasks and webhooks
+    Returns a summary (counts, last activity); tasks and webhooks
+    are nested only when requested with ?expand=tasks,webhooks
     Handles workflow limits based on user's plan
     """
-    tasks = WorkflowTaskSerializer(many=True, read_only=True)
-    webhooks = WebhookSerializer(many=True, read_only=True)
+    expandable_fields = {
+        'tasks': lambda **kwargs: WorkflowTaskSerializer(many=True, **kwargs),
+        'webhooks': lambda **kwargs: WebhookSerializer(many=True, **kwargs),
+    }
     workflow_limits = serializers.SerializerMethodField()
+    last_activity_at = serializers.DateTimeField(read_only=True)
     
     class Meta:
         model = Workflow
@@ -85,8 +217,7 @@ class WorkflowSerializer(serializers.ModelSerializer):
             'updated_at',
             'is_active',
             'workflow_data',
-            'tasks',
-            'webhooks',
+            'last_activity_at',
             'workflow_limits'  # Added workflow limits info
         ]
         read_only_fields = ['id', 'created_at', 'created_by', 'updated_at', 'workflow_limits']
@@ -123,7 +254,11 @@ class WorkflowSerializer(serializers.ModelSerializer):
     def get_workflow_limits(self, obj):
         """
         Get workflow limit information for the user
+        List views compute this once and pass it through the context
         """
+        if 'workflow_limits' in self.context:
+            return self.context['workflow_limits']
+
         user = obj.created_by
         current_count = Workflow.objects.filter(
             created_by=user,
@@ -147,10 +282,13 @@ class WorkflowSerializer(serializers.ModelSerializer):
         """
         data = super().to_representation(instance)
         
-        # Include task count
-        data['task_count'] = instance.tasks.count()
+        # Counts come from queryset annotations when available
+        data['task_count'] = getattr(instance, 'task_count', None)
+        if data['task_count'] is None:
+            data['task_count'] = instance.tasks.count()
         
-        # Include webhook count
-        data['webhook_count'] = instance.webhooks.count()
+        data['webhook_count'] = getattr(instance, 'webhook_count', None)
+        if data['webhook_count'] is None:
+            data['webhook_count'] = instance.webhooks.count()
         
-        return data
\ No newline at end of file
+        return data
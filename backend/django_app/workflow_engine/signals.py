@@ -0,0 +1,54 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from .models import Workflow, WorkflowTask, WorkflowSchedule
+from .execution.dag import plan_version
+from .execution.plan_cache import plan_cache
+from .scheduling.scheduler import register_schedule, register_workflow_schedules, unregister_schedule
+
+@receiver(pre_save, sender=Workflow)
+def remember_workflow_active(sender, instance, **kwargs):
+    instance._was_active = (
+        Workflow.objects.filter(pk=instance.pk).values_list('is_active', flat=True).first()
+        if instance.pk else None
+    )
+
+@receiver(post_save, sender=Workflow)
+def invalidate_workflow_plan(sender, instance, **kwargs):
+    """Publish the workflow's new plan version once the change is committed"""
+    version = plan_version(instance)
+    transaction.on_commit(lambda: plan_cache.invalidate(instance.pk, version))
+
+@receiver(post_save, sender=Workflow)
+def reregister_workflow_schedules(sender, instance, created, **kwargs):
+    """(De)activating a workflow adds or removes its schedules without waiting for sync"""
+    was_active = getattr(instance, '_was_active', None)
+    if not created and was_active is not None and was_active != instance.is_active:
+        transaction.on_commit(lambda: register_workflow_schedules(instance))
+
+@receiver(post_delete, sender=Workflow)
+def drop_workflow_plan(sender, instance, **kwargs):
+    workflow_id = instance.pk
+    transaction.on_commit(lambda: plan_cache.invalidate(workflow_id))
+
+@receiver(post_save, sender=WorkflowTask)
+@receiver(post_delete, sender=WorkflowTask)
+def touch_workflow_on_task_change(sender, instance, **kwargs):
+    """Task changes move the workflow's updated_at, and with it the plan version"""
+    updated_at = timezone.now()
+    if not Workflow.objects.filter(pk=instance.workflow_id).update(updated_at=updated_at):
+        return
+    version = updated_at.isoformat()
+    workflow_id = instance.workflow_id
+    transaction.on_commit(lambda: plan_cache.invalidate(workflow_id, version))
+
+@receiver(post_save, sender=WorkflowSchedule)
+def register_workflow_schedule(sender, instance, **kwargs):
+    """Put the schedule at its due time (or take it out) once committed"""
+    transaction.on_commit(lambda: register_schedule(instance))
+
+@receiver(post_delete, sender=WorkflowSchedule)
+def unregister_workflow_schedule(sender, instance, **kwargs):
+    schedule_id = instance.pk
+    transaction.on_commit(lambda: unregister_schedule(schedule_id))
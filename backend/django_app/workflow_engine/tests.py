@@ -1,3 +1,900 @@
-from django.test import TestCase
+import asyncio
+from datetime import timedelta
+from unittest import mock
+from django.conf import settings
+from django.utils import timezone
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from authentication.models import User
+from .models import Workflow, WorkflowTask, Webhook, WebhookLog, WorkflowRun, WorkflowStepRun, WorkflowSchedule
+from .execution.dag import compile_workflow, WorkflowCompileError
+from .execution.executor import WorkflowExecutor
+from .execution.handlers import STEP_HANDLERS
+from .execution.plan_cache import PlanCache, prepare_plan
+from .execution.memo import StepMemo
+from .execution.history import RunRecorder
+from .scheduling.cron import CronExpression, InvalidSchedule
+from .scheduling.scheduler import WorkflowScheduler, jitter_offset
+from .transformers.data_transformers import DataTransformer
+from .transformers.validation import SchemaValidationError, compile_schema
+
+
+class WorkflowListTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='owner@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.workflow = Workflow.objects.create(
+            name='Sync',
+            created_by=self.user,
+            workflow_data={}
+        )
+        WorkflowTask.objects.create(
+            workflow=self.workflow, name='Step', task_type='action', config={}, order=1
+        )
+        self.webhook = Webhook.objects.create(
+            name='Inbound',
+            workflow=self.workflow,
+            webhook_type='trigger',
+            created_by=self.user
+        )
+        for _ in range(3):
+            WebhookLog.objects.create(
+                webhook=self.webhook,
+                request_method='POST',
+                request_headers={},
+                request_body={}
+            )
+
+    def test_list_returns_summary(self):
+        response = self.client.get(reverse('workflow-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        workflow = response.data['results'][0]
+        self.assertEqual(workflow['task_count'], 1)
+        self.assertEqual(workflow['webhook_count'], 1)
+        self.assertIsNotNone(workflow['last_activity_at'])
+        self.assertNotIn('webhooks', workflow)
+
+    def test_list_is_cursor_paginated_with_limits(self):
+        for index in range(3):
+            Workflow.objects.create(
+                name=f'Extra {index}', created_by=self.user, workflow_data={}
+            )
+        response = self.client.get(reverse('workflow-list'), {'page_size': 2})
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+        self.assertIn('limits', response.data)
+
+    def test_list_expand_webhooks(self):
+        response = self.client.get(reverse('workflow-list'), {'expand': 'webhooks'})
+        webhook = response.data['results'][0]['webhooks'][0]
+        self.assertEqual(webhook['log_count'], 3)
+        self.assertNotIn('logs', webhook)
+
+    def test_logs_are_cursor_paginated(self):
+        url = reverse('workflow-logs', args=[self.workflow.id])
+        response = self.client.get(url, {'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_run_status_by_status(self):
+        running = {'42:run': {'user_id': str(self.user.pk), 'status': 'running'}}
+        with mock.patch(
+            'workflow_engine.views.WorkflowStateManager.get_workflows_by_status',
+            new=mock.AsyncMock(return_value=running)
+        ) as query, mock.patch(
+            'workflow_engine.views.WorkflowStateManager.close', new=mock.AsyncMock()
+        ) as close:
+            response = self.client.get(reverse('workflow-run-status'), {'status': 'running'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], running)
+        query.assert_awaited_once_with(self.user.pk, 'running')
+        close.assert_awaited_once()
+
+    def test_run_status_by_ids_hides_other_users(self):
+        states = {
+            '1:a': {'user_id': str(self.user.pk), 'status': 'completed'},
+            '2:b': {'user_id': 'someone-else', 'status': 'running'},
+            '3:c': None,
+        }
+        with mock.patch(
+            'workflow_engine.views.WorkflowStateManager.get_workflow_states',
+            new=mock.AsyncMock(return_value=states)
+        ) as batch:
+            response = self.client.get(reverse('workflow-run-status'), {'runs': '1:a,2:b,3:c'})
+        self.assertEqual(list(response.data['results']), ['1:a'])
+        batch.assert_awaited_once_with(['1:a', '2:b', '3:c'])
+
+
+class RecordingStateManager:
+    def __init__(self):
+        self.saved = []
+
+    async def save_workflow_state(self, workflow_id, state, expires=None):
+        self.saved.append((workflow_id, state))
+
+
+class WorkflowExecutionTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='runner@example.com',
+            password='testpass123'
+        )
+
+    def _workflow(self, nodes, edges):
+        return Workflow.objects.create(
+            name='Graph',
+            created_by=self.user,
+            workflow_data={'nodes': nodes, 'edges': edges}
+        )
+
+    def _node(self, node_id, node_type='action', config=None):
+        return {'id': node_id, 'type': node_type, 'data': {'label': node_id, 'config': config or {}}}
+
+    def _run(self, plan, payload, handlers=None, **kwargs):
+        executor = WorkflowExecutor(plan, handlers={**STEP_HANDLERS, **(handlers or {})}, **kwargs)
+        return asyncio.run(executor.run(payload))
+
+    def test_compiles_builder_graph(self):
+        workflow = self._workflow(
+            [self._node('start', 'trigger'), self._node('a'), self._node('b'), self._node('join')],
+            [
+                {'source': 'start', 'target': 'a'},
+                {'source': 'start', 'target': 'b'},
+                {'source': 'a', 'target': 'join'},
+                {'source': 'b', 'target': 'join'},
+            ]
+        )
+        plan = compile_workflow(workflow)
+        self.assertEqual(plan.roots, ['start'])
+        self.assertEqual(plan.sinks, ['join'])
+        self.assertEqual(sorted(plan.dependents['start']), ['a', 'b'])
+        self.assertEqual(plan.order[-1], 'join')
+
+    def test_rejects_cycles(self):
+        workflow = self._workflow(
+            [self._node('a'), self._node('b')],
+            [{'source': 'a', 'target': 'b'}, {'source': 'b', 'target': 'a'}]
+        )
+        with self.assertRaises(WorkflowCompileError):
+            compile_workflow(workflow)
+
+    def test_compiles_tasks_by_order_level(self):
+        workflow = Workflow.objects.create(name='Tasks', created_by=self.user, workflow_data={})
+        first = WorkflowTask.objects.create(
+            workflow=workflow, name='First', task_type='trigger', config={}, order=1
+        )
+        left = WorkflowTask.objects.create(
+            workflow=workflow, name='Left', task_type='action', config={}, order=2
+        )
+        right = WorkflowTask.objects.create(
+            workflow=workflow, name='Right', task_type='action', config={}, order=2
+        )
+        last = WorkflowTask.objects.create(
+            workflow=workflow, name='Last', task_type='action', config={'depends_on': ['Left']}, order=3
+        )
+        plan = compile_workflow(workflow)
+        self.assertEqual(plan.steps[str(left.id)].depends_on, [str(first.id)])
+        self.assertEqual(plan.steps[str(right.id)].depends_on, [str(first.id)])
+        self.assertEqual(plan.steps[str(last.id)].depends_on, [str(left.id)])
+
+    def test_independent_branches_run_concurrently(self):
+        workflow = self._workflow(
+            [self._node('start', 'trigger'), self._node('a'), self._node('b'), self._node('join')],
+            [
+                {'source': 'start', 'target': 'a'},
+                {'source': 'start', 'target': 'b'},
+                {'source': 'a', 'target': 'join'},
+                {'source': 'b', 'target': 'join'},
+            ]
+        )
+        active, peak = 0, 0
+
+        async def action(step, data, context):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return {'from': step.id, 'input': data}
+
+        result = self._run(compile_workflow(workflow), {'event': 1}, {'action': action})
+        self.assertEqual(result['status'], 'completed')
+        self.assertEqual(peak, 2)
+        joined = result['outputs']['join']['input']
+        self.assertEqual(joined['a'], {'from': 'a', 'input': {'event': 1}})
+        self.assertEqual(joined['b'], {'from': 'b', 'input': {'event': 1}})
+
+    def test_transform_rules_and_condition_branches(self):
+        workflow = self._workflow(
+            [
+                self._node('start', 'trigger'),
+                self._node('check', 'condition', {'expression': 'amount > `100`'}),
+                self._node('big', 'transformer', {'rules': [{'type': 'map', 'config': {'total': 'amount'}}]}),
+                self._node('small'),
+            ],
+            [
+                {'source': 'start', 'target': 'check'},
+                {'source': 'check', 'target': 'big', 'sourceHandle': 'true'},
+                {'source': 'check', 'target': 'small', 'sourceHandle': 'false'},
+            ]
+        )
+        result = self._run(compile_workflow(workflow), {'amount': 250, 'note': 'x'})
+        self.assertEqual(result['steps']['small']['status'], 'skipped')
+        self.assertEqual(result['outputs'], {'big': {'total': 250}})
+
+    def test_failure_stops_scheduling_and_persists_state(self):
+        workflow = self._workflow(
+            [self._node('start', 'trigger'), self._node('broken'), self._node('after')],
+            [{'source': 'start', 'target': 'broken'}, {'source': 'broken', 'target': 'after'}]
+        )
+
+        async def action(step, data, context):
+            raise ConnectionError('integration down')
+
+        state_manager = RecordingStateManager()
+        result = self._run(
+            compile_workflow(workflow), {}, {'action': action}, state_manager=state_manager
+        )
+        self.assertEqual(result['status'], 'failed')
+        self.assertEqual(result['steps']['broken']['error'], 'integration down')
+        self.assertEqual(result['steps']['after']['status'], 'cancelled')
+        state_id, final_state = state_manager.saved[-1]
+        self.assertEqual(state_id, f"{workflow.id}:{result['run_id']}")
+        self.assertEqual(final_state['status'], 'failed')
+
+    def test_webhook_trigger_enqueues_run(self):
+        webhook = Webhook.objects.create(
+            name='Inbound',
+            workflow=self._workflow([self._node('start', 'trigger')], []),
+            webhook_type='trigger',
+            created_by=self.user
+        )
+        self.client.force_authenticate(user=self.user)
+        with mock.patch('tasks.workflow_tasks.execute_workflow.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(
+                    reverse('webhook-trigger', args=[webhook.id]), {'event': 'created'}, format='json'
+                )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        task_data = delay.call_args[0][0]
+        self.assertEqual(task_data['run_id'], response.data['run_id'])
+        self.assertEqual(task_data['payload'], {'event': 'created'})
+
+    def test_only_planning_failures_are_retried(self):
+        from tasks.workflow_tasks import execute_workflow
+        from .execution.plan_cache import plan_cache
+
+        task_data = {'workflow_id': 1, 'run_id': 'run-1'}
+        with mock.patch.object(plan_cache, 'get_plan', new=mock.AsyncMock(side_effect=ConnectionError('down'))), \
+                mock.patch.object(execute_workflow, 'retry', side_effect=RuntimeError('retrying')) as retry:
+            with self.assertRaises(RuntimeError):
+                execute_workflow.run(task_data)
+        retry.assert_called_once()
+
+        with mock.patch.object(plan_cache, 'get_plan', new=mock.AsyncMock(return_value=mock.Mock())), \
+                mock.patch('workflow_engine.execution.executor.run_plan', new=mock.AsyncMock(side_effect=ValueError('boom'))), \
+                mock.patch.object(execute_workflow, 'retry') as retry:
+            result = execute_workflow.run(task_data)
+        retry.assert_not_called()
+        self.assertEqual(result['status'], 'failed')
+        self.assertEqual(result['run_id'], 'run-1')
+
+
+class InMemoryPayloadStore:
+    def __init__(self):
+        self.payloads = {}
+
+    async def store_payloads(self, payloads, expires):
+        self.payloads.update(payloads)
+        return {name: f"memory:{name}" for name in payloads}
+
+
+class RunHistoryTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='history@example.com',
+            password='testpass123'
+        )
+        self.workflow = Workflow.objects.create(
+            name='Graph',
+            created_by=self.user,
+            workflow_data={'nodes': [
+                {'id': 'start', 'type': 'trigger', 'data': {}},
+                {'id': 'send', 'type': 'action', 'data': {}},
+            ], 'edges': [{'source': 'start', 'target': 'send'}]}
+        )
+
+    def test_executor_records_run_and_steps(self):
+        async def action(step, data, context):
+            return {'sent': data}
+
+        payloads = InMemoryPayloadStore()
+        recorder = RunRecorder(cache=payloads)
+        executor = WorkflowExecutor(
+            compile_workflow(self.workflow), handlers={**STEP_HANDLERS, 'action': action}, recorder=recorder
+        )
+        # Rows are written synchronously here; the test database is not
+        # visible from sync_to_async's worker thread
+        with mock.patch.object(recorder, '_write') as write:
+            result = asyncio.run(executor.run({'id': 7}))
+        RunRecorder._write(recorder, *write.call_args.args)
+
+        run = WorkflowRun.objects.get(pk=result['run_id'])
+        self.assertEqual(run.status, 'completed')
+        self.assertEqual(run.input_ref, f"memory:{result['run_id']}:input")
+        self.assertEqual(payloads.payloads[f"{result['run_id']}:output"], {'send': {'sent': {'id': 7}}})
+        steps = {step.step_id: step for step in run.steps.all()}
+        self.assertEqual(steps['send'].status, 'completed')
+        self.assertEqual(steps['send'].output_ref, f"memory:{result['run_id']}:step:send")
+        self.assertIsNotNone(steps['send'].started_at)
+
+    def _run_row(self, run_status, minutes_ago):
+        return WorkflowRun.objects.create(
+            workflow=self.workflow,
+            status=run_status,
+            started_at=timezone.now() - timedelta(minutes=minutes_ago)
+        )
+
+    def test_recent_runs_newest_first(self):
+        older = self._run_row('completed', 10)
+        newer = self._run_row('failed', 1)
+        WorkflowStepRun.objects.create(run=newer, step_id='send', task_type='action', status='failed')
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get(reverse('workflow-runs', args=[self.workflow.id]))
+        self.assertEqual([run['id'] for run in response.data['results']], [str(newer.id), str(older.id)])
+
+        response = self.client.get(reverse('workflow-run-list'), {'status': 'failed', 'expand': 'steps'})
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['steps'][0]['step_id'], 'send')
+
+    def test_runs_of_other_users_are_hidden(self):
+        self._run_row('completed', 1)
+        other = User.objects.create_user(email='other@example.com', password='testpass123')
+        self.client.force_authenticate(user=other)
+        response = self.client.get(reverse('workflow-run-list'))
+        self.assertEqual(response.data['results'], [])
+
+
+class InMemoryPlanStore:
+    """Stands in for WorkflowCache's plan methods"""
+
+    def __init__(self):
+        self.versions, self.plans = {}, {}
+
+    async def get_plan_version(self, workflow_id):
+        return self.versions.get(workflow_id)
+
+    async def cache_plan(self, workflow_id, plan, version, expires=None):
+        self.versions.setdefault(workflow_id, version)
+        if self.versions[workflow_id] != version:
+            return False
+        self.plans[workflow_id] = {'plan': plan, 'version': version}
+        return True
+
+    async def get_cached_plan(self, workflow_id, version):
+        cached = self.plans.get(workflow_id)
+        return cached['plan'] if cached and cached['version'] == version else None
+
+
+class UnavailablePlanStore:
+    async def get_plan_version(self, workflow_id):
+        raise ConnectionError('redis down')
+
+
+class PlanCacheTests(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='planner@example.com',
+            password='testpass123'
+        )
+        self.workflow = Workflow.objects.create(
+            name='Hot',
+            created_by=self.user,
+            workflow_data={
+                'nodes': [
+                    {'id': 'start', 'type': 'trigger', 'data': {}},
+                    {'id': 'check', 'type': 'condition', 'data': {'config': {'expression': 'ok'}}},
+                ],
+                'edges': [{'source': 'start', 'target': 'check'}],
+            }
+        )
+
+    def test_hot_lookups_skip_postgres(self):
+        store = InMemoryPlanStore()
+        cache = PlanCache(cache=store)
+        plan = asyncio.run(cache.get_plan(self.workflow.id))
+        self.assertEqual(plan.order, ['start', 'check'])
+        self.assertIsNotNone(plan.steps['check'].compiled['expression'])
+        self.assertIsNotNone(plan.steps['start'].handler)
+        with mock.patch.object(PlanCache, '_load') as load:
+            self.assertIs(asyncio.run(cache.get_plan(self.workflow.id)), plan)
+            # Another process: served from the shared store, still without Postgres
+            shared = asyncio.run(PlanCache(cache=store).get_plan(self.workflow.id))
+        load.assert_not_called()
+        self.assertEqual(shared.to_dict(), plan.to_dict())
+
+    def test_new_version_recompiles(self):
+        store = InMemoryPlanStore()
+        cache = PlanCache(cache=store)
+        plan = asyncio.run(cache.get_plan(self.workflow.id))
+        self.workflow.workflow_data['edges'] = []
+        self.workflow.save()
+        store.versions[str(self.workflow.id)] = self.workflow.updated_at.isoformat()
+        replanned = asyncio.run(cache.get_plan(self.workflow.id))
+        self.assertIsNot(replanned, plan)
+        self.assertEqual(replanned.steps['check'].depends_on, [])
+
+    def test_redis_outage_validates_local_copy(self):
+        cache = PlanCache(cache=UnavailablePlanStore())
+        plan = asyncio.run(cache.get_plan(self.workflow.id))
+        with mock.patch('workflow_engine.execution.plan_cache.compile_workflow') as compile_workflow:
+            self.assertIs(asyncio.run(cache.get_plan(self.workflow.id)), plan)
+        compile_workflow.assert_not_called()
+
+
+class WorkflowSignalTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='editor@example.com',
+            password='testpass123'
+        )
+        self.workflow = Workflow.objects.create(name='Edited', created_by=self.user, workflow_data={})
+
+    def test_task_save_bumps_workflow_version(self):
+        before = self.workflow.updated_at
+        with mock.patch('workflow_engine.signals.plan_cache.invalidate') as invalidate:
+            with self.captureOnCommitCallbacks(execute=True):
+                WorkflowTask.objects.create(
+                    workflow=self.workflow, name='Step', task_type='action', config={}, order=1
+                )
+        self.workflow.refresh_from_db()
+        self.assertGreater(self.workflow.updated_at, before)
+        invalidate.assert_called_with(self.workflow.id, self.workflow.updated_at.isoformat())
+
+
+class DataTransformerTests(TestCase):
+    rules = [
+        {'type': 'map', 'config': {'name': 'user.name', 'total': 'amount', 'tags': 'tags[].label'}},
+        {'type': 'convert', 'config': {'total': 'float'}},
+        {'type': 'format', 'config': {'name': 'string:Hi {}'}},
+    ]
+
+    def test_compiled_pipeline_matches_transform(self):
+        record = {'user': {'name': 'Ada'}, 'amount': '12', 'tags': [{'label': 'a'}, {'label': 'b'}]}
+        transformer = DataTransformer()
+        pipeline = transformer.compile(self.rules)
+        expected = {'name': 'Hi Ada', 'total': 12.0, 'tags': ['a', 'b']}
+        self.assertEqual(asyncio.run(pipeline.transform(record)), expected)
+        self.assertEqual(asyncio.run(transformer.transform(record, self.rules)), expected)
+        self.assertEqual(asyncio.run(pipeline.transform_many([record, record])), [expected, expected])
+
+    def test_pipelines_are_cached_by_rules(self):
+        transformer = DataTransformer()
+        self.assertIs(transformer.get_pipeline(self.rules), transformer.get_pipeline(list(self.rules)))
+
+    def test_invalid_rules_fail_at_compile_time(self):
+        transformer = DataTransformer()
+        with self.assertRaises(ValueError):
+            transformer.compile([{'type': 'map', 'config': {'bad': 'user.[name'}}])
+        with self.assertRaises(ValueError):
+            transformer.compile([{'type': 'convert', 'config': {'total': 'decimal'}}])
+
+    def test_plans_reject_invalid_step_rules(self):
+        user = User.objects.create_user(email='rules@example.com', password='testpass123')
+        workflow = Workflow.objects.create(
+            name='Broken',
+            created_by=user,
+            workflow_data={'nodes': [{
+                'id': 'shape',
+                'type': 'transformer',
+                'data': {'config': {'rules': [{'type': 'map', 'config': {'x': 'a.[b'}}]}}
+            }]}
+        )
+        with self.assertRaises(WorkflowCompileError):
+            prepare_plan(compile_workflow(workflow))
+
+    def test_columnar_batches_match_per_record_results(self):
+        records = [
+            {'id': index, 'user': {'name': f'u{index}'}, 'amount': str(index), 'note': '', 'items': [index]}
+            for index in range(5)
+        ]
+        records.append({'id': 5, 'extra': True})
+        rule_sets = [
+            [
+                {'type': 'map', 'config': {'id': 'id', 'name': 'user.name', 'amount': 'amount', 'note': 'note'}},
+                {'type': 'convert', 'config': {'amount': 'float', 'id': 'str'}},
+                {'type': 'format', 'config': {'amount': 'number'}},
+                {'type': 'validate', 'config': {'name': {'type': 'str'}}},
+            ],
+            [
+                {'type': 'filter', 'config': {'exclude': ['note']}},
+                {'type': 'map', 'config': {'first': 'items[0]', 'id': 'id'}},
+                {'type': 'convert', 'config': {'first': 'str'}},
+            ],
+            [
+                {'type': 'merge', 'config': {'user': {'method': 'overlay'}}},
+                {'type': 'filter', 'config': {'include': ['id', 'name', 'extra']}},
+            ],
+        ]
+        transformer = DataTransformer()
+        for rules in rule_sets:
+            pipeline = transformer.compile(rules)
+            expected = asyncio.run(pipeline.transform_many(records, columnar=False))
+            self.assertEqual(asyncio.run(pipeline.transform_many(records, columnar=True)), expected)
+        self.assertEqual(records[-1], {'id': 5, 'extra': True})
+
+    def test_columnar_validation_reports_errors(self):
+        pipeline = DataTransformer().compile([{'type': 'validate', 'config': {'amount': {'max': 10}}}])
+        with self.assertRaisesMessage(ValueError, 'Value for amount exceeds maximum'):
+            pipeline.apply_columnar([{'amount': 3}, {'amount': 0}, {'amount': 11}])
+
+
+class ValidationSchemaTests(TestCase):
+    config = {
+        'email': {'type': 'str', 'required': True, 'regex': r'^[^@]+@[^@]+$'},
+        'age': {'type': 'int', 'min': 0, 'max': 150},
+        'plan': {'enum': ['free', 'pro']},
+    }
+
+    def test_valid_data_passes_through(self):
+        data = {'email': 'a@example.com', 'age': 0, 'plan': 'pro'}
+        self.assertIs(compile_schema(self.config).validate(data), data)
+
+    def test_fail_fast_reports_first_failure(self):
+        with self.assertRaises(SchemaValidationError) as raised:
+            compile_schema(self.config).validate({'age': -1, 'plan': 'gold'})
+        self.assertEqual(raised.exception.errors, ['Required field email is missing'])
+
+    def test_collects_every_failure(self):
+        pipeline = DataTransformer().compile([
+            {'type': 'validate', 'config': self.config, 'collect_errors': True}
+        ])
+        with self.assertRaises(SchemaValidationError) as raised:
+            pipeline.apply({'email': 'nope', 'age': 'old', 'plan': 'gold'})
+        self.assertEqual(raised.exception.errors, [
+            'Value for email does not match pattern',
+            'Invalid type for age',
+            'Value for plan is not an allowed value',
+        ])
+
+    def test_type_names_are_whitelisted(self):
+        with self.assertRaises(ValueError):
+            compile_schema({'field': {'type': "__import__('os').getcwd"}})
+
+
+class StreamingTransformTests(TestCase):
+    rules = [
+        {'type': 'filter', 'config': {'exclude': ['raw']}},
+        {'type': 'convert', 'config': {'amount': 'int'}},
+    ]
+
+    def test_stream_is_lazy(self):
+        consumed = []
+
+        def rows():
+            for index in range(1000):
+                consumed.append(index)
+                yield {'amount': str(index), 'raw': 'x' * 10}
+
+        stream = DataTransformer().stream(rows(), self.rules)
+        self.assertEqual(next(stream), {'amount': 0})
+        self.assertEqual(len(consumed), 1)
+        chunked = DataTransformer().stream(rows(), self.rules, chunk_size=100)
+        self.assertEqual(sum(1 for _ in chunked), 1000)
+
+    def test_stages_copy_on_write(self):
+        pipeline = DataTransformer().compile([
+            {'type': 'convert', 'config': {'amount': 'int'}},
+            {'type': 'validate', 'config': {'amount': {'type': 'int'}}},
+        ])
+        untouched = {'name': 'x'}
+        self.assertIs(pipeline.apply(untouched), untouched)
+        record = {'amount': '3'}
+        self.assertEqual(pipeline.apply(record), {'amount': 3})
+        self.assertEqual(record, {'amount': '3'})
+
+    def test_transformer_step_streams_list_payloads(self):
+        user = User.objects.create_user(email='stream@example.com', password='testpass123')
+        workflow = Workflow.objects.create(
+            name='Export',
+            created_by=user,
+            workflow_data={'nodes': [{
+                'id': 'rows',
+                'type': 'transformer',
+                'data': {'config': {'items': 'rows', 'rules': self.rules}}
+            }]}
+        )
+        plan = prepare_plan(compile_workflow(workflow))
+        payload = {'sheet': 'A', 'rows': [{'amount': '1', 'raw': 'x'}, {'amount': '2'}]}
+        result = asyncio.run(WorkflowExecutor(plan).run(payload))
+        self.assertEqual(result['outputs']['rows'], {'sheet': 'A', 'rows': [{'amount': 1}, {'amount': 2}]})
+        self.assertEqual(payload['rows'][0], {'amount': '1', 'raw': 'x'})
+
+
+class InMemoryMemoStore:
+    """Stands in for WorkflowCache's memo methods"""
+
+    def __init__(self):
+        self.results, self.lookups = {}, []
+
+    async def get_step_result(self, key):
+        return self.results.get(key)
+
+    async def cache_step_result(self, key, result, expires):
+        self.results[key] = {'result': result, 'expires': expires}
+
+    async def record_memo_lookup(self, step_type, hit):
+        self.lookups.append((step_type, hit))
+
+
+class StepMemoTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='memo@example.com', password='testpass123')
+
+    def _plan(self, config, task_type='action'):
+        workflow = Workflow.objects.create(
+            name='Memo',
+            created_by=self.user,
+            workflow_data={'nodes': [{'id': 'step', 'type': task_type, 'data': {'config': config}}]}
+        )
+        return prepare_plan(compile_workflow(workflow))
+
+    def _run_twice(self, plan, payloads):
+        calls = []
+
+        async def handler(step, data, context):
+            calls.append(data)
+            return {'echo': data}
+
+        memo = StepMemo(cache=InMemoryMemoStore())
+        executor = WorkflowExecutor(plan, handlers={plan.steps['step'].task_type: handler}, memo=memo)
+        results = [asyncio.run(executor.run(payload)) for payload in payloads]
+        return calls, results, memo
+
+    def test_identical_inputs_are_served_from_memo(self):
+        plan = self._plan({'url': 'https://example.com', 'memoize': {'ttl': 30}})
+        calls, results, memo = self._run_twice(plan, [{'a': 1, 'b': 2}, {'b': 2, 'a': 1}, {'a': 2}])
+        self.assertEqual(len(calls), 2)
+        self.assertTrue(results[1]['steps']['step']['memoized'])
+        self.assertEqual(results[1]['outputs']['step'], {'echo': {'a': 1, 'b': 2}})
+        self.assertEqual(memo.stats(), {'action': {'hits': 1, 'misses': 2}})
+        self.assertEqual({entry['expires'] for entry in memo.cache.results.values()}, {30})
+
+    def test_memoization_defaults_and_opt_out(self):
+        calls, _, _ = self._run_twice(self._plan({}), [{'a': 1}, {'a': 1}])
+        self.assertEqual(len(calls), 2)
+        with self.settings(WORKFLOW_MEMO_TTLS={'transformer': 60}):
+            calls, _, _ = self._run_twice(self._plan({}, 'transformer'), [{'a': 1}, {'a': 1}])
+            self.assertEqual(len(calls), 1)
+            calls, _, _ = self._run_twice(self._plan({'memoize': False}, 'transformer'), [{'a': 1}, {'a': 1}])
+            self.assertEqual(len(calls), 2)
+
+    def test_ai_steps_are_served_from_memo(self):
+        memo = StepMemo(cache=InMemoryMemoStore())
+        plan = self._plan({'ai': {'model': 'gpt', 'prompt': 'Summarize'}}, 'ai_process')
+        self.assertEqual(memo.ttl_for(plan.steps['step']), 60 * 60)
+        with mock.patch('workflow_engine.execution.handlers.current_app.send_task') as send_task:
+            send_task.return_value = mock.Mock(id='task-0', result={'text': 'summary'}, **{
+                'ready.return_value': True, 'failed.return_value': False
+            })
+            executor = WorkflowExecutor(plan, memo=memo)
+            results = [asyncio.run(executor.run({'a': 1})) for _ in range(2)]
+        self.assertEqual(send_task.call_count, 1)
+        self.assertTrue(results[1]['steps']['step']['memoized'])
+        self.assertEqual(results[1]['outputs']['step'], {'text': 'summary'})
+        self.assertEqual(memo.stats(), {'ai_process': {'hits': 1, 'misses': 1}})
+
+    def test_config_changes_change_the_key(self):
+        memo = StepMemo(cache=InMemoryMemoStore())
+        first = self._plan({'url': 'https://a.example.com'}).steps['step']
+        second = self._plan({'url': 'https://b.example.com'}).steps['step']
+        self.assertNotEqual(memo.key(first, {'a': 1}), memo.key(second, {'a': 1}))
+        self.assertEqual(memo.key(first, {'a': 1}), memo.key(first, {'a': 1}))
+
+
+class InMemoryScheduleStore:
+    def __init__(self):
+        self.due = {}
+        self.fired = set()
+        self.lease = None
+
+    async def schedule_many(self, due):
+        self.due.update(due)
+
+    async def unschedule(self, *schedule_ids):
+        for schedule_id in schedule_ids:
+            self.due.pop(schedule_id, None)
+
+    async def claim_due(self, now, limit):
+        claimed = sorted((score, schedule_id) for schedule_id, score in self.due.items() if score <= now)[:limit]
+        for _, schedule_id in claimed:
+            del self.due[schedule_id]
+        return [(schedule_id, score) for score, schedule_id in claimed]
+
+    async def mark_fired(self, schedule_id, fire_time, expires):
+        key = (schedule_id, int(fire_time))
+        if key in self.fired:
+            return False
+        self.fired.add(key)
+        return True
+
+    async def clear_fired(self, schedule_id, fire_time):
+        self.fired.discard((schedule_id, int(fire_time)))
+
+    async def acquire_lease(self, name, owner, timeout):
+        if self.lease is not None:
+            return False
+        self.lease = owner
+        return True
+
+    async def release_lease(self, name, owner):
+        if self.lease == owner:
+            self.lease = None
+
+
+class WorkflowScheduleTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='scheduler@example.com',
+            password='testpass123'
+        )
+        self.workflow = Workflow.objects.create(name='Nightly', created_by=self.user, workflow_data={})
+        self.store = InMemoryScheduleStore()
+        self.scheduler = WorkflowScheduler(store=self.store)
+
+    def test_cron_expression(self):
+        moment = timezone.make_aware(timezone.datetime(2026, 10, 19, 9, 17))
+        self.assertEqual(CronExpression('*/15 * * * *').next_after(moment).minute, 30)
+        # Monday 09:17 -> Tuesday 09:00 on weekdays
+        self.assertEqual(CronExpression('0 9 * * 1-5').next_after(moment).day, 20)
+        # Both day fields restricted: either matches (Friday the 23rd)
+        self.assertEqual(CronExpression('0 12 13 * 5').next_after(moment).day, 23)
+        for expression in ('* * *', '61 * * * *', '0 0 30 2 *'):
+            with self.assertRaises(InvalidSchedule):
+                CronExpression(expression).next_after(moment)
+
+    def _schedule(self, **kwargs):
+        return WorkflowSchedule.objects.create(
+            workflow=self.workflow, schedule_type='interval', interval_seconds=600, jitter_seconds=0, **kwargs
+        )
+
+    def test_tick_fires_each_occurrence_once(self):
+        now = timezone.now()
+        schedule = self._schedule(payload={'report': 'daily'})
+        WorkflowSchedule.objects.filter(pk=schedule.pk).update(next_run_at=now - timedelta(seconds=5))
+        self.store.due[str(schedule.pk)] = (now - timedelta(seconds=5)).timestamp()
+
+        with mock.patch('tasks.workflow_tasks.execute_workflow.delay') as delay:
+            stats = self.scheduler.tick(now)
+            # A stale copy of the same occurrence (e.g. re-added by sync)
+            self.store.due[str(schedule.pk)] = (now - timedelta(seconds=5)).timestamp()
+            self.scheduler.tick(now)
+
+        self.assertEqual(stats['fired'], 1)
+        self.assertEqual(delay.call_count, 1)
+        self.assertEqual(delay.call_args[0][0]['payload'], {'report': 'daily'})
+        schedule.refresh_from_db()
+        self.assertEqual(schedule.next_run_at, now + timedelta(seconds=595))
+        self.assertEqual(self.store.due[str(schedule.pk)], schedule.next_run_at.timestamp())
+        self.assertIsNone(self.store.lease)
+
+    def test_failed_fire_restores_claimed_schedules(self):
+        now = timezone.now()
+        due = (now - timedelta(seconds=5)).timestamp()
+        schedules = [self._schedule() for _ in range(2)]
+        for schedule in schedules:
+            WorkflowSchedule.objects.filter(pk=schedule.pk).update(next_run_at=now - timedelta(seconds=5))
+            self.store.due[str(schedule.pk)] = due
+
+        with mock.patch('tasks.workflow_tasks.execute_workflow.delay', side_effect=[None, ConnectionError('broker down')]):
+            with self.assertRaises(ConnectionError):
+                self.scheduler.tick(now)
+        self.assertEqual(self.store.due, {str(schedule.pk): due for schedule in schedules})
+        self.assertEqual(len(self.store.fired), 1)
+        self.assertIsNone(self.store.lease)
+
+        # The one enqueued before the failure is not enqueued again
+        with mock.patch('tasks.workflow_tasks.execute_workflow.delay') as delay:
+            stats = self.scheduler.tick(now)
+        self.assertEqual((stats['fired'], delay.call_count), (1, 1))
+
+        with mock.patch('tasks.workflow_tasks.execute_workflow.delay'), \
+                mock.patch.object(WorkflowSchedule.objects, 'bulk_update', side_effect=RuntimeError('db down')):
+            self.store.due[str(schedules[0].pk)] = due
+            with self.assertRaises(RuntimeError):
+                self.scheduler.tick(now)
+        self.assertEqual(self.store.due[str(schedules[0].pk)], due)
+
+    def test_missed_runs_are_skipped_and_rescheduled(self):
+        now = timezone.now()
+        schedule = self._schedule()
+        WorkflowSchedule.objects.filter(pk=schedule.pk).update(next_run_at=now - timedelta(hours=1))
+        self.store.due[str(schedule.pk)] = (now - timedelta(hours=1)).timestamp()
+
+        with mock.patch('tasks.workflow_tasks.execute_workflow.delay') as delay:
+            stats = self.scheduler.tick(now)
+        self.assertEqual((stats['fired'], stats['missed']), (0, 1))
+        delay.assert_not_called()
+        schedule.refresh_from_db()
+        self.assertGreater(schedule.next_run_at, now)
+
+    def test_jitter_beyond_grace_still_fires(self):
+        now = timezone.now()
+        schedule = self._schedule()
+        WorkflowSchedule.objects.filter(pk=schedule.pk).update(
+            jitter_seconds=settings.WORKFLOW_SCHEDULE_MISFIRE_GRACE * 3, interval_seconds=86400
+        )
+        schedule.refresh_from_db()
+        offset = jitter_offset(schedule)
+        self.assertGreater(offset, 0)
+        # Due at its jittered time, later after the nominal time than the grace allows
+        nominal = now - timedelta(seconds=offset + 5)
+        WorkflowSchedule.objects.filter(pk=schedule.pk).update(next_run_at=nominal)
+        self.store.due[str(schedule.pk)] = (now - timedelta(seconds=5)).timestamp()
+
+        with mock.patch('tasks.workflow_tasks.execute_workflow.delay') as delay, \
+                self.settings(WORKFLOW_SCHEDULE_MISFIRE_GRACE=min(offset, 60)):
+            stats = self.scheduler.tick(now)
+        self.assertEqual((stats['fired'], stats['missed']), (1, 0))
+        self.assertEqual(delay.call_args[0][0]['scheduled_for'], nominal.isoformat())
+
+    def test_reactivating_workflow_reregisters_schedules(self):
+        schedule = self._schedule()
+        WorkflowSchedule.objects.filter(pk=schedule.pk).update(next_run_at=timezone.now() - timedelta(hours=3))
+        with mock.patch('workflow_engine.scheduling.scheduler.ScheduleStore', return_value=self.store):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.workflow.is_active = False
+                self.workflow.save()
+            self.assertNotIn(str(schedule.pk), self.store.due)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.workflow.is_active = True
+                self.workflow.save()
+
+        schedule.refresh_from_db()
+        # Runs missed while paused are skipped; the next one is registered
+        self.assertGreater(schedule.next_run_at, timezone.now())
+        self.assertEqual(self.store.due[str(schedule.pk)], schedule.next_run_at.timestamp())
+
+    def test_jitter_spreads_shared_fire_times(self):
+        schedules = [
+            WorkflowSchedule.objects.create(
+                workflow=self.workflow, schedule_type='cron', cron_expression='0 * * * *', jitter_seconds=60
+            )
+            for _ in range(5)
+        ]
+        offsets = {jitter_offset(schedule) for schedule in schedules}
+        self.assertGreater(len(offsets), 1)
+        self.assertTrue(all(0 <= offset <= 60 for offset in offsets))
+
+    def test_create_schedule_validates_definition(self):
+        self.client.force_authenticate(user=self.user)
+        url = reverse('workflow-schedule-list')
+        response = self.client.post(
+            url, {'workflow': self.workflow.id, 'schedule_type': 'cron', 'cron_expression': '0 25 * * *'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(
+            url, {'workflow': self.workflow.id, 'schedule_type': 'cron', 'cron_expression': '0 9 * * 1-5'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIsNotNone(response.data['next_run_at'])
+
+    def test_cannot_schedule_other_users_workflow(self):
+        other = User.objects.create_user(email='intruder@example.com', password='testpass123')
+        self.client.force_authenticate(user=other)
+        response = self.client.post(
+            reverse('workflow-schedule-list'),
+            {'workflow': self.workflow.id, 'schedule_type': 'interval', 'interval_seconds': 3600},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
-# Create your tests here.
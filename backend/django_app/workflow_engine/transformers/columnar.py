@@ -0,0 +1,75 @@
+# backend/django_app/workflow_engine/transformers/columnar.py
+
+from typing import Dict, Any, List, Optional, Tuple
+
+class _Missing:
+    """Placeholder for a field a record does not have"""
+
+    def __repr__(self):
+        return 'MISSING'
+
+MISSING = _Missing()
+
+class ColumnarBatch:
+    """
+    A batch of records held as one list per field. Column operations run
+    as single comprehensions over a list instead of a dict copy and lookup
+    per record; fields absent from a record hold MISSING and are dropped
+    again by ``to_records``.
+    """
+
+    def __init__(self, columns: Dict[str, List[Any]], length: int):
+        self.columns = columns
+        self.length = length
+
+    @classmethod
+    def from_records(cls, records: List[Dict[str, Any]]) -> 'ColumnarBatch':
+        length = len(records)
+        columns: Dict[str, List[Any]] = {}
+        for index, record in enumerate(records):
+            for key, value in record.items():
+                column = columns.get(key)
+                if column is None:
+                    column = columns[key] = [MISSING] * length
+                column[index] = value
+        return cls(columns, length)
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        if not self.columns:
+            return [{} for _ in range(self.length)]
+        names = list(self.columns)
+        return [
+            {name: value for name, value in zip(names, row) if value is not MISSING}
+            for row in zip(*self.columns.values())
+        ]
+
+    def present(self, name: str) -> List[Any]:
+        """Values of a column that are set and truthy (what per-record rules act on)"""
+        return [value for value in self.columns.get(name, ()) if value is not MISSING and value]
+
+def field_path(parsed: Dict[str, Any]) -> Optional[Tuple[str, ...]]:
+    """
+    The key path of a JMESPath AST that is a plain field or dotted field
+    chain (``a`` or ``a.b.c``), or None for anything more complex
+    """
+    if parsed.get('type') == 'field':
+        return (parsed['value'],)
+    if parsed.get('type') == 'subexpression':
+        path = ()
+        for child in parsed['children']:
+            child_path = field_path(child)
+            if child_path is None:
+                return None
+            path += child_path
+        return path
+    return None
+
+def project(batch: ColumnarBatch, path: Tuple[str, ...]) -> List[Any]:
+    """Column of ``path`` values with JMESPath semantics (None when absent)"""
+    column = batch.columns.get(path[0])
+    if column is None:
+        return [None] * batch.length
+    values = [None if value is MISSING else value for value in column]
+    for key in path[1:]:
+        values = [value.get(key) if isinstance(value, dict) else None for value in values]
+    return values
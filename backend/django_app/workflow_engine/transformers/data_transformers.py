@@ -1,10 +1,16 @@
 # backend/django_app/workflow_engine/transformers/data_transformer.py
 
-from typing import Dict, Any, List, Union
+from typing import Dict, Any, List, Union, Callable, Iterable, Iterator, NamedTuple, Optional
 from enum import Enum
+import functools
+import itertools
 import json
+import threading
 import jmespath
+from cachetools import LRUCache
 from datetime import datetime
+from .columnar import ColumnarBatch, MISSING, field_path, project
+from .validation import compile_schema
 
 class TransformationType(Enum):
     MAP = "map"
@@ -14,20 +20,153 @@ class TransformationType(Enum):
     VALIDATE = "validate"
     CONVERT = "convert"
 
+TYPE_CONVERTERS = {
+    'int': int,
+    'float': float,
+    'str': str,
+    'bool': bool,
+    'list': lambda x: json.loads(x) if isinstance(x, str) else list(x),
+    'dict': lambda x: json.loads(x) if isinstance(x, str) else dict(x)
+}
+
+# Batches at least this large are transformed column by column
+COLUMNAR_MIN_BATCH = 64
+
+class Stage(NamedTuple):
+    """A compiled rule: per-record function and, when it has one, column function"""
+    row: Callable[[Dict[str, Any]], Dict[str, Any]]
+    columns: Optional[Callable[[ColumnarBatch], ColumnarBatch]] = None
+
+class TransformationPipeline:
+    """
+    Transformation rules compiled once: JMESPath expressions are parsed and
+    formatters/converters resolved up front, so applying the pipeline is a
+    loop over prepared stages. Reusable across records and calls.
+
+    Stages never mutate their input. They copy on write: a record is only
+    copied by the first stage that changes it, and a record no stage
+    changes is returned as is.
+    """
+    
+    def __init__(self, stages: List[Stage]):
+        self.stages = tuple(stages)
+        
+    def apply(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        transformed_data = data
+        for stage in self.stages:
+            transformed_data = stage.row(transformed_data)
+        return transformed_data
+        
+    def stream(self, records: Iterable[Dict[str, Any]], chunk_size: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily transform records one at a time (or ``chunk_size`` at a time
+        in columnar mode), so memory stays bounded by the chunk rather than
+        the payload
+        """
+        if not chunk_size:
+            apply = self.apply
+            for record in records:
+                yield apply(record)
+            return
+        records = iter(records)
+        while chunk := list(itertools.islice(records, chunk_size)):
+            yield from self.apply_columnar(chunk)
+            
+    def apply_to_items(self, data: Union[Dict[str, Any], List[Dict[str, Any]]], items_key: Optional[str] = None) -> Any:
+        """
+        Transform the records of a list payload (or of its ``items_key``
+        list) one by one; the rest of the payload is shared, not copied
+        """
+        if items_key is None:
+            return list(self.stream(data))
+        items = data.get(items_key)
+        if not isinstance(items, list):
+            return data
+        return {**data, items_key: list(self.stream(items))}
+        
+    def apply_columnar(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Transform a batch as columns. Runs of stages with a column form
+        (filter, convert, format, validate, field-path maps) work on a
+        ColumnarBatch; other stages fall back to per-record application.
+        """
+        batch = None
+        for stage in self.stages:
+            if stage.columns is not None:
+                if batch is None:
+                    batch = ColumnarBatch.from_records(records)
+                batch = stage.columns(batch)
+            else:
+                if batch is not None:
+                    records, batch = batch.to_records(), None
+                records = [stage.row(record) for record in records]
+        return batch.to_records() if batch is not None else records
+        
+    async def transform(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        return self.apply(data)
+        
+    async def transform_many(
+        self,
+        records: Iterable[Dict[str, Any]],
+        columnar: Optional[bool] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Transform a batch of records; ``columnar`` defaults to batches of
+        at least COLUMNAR_MIN_BATCH records
+        """
+        records = list(records)
+        if columnar is None:
+            columnar = len(records) >= COLUMNAR_MIN_BATCH
+        if columnar:
+            return self.apply_columnar(records)
+        apply = self.apply
+        return [apply(record) for record in records]
+
 class DataTransformer:
     """
     Transform data between workflow steps
     """
     
-    def __init__(self):
-        self.transformers = {
-            TransformationType.MAP: self._map_data,
-            TransformationType.FILTER: self._filter_data,
-            TransformationType.MERGE: self._merge_data,
-            TransformationType.FORMAT: self._format_data,
-            TransformationType.VALIDATE: self._validate_data,
-            TransformationType.CONVERT: self._convert_data
+    def __init__(self, cache_size: int = 256):
+        self.compilers = {
+            TransformationType.MAP: self._compile_map,
+            TransformationType.FILTER: self._compile_filter,
+            TransformationType.MERGE: self._compile_merge,
+            TransformationType.FORMAT: self._compile_format,
+            TransformationType.VALIDATE: self._compile_validate,
+            TransformationType.CONVERT: self._compile_convert
         }
+        self._lock = threading.Lock()
+        self._pipelines = LRUCache(maxsize=cache_size)
+        
+    def compile(self, transformation_rules: List[Dict[str, Any]]) -> TransformationPipeline:
+        """
+        Compile transformation rules into a reusable pipeline
+        """
+        stages = []
+        for rule in transformation_rules:
+            transform_type = TransformationType(rule.get('type'))
+            if transform_type is TransformationType.VALIDATE:
+                stages.append(self._compile_validate(
+                    rule.get('config', {}),
+                    fail_fast=not rule.get('collect_errors', False)
+                ))
+            else:
+                stages.append(self.compilers[transform_type](rule.get('config', {})))
+        return TransformationPipeline(stages)
+        
+    def get_pipeline(self, transformation_rules: List[Dict[str, Any]]) -> TransformationPipeline:
+        """
+        Compiled pipeline for rules, cached by their canonical JSON form
+        """
+        key = json.dumps(transformation_rules, sort_keys=True, default=str)
+        with self._lock:
+            pipeline = self._pipelines.get(key)
+        if pipeline is None:
+            pipeline = self.compile(transformation_rules)
+            with self._lock:
+                self._pipelines[key] = pipeline
+        return pipeline
         
     async def transform(
         self,
@@ -37,116 +176,182 @@ class DataTransformer:
         """
         Apply transformation rules to data
         """
-        transformed_data = data.copy()
+        return self.get_pipeline(transformation_rules).apply(data)
         
-        for rule in transformation_rules:
-            transform_type = TransformationType(rule.get('type'))
-            transform_config = rule.get('config', {})
-            
-            transformer = self.transformers.get(transform_type)
-            if transformer:
-                transformed_data = await transformer(
-                    transformed_data,
-                    transform_config
-                )
-                
-        return transformed_data
+    async def transform_many(
+        self,
+        records: Iterable[Dict[str, Any]],
+        transformation_rules: List[Dict[str, Any]],
+        columnar: Optional[bool] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Apply transformation rules to a batch of records
+        """
+        return await self.get_pipeline(transformation_rules).transform_many(records, columnar=columnar)
         
-    async def _map_data(
+    def stream(
         self,
-        data: Dict[str, Any],
-        config: Dict[str, str]
-    ) -> Dict[str, Any]:
+        records: Iterable[Dict[str, Any]],
+        transformation_rules: List[Dict[str, Any]],
+        chunk_size: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily apply transformation rules to records from any iterable
+        """
+        return self.get_pipeline(transformation_rules).stream(records, chunk_size=chunk_size)
+        
+    def _compile_map(self, config: Dict[str, str]) -> Stage:
         """
         Map data fields using JMESPath expressions
         """
-        result = {}
+        expressions = {}
         for target_key, expression in config.items():
             try:
-                result[target_key] = jmespath.search(expression, data)
+                expressions[target_key] = jmespath.compile(expression)
             except Exception as e:
                 raise ValueError(f"Mapping error for {target_key}: {str(e)}")
-        return result
+                
+        def map_data(data: Dict[str, Any]) -> Dict[str, Any]:
+            result = {}
+            for target_key, expression in expressions.items():
+                try:
+                    result[target_key] = expression.search(data)
+                except Exception as e:
+                    raise ValueError(f"Mapping error for {target_key}: {str(e)}")
+            return result
+            
+        # Plain field paths project columns; other expressions run per record
+        paths = {key: field_path(expression.parsed) for key, expression in expressions.items()}
+        if None in paths.values():
+            return Stage(map_data)
+            
+        def map_columns(batch: ColumnarBatch) -> ColumnarBatch:
+            return ColumnarBatch(
+                {target_key: project(batch, path) for target_key, path in paths.items()},
+                batch.length
+            )
+        return Stage(map_data, map_columns)
         
-    async def _filter_data(
-        self,
-        data: Dict[str, Any],
-        config: Dict[str, Union[List[str], Dict[str, Any]]]
-    ) -> Dict[str, Any]:
+    def _compile_filter(self, config: Dict[str, Union[List[str], Dict[str, Any]]]) -> Stage:
         """
         Filter data based on include/exclude rules
         """
         if isinstance(config.get('include'), list):
-            return {k: v for k, v in data.items() if k in config['include']}
+            keep = frozenset(config['include']).__contains__
         elif isinstance(config.get('exclude'), list):
-            return {k: v for k, v in data.items() if k not in config['exclude']}
-        return data
+            exclude = frozenset(config['exclude'])
+            keep = lambda key: key not in exclude
+        else:
+            return Stage(lambda data: data, lambda batch: batch)
+            
+        return Stage(
+            lambda data: {k: v for k, v in data.items() if keep(k)},
+            lambda batch: ColumnarBatch(
+                {k: column for k, column in batch.columns.items() if keep(k)},
+                batch.length
+            )
+        )
         
-    async def _merge_data(
-        self,
-        data: Dict[str, Any],
-        config: Dict[str, Any]
-    ) -> Dict[str, Any]:
+    def _compile_merge(self, config: Dict[str, Any]) -> Stage:
         """
         Merge multiple data sources
         """
-        result = data.copy()
-        for source_key, merge_config in config.items():
-            if source_data := data.get(source_key):
-                if merge_config.get('method') == 'overlay':
-                    result.update(source_data)
-                elif merge_config.get('method') == 'append':
-                    result.setdefault(source_key, []).extend(source_data)
-        return result
+        sources = [
+            (source_key, merge_config.get('method'))
+            for source_key, merge_config in config.items()
+        ]
         
-    async def _format_data(
-        self,
-        data: Dict[str, Any],
-        config: Dict[str, str]
-    ) -> Dict[str, Any]:
+        def merge_data(data: Dict[str, Any]) -> Dict[str, Any]:
+            result = data
+            for source_key, method in sources:
+                if source_data := data.get(source_key):
+                    if method == 'overlay':
+                        result = {**result, **source_data}
+                    elif method == 'append':
+                        result = {**result, source_key: [*result.get(source_key, []), *source_data]}
+            return result
+        return Stage(merge_data)
+        
+    def _compile_format(self, config: Dict[str, str]) -> Stage:
         """
         Format data fields according to specified formats
         """
-        result = data.copy()
+        formatters = []
         for field, format_spec in config.items():
-            if value := result.get(field):
-                if format_spec == 'iso_date':
-                    result[field] = self._format_date(value)
-                elif format_spec == 'number':
-                    result[field] = self._format_number(value)
-                elif format_spec.startswith('string:'):
-                    result[field] = self._format_string(
-                        value,
-                        format_spec.split(':')[1]
-                    )
-        return result
-        
-    async def _validate_data(
-        self,
-        data: Dict[str, Any],
-        config: Dict[str, Dict[str, Any]]
-    ) -> Dict[str, Any]:
+            if format_spec == 'iso_date':
+                formatters.append((field, self._format_date))
+            elif format_spec == 'number':
+                formatters.append((field, self._format_number))
+            elif format_spec.startswith('string:'):
+                formatters.append((
+                    field,
+                    functools.partial(self._format_string, format_spec=format_spec.split(':')[1])
+                ))
+                
+        def format_data(data: Dict[str, Any]) -> Dict[str, Any]:
+            result = data
+            for field, formatter in formatters:
+                if value := result.get(field):
+                    if result is data:
+                        result = data.copy()
+                    result[field] = formatter(value)
+            return result
+            
+        def format_columns(batch: ColumnarBatch) -> ColumnarBatch:
+            for field, formatter in formatters:
+                if field in batch.columns:
+                    batch.columns[field] = [
+                        formatter(value) if value is not MISSING and value else value
+                        for value in batch.columns[field]
+                    ]
+            return batch
+        return Stage(format_data, format_columns)
+        
+    def _compile_validate(self, config: Dict[str, Dict[str, Any]], fail_fast: bool = True) -> Stage:
         """
-        Validate data against rules
+        Validate data against a precompiled schema
         """
-        for field, rules in config.items():
-            if value := data.get(field):
-                self._validate_field(field, value, rules)
-        return data
+        schema = compile_schema(config, fail_fast=fail_fast)
         
-    async def _convert_data(
-        self,
-        data: Dict[str, Any],
-        config: Dict[str, str]
-    ) -> Dict[str, Any]:
+        def validate_columns(batch: ColumnarBatch) -> ColumnarBatch:
+            schema.validate_columns(batch.columns, batch.length, missing=MISSING)
+            return batch
+        return Stage(schema.validate, validate_columns)
+        
+    def _compile_convert(self, config: Dict[str, str]) -> Stage:
         """
         Convert data types
         """
-        result = data.copy()
-        for field, target_type in config.items():
-            if value := result.get(field):
-                result[field] = self._convert_value(value, target_type)
-        return result
+        converters = [
+            (field, self._get_converter(target_type))
+            for field, target_type in config.items()
+        ]
+        
+        def convert_data(data: Dict[str, Any]) -> Dict[str, Any]:
+            result = data
+            for field, converter in converters:
+                if value := result.get(field):
+                    if result is data:
+                        result = data.copy()
+                    try:
+                        result[field] = converter(value)
+                    except Exception as e:
+                        raise ValueError(f"Conversion error: {str(e)}")
+            return result
+            
+        def convert_columns(batch: ColumnarBatch) -> ColumnarBatch:
+            for field, converter in converters:
+                if field not in batch.columns:
+                    continue
+                try:
+                    batch.columns[field] = [
+                        converter(value) if value is not MISSING and value else value
+                        for value in batch.columns[field]
+                    ]
+                except Exception as e:
+                    raise ValueError(f"Conversion error: {str(e)}")
+            return batch
+        return Stage(convert_data, convert_columns)
         
     def _format_date(self, value: Union[str, datetime]) -> str:
         """Format date to ISO format"""
@@ -162,38 +367,16 @@ class DataTransformer:
         """Format string according to specification"""
         return format_spec.format(str(value))
         
-    def _validate_field(
-        self,
-        field: str,
-        value: Any,
-        rules: Dict[str, Any]
-    ):
-        """Validate field against rules"""
-        if 'type' in rules:
-            if not isinstance(value, eval(rules['type'])):
-                raise ValueError(f"Invalid type for {field}")
-        if 'required' in rules and rules['required'] and value is None:
-            raise ValueError(f"Required field {field} is missing")
-        if 'min' in rules and value < rules['min']:
-            raise ValueError(f"Value for {field} is below minimum")
-        if 'max' in rules and value > rules['max']:
-            raise ValueError(f"Value for {field} exceeds maximum")
+    def _get_converter(self, target_type: str) -> Callable[[Any], Any]:
+        """Resolve the converter for a target type"""
+        converter = TYPE_CONVERTERS.get(target_type)
+        if not converter:
+            raise ValueError(f"Unknown target type: {target_type}")
+        return converter
         
     def _convert_value(self, value: Any, target_type: str) -> Any:
         """Convert value to target type"""
-        type_converters = {
-            'int': int,
-            'float': float,
-            'str': str,
-            'bool': bool,
-            'list': lambda x: json.loads(x) if isinstance(x, str) else list(x),
-            'dict': lambda x: json.loads(x) if isinstance(x, str) else dict(x)
-        }
-        
-        converter = type_converters.get(target_type)
-        if not converter:
-            raise ValueError(f"Unknown target type: {target_type}")
-            
+        converter = self._get_converter(target_type)
         try:
             return converter(value)
         except Exception as e:
@@ -0,0 +1,137 @@
+# backend/django_app/workflow_engine/transformers/validation.py
+
+from typing import Dict, Any, List, Callable, Optional
+import re
+
+# Type names accepted in validation rules; nothing else is ever resolved
+TYPE_WHITELIST = {
+    'str': str,
+    'string': str,
+    'int': int,
+    'integer': int,
+    'float': float,
+    'number': (int, float),
+    'bool': bool,
+    'boolean': bool,
+    'list': list,
+    'array': list,
+    'dict': dict,
+    'object': dict,
+}
+
+class SchemaValidationError(ValueError):
+    """Raised when data fails validation; ``errors`` lists every failure found"""
+
+    def __init__(self, errors: List[str]):
+        self.errors = errors
+        super().__init__('; '.join(errors))
+
+Check = Callable[[Any], Optional[str]]
+
+class FieldValidator:
+    """
+    Precompiled checks for one field. The type check runs first; the
+    remaining checks run in rule order and each returns an error or None.
+    """
+
+    def __init__(self, field: str, rules: Dict[str, Any]):
+        self.field = field
+        self.required = bool(rules.get('required'))
+        self.checks: List[Check] = []
+
+        self.expected_type = None
+        if 'type' in rules:
+            self.expected_type = TYPE_WHITELIST.get(rules['type'])
+            if self.expected_type is None:
+                raise ValueError(f"Unknown type {rules['type']!r} for {field}")
+        if 'min' in rules:
+            minimum = rules['min']
+            self.checks.append(
+                lambda value: f"Value for {field} is below minimum" if value < minimum else None
+            )
+        if 'max' in rules:
+            maximum = rules['max']
+            self.checks.append(
+                lambda value: f"Value for {field} exceeds maximum" if value > maximum else None
+            )
+        if 'regex' in rules:
+            try:
+                pattern = re.compile(rules['regex'])
+            except re.error as e:
+                raise ValueError(f"Invalid regex for {field}: {str(e)}")
+            self.checks.append(
+                lambda value: None if isinstance(value, str) and pattern.search(value)
+                else f"Value for {field} does not match pattern"
+            )
+        if 'enum' in rules:
+            allowed = list(rules['enum'])
+            self.checks.append(
+                lambda value: None if value in allowed else f"Value for {field} is not an allowed value"
+            )
+
+    def errors(self, value: Any, fail_fast: bool = True) -> List[str]:
+        if value is None:
+            return [f"Required field {self.field} is missing"] if self.required else []
+        if self.expected_type is not None and not isinstance(value, self.expected_type):
+            return [f"Invalid type for {self.field}"]
+        errors = []
+        for check in self.checks:
+            try:
+                error = check(value)
+            except TypeError:
+                # Not comparable with the rule's bounds; nothing else applies
+                errors.append(f"Invalid type for {self.field}")
+                break
+            if error:
+                errors.append(error)
+                if fail_fast:
+                    break
+        return errors
+
+class Schema:
+    """
+    A compiled VALIDATE rule. ``fail_fast`` stops at the first failure;
+    otherwise every failing check of every field (and record) is reported.
+    """
+
+    def __init__(self, config: Dict[str, Dict[str, Any]], fail_fast: bool = True):
+        self.fail_fast = fail_fast
+        self.fields = [FieldValidator(field, rules or {}) for field, rules in config.items()]
+
+    def errors(self, data: Dict[str, Any]) -> List[str]:
+        errors = []
+        for validator in self.fields:
+            errors.extend(validator.errors(data.get(validator.field), self.fail_fast))
+            if errors and self.fail_fast:
+                break
+        return errors
+
+    def validate(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Return ``data`` unchanged or raise SchemaValidationError"""
+        if errors := self.errors(data):
+            raise SchemaValidationError(errors)
+        return data
+
+    def validate_columns(self, columns: Dict[str, List[Any]], length: int, missing: Any = None):
+        """
+        Validate a batch of ``length`` records held as columns; ``missing``
+        marks fields a record does not have. Errors name the record index.
+        """
+        errors = []
+        for validator in self.fields:
+            column = columns.get(validator.field)
+            if column is None:
+                if not validator.required:
+                    continue
+                column = [missing] * length
+            for index, value in enumerate(column):
+                failures = validator.errors(None if value is missing else value, self.fail_fast)
+                errors.extend(f"Record {index}: {failure}" for failure in failures)
+                if errors and self.fail_fast:
+                    raise SchemaValidationError(errors)
+        if errors:
+            raise SchemaValidationError(errors)
+
+def compile_schema(config: Dict[str, Dict[str, Any]], fail_fast: bool = True) -> Schema:
+    """Compile a VALIDATE rule config (``{field: {type, required, min, max, regex, enum}}``)"""
+    return Schema(config, fail_fast=fail_fast)
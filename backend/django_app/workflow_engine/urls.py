@@ -4,7 +4,9 @@ from .views import (
     WorkflowViewSet,
     WorkflowTaskViewSet,
     WebhookViewSet,
-    WebhookLogViewSet
+    WebhookLogViewSet,
+    WorkflowRunViewSet,
+    WorkflowScheduleViewSet
 )
 
 # Creating a router and registering viewsets with it
@@ -14,6 +16,8 @@ router.register(r'workflows', WorkflowViewSet, basename='workflow')
 router.register(r'tasks', WorkflowTaskViewSet, basename='task')
 router.register(r'webhooks', WebhookViewSet, basename='webhook')
 router.register(r'webhook-logs', WebhookLogViewSet, basename='webhook-log')
+router.register(r'runs', WorkflowRunViewSet, basename='workflow-run')
+router.register(r'schedules', WorkflowScheduleViewSet, basename='workflow-schedule')
 
 # The API URLs are determined automatically by the router
 urlpatterns = [
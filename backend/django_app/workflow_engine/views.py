@@ -1,22 +1,125 @@
+import uuid
+
+from asgiref.sync import async_to_sync
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
+from django.db import transaction
+from django.db.models import Count, OuterRef, Prefetch, Subquery
+
+from core.pagination import (
+    WorkflowTaskCursorPagination,
+    WebhookLogCursorPagination,
+    WorkflowRunCursorPagination
+)
+from .models import Workflow, WorkflowTask, Webhook, WebhookLog, WorkflowRun, WorkflowSchedule
+from .serializers import (
+    WorkflowSerializer,
+    WorkflowTaskSerializer,
+    WebhookSerializer,
+    WebhookLogSerializer,
+    WorkflowRunSerializer,
+    WorkflowScheduleSerializer
+)
+from redis_service.exceptions import StateError
+from redis_service.state.workflow_state_manager import WorkflowStateManager
+
+# Number of logs embedded per webhook with ?expand=logs
+RECENT_WEBHOOK_LOGS = 20
+
+# Most run states returned by one ?runs= lookup
+MAX_RUN_STATES = 500
+
+
+class ExpandQueryMixin:
+    """
+    Parses ``?expand=a,b`` into a set limited to ``expandable`` names
+    and exposes it to serializers through the context
+    """
+    expandable = ()
+    default_expand = {}
 
-from .models import Workflow, WorkflowTask, Webhook, WebhookLog
-from .serializers import WorkflowSerializer, WorkflowTaskSerializer, WebhookSerializer, WebhookLogSerializer
+    def get_expand(self):
+        if not hasattr(self, '_expand'):
+            param = self.request.query_params.get('expand')
+            if param is None:
+                self._expand = set(self.default_expand.get(self.action, ()))
+            else:
+                requested = {name.strip() for name in param.split(',')}
+                self._expand = requested & set(self.expandable)
+        return self._expand
 
-class WorkflowViewSet(viewsets.ModelViewSet):
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['expand'] = self.get_expand()
+        return context
+
+
+def annotate_webhook_summary(queryset):
+    """Annotate log count and latest log timestamp onto a Webhook queryset"""
+    latest_log = WebhookLog.objects.filter(
+        webhook=OuterRef('pk')
+    ).order_by('-timestamp').values('timestamp')[:1]
+    return queryset.annotate(
+        log_count=Count('logs', distinct=True),
+        last_triggered_at=Subquery(latest_log)
+    )
+
+
+def recent_logs_prefetch(lookup='logs'):
+    """Prefetch only the most recent logs of each webhook"""
+    return Prefetch(
+        lookup,
+        queryset=WebhookLog.objects.order_by('-timestamp')[:RECENT_WEBHOOK_LOGS]
+    )
+
+
+class WorkflowViewSet(ExpandQueryMixin, viewsets.ModelViewSet):
     serializer_class = WorkflowSerializer
     permission_classes = [IsAuthenticated]
+    expandable = ('tasks', 'webhooks', 'logs')
+    default_expand = {'retrieve': ('tasks', 'webhooks')}
 
     def get_queryset(self):
-        return Workflow.objects.filter(created_by=self.request.user)
+        queryset = Workflow.objects.filter(created_by=self.request.user)
+        if self.action not in ('list', 'retrieve'):
+            return queryset
+
+        latest_log = WebhookLog.objects.filter(
+            webhook__workflow=OuterRef('pk')
+        ).order_by('-timestamp').values('timestamp')[:1]
+        queryset = queryset.annotate(
+            task_count=Count('tasks', distinct=True),
+            webhook_count=Count('webhooks', distinct=True),
+            last_activity_at=Subquery(latest_log)
+        )
+
+        expand = self.get_expand()
+        if 'tasks' in expand:
+            queryset = queryset.prefetch_related('tasks')
+        if 'webhooks' in expand:
+            webhooks = annotate_webhook_summary(Webhook.objects.all())
+            queryset = queryset.prefetch_related(Prefetch('webhooks', queryset=webhooks))
+            if 'logs' in expand:
+                queryset = queryset.prefetch_related(recent_logs_prefetch('webhooks__logs'))
+        return queryset
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
+    def _get_limits(self, profile):
+        current_count = self.request.user.workflow_set.filter(is_active=True).count()
+        max_allowed = profile.get_workflow_limit()
+        return {
+            'plan': profile.plan_type,
+            'max_allowed': max_allowed,
+            'current_count': current_count,
+            'remaining': max(0, max_allowed - current_count)
+        }
+
     @action(detail=False, methods=['get'])
     def limits(self, request):
         """Get workflow limit information for current user"""
@@ -29,21 +132,101 @@ class WorkflowViewSet(viewsets.ModelViewSet):
         })
 
     def list(self, request, *args, **kwargs):
-        response = super().list(request, *args, **kwargs)
-        # Add limit information to list response
         profile = request.user.profile
+        # Every listed workflow belongs to the current user, so the limit
+        # block is computed once instead of once per row
+        limits = self._get_limits(profile)
+        self._workflow_limits = limits
+
+        response = super().list(request, *args, **kwargs)
         
+        limits_data = {
+            'plan': limits['plan'],
+            'total_limit': limits['max_allowed'],
+            'remaining': limits['remaining']
+        }
         # Convert response.data to a dict if it's a list
         if isinstance(response.data, list):
             response.data = {
                 'results': response.data,
-                'limits': {
-                    'plan': profile.plan_type,
-                    'total_limit': profile.get_workflow_limit(),
-                    'remaining': profile.workflows_remaining()
-                }
+                'limits': limits_data
             }
+        else:
+            response.data['limits'] = limits_data
         return response
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if hasattr(self, '_workflow_limits'):
+            context['workflow_limits'] = self._workflow_limits
+        return context
+
+    @action(detail=False, methods=['get'], url_path='run-status')
+    def run_status(self, request):
+        """
+        Current states of the user's workflow runs in one call: the runs in
+        ``?status=`` (default ``running``), or those listed in
+        ``?runs=<workflow_id>:<run_id>,...``
+        """
+        runs = request.query_params.get('runs')
+        run_ids = [run.strip() for run in runs.split(',') if run.strip()][:MAX_RUN_STATES] if runs else None
+
+        async def load_states():
+            # A fresh client, as async_to_sync runs each call on its own
+            # event loop; closed here so polling doesn't leak connections
+            state_manager = WorkflowStateManager()
+            try:
+                if run_ids is not None:
+                    return await state_manager.get_workflow_states(run_ids)
+                return await state_manager.get_workflows_by_status(
+                    request.user.pk, request.query_params.get('status', 'running')
+                )
+            finally:
+                await state_manager.close()
+
+        try:
+            states = async_to_sync(load_states)()
+            if run_ids is not None:
+                states = {
+                    run_id: state for run_id, state in states.items()
+                    if state and str(state.get('user_id')) == str(request.user.pk)
+                }
+        except StateError:
+            return Response(
+                {"error": "Workflow run state is temporarily unavailable"},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        return Response({'results': states})
+
+    @action(detail=True, methods=['get'])
+    def tasks(self, request, pk=None):
+        """Cursor-paginated tasks of a workflow"""
+        workflow = self.get_object()
+        queryset = WorkflowTask.objects.filter(workflow=workflow)
+        paginator = WorkflowTaskCursorPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = WorkflowTaskSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=['get'])
+    def logs(self, request, pk=None):
+        """Cursor-paginated webhook logs across all webhooks of a workflow"""
+        workflow = self.get_object()
+        queryset = WebhookLog.objects.filter(webhook__workflow=workflow)
+        paginator = WebhookLogCursorPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = WebhookLogSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=['get'])
+    def runs(self, request, pk=None):
+        """Cursor-paginated recent runs of a workflow"""
+        workflow = self.get_object()
+        queryset = WorkflowRun.objects.filter(workflow=workflow)
+        paginator = WorkflowRunCursorPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = WorkflowRunSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
     
 class WorkflowTaskViewSet(viewsets.ModelViewSet):
     """
@@ -51,6 +234,7 @@ class WorkflowTaskViewSet(viewsets.ModelViewSet):
     """
     serializer_class = WorkflowTaskSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = WorkflowTaskCursorPagination
     
     def get_queryset(self):
         """
@@ -67,18 +251,26 @@ class WorkflowTaskViewSet(viewsets.ModelViewSet):
             raise PermissionError("You don't have permission to add tasks to this workflow")
         serializer.save()
         
-class WebhookViewSet(viewsets.ModelViewSet):
+class WebhookViewSet(ExpandQueryMixin, viewsets.ModelViewSet):
     """
     ViewSet for handling Webhook operations
     """
     serializer_class = WebhookSerializer
     permission_classes = [IsAuthenticated]
+    expandable = ('logs',)
     
     def get_queryset(self):
         """
         Filter webhooks to show only those from workflows created by the current user
         """
-        return Webhook.objects.filter(workflow__created_by=self.request.user)
+        queryset = Webhook.objects.filter(workflow__created_by=self.request.user)
+        if self.action not in ('list', 'retrieve'):
+            return queryset
+
+        queryset = annotate_webhook_summary(queryset)
+        if 'logs' in self.get_expand():
+            queryset = queryset.prefetch_related(recent_logs_prefetch())
+        return queryset
     
     def perform_create(self, serializer):
         workflow = get_object_or_404(Workflow, id=self.request.data.get('workflow'))
@@ -114,10 +306,26 @@ class WebhookViewSet(viewsets.ModelViewSet):
         log_serializer.is_valid(raise_exception=True)
         log_serializer.save()
 
-        # Here you would typically trigger the workflow execution
-        # We'll implement this later with Celery
-        
-        return Response({"message": "Webhook triggered successfully"})
+        from tasks.workflow_tasks import execute_workflow  # Import here to avoid circular imports
+
+        run_id = str(uuid.uuid4())
+        task_data = {
+            'workflow_id': webhook.workflow_id,
+            'run_id': run_id,
+            'payload': request.data,
+        }
+        transaction.on_commit(lambda: execute_workflow.delay(task_data))
+
+        return Response({"message": "Webhook triggered successfully", "run_id": run_id})
+
+    @action(detail=True, methods=['get'])
+    def logs(self, request, pk=None):
+        """Cursor-paginated logs of a webhook"""
+        webhook = self.get_object()
+        paginator = WebhookLogCursorPagination()
+        page = paginator.paginate_queryset(webhook.logs.all(), request, view=self)
+        serializer = WebhookLogSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
 class WebhookLogViewSet(viewsets.ModelViewSet):
     """
@@ -125,9 +333,60 @@ class WebhookLogViewSet(viewsets.ModelViewSet):
     """
     serializer_class = WebhookLogSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = WebhookLogCursorPagination
     
     def get_queryset(self):
         """
         Filter logs to show only those from webhooks owned by the current user
         """
-        return WebhookLog.objects.filter(webhook__created_by=self.request.user)
\ No newline at end of file
+        return WebhookLog.objects.filter(webhook__created_by=self.request.user)
+
+class WorkflowRunViewSet(ExpandQueryMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    ViewSet for viewing recorded workflow runs (read-only), optionally
+    filtered with ?workflow= and ?status=
+    """
+    serializer_class = WorkflowRunSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = WorkflowRunCursorPagination
+    expandable = ('steps',)
+    default_expand = {'retrieve': ('steps',)}
+    
+    def get_queryset(self):
+        """
+        Filter runs to show only those of workflows owned by the current user
+        """
+        queryset = WorkflowRun.objects.filter(workflow__created_by=self.request.user)
+        workflow_id = self.request.query_params.get('workflow')
+        if workflow_id:
+            queryset = queryset.filter(workflow_id=workflow_id) if workflow_id.isdigit() else queryset.none()
+        run_status = self.request.query_params.get('status')
+        if run_status:
+            queryset = queryset.filter(status=run_status)
+        if 'steps' in self.get_expand():
+            queryset = queryset.prefetch_related('steps')
+        return queryset
+
+class WorkflowScheduleViewSet(viewsets.ModelViewSet):
+    """
+    ViewSet for cron and interval schedules of the current user's workflows
+    """
+    serializer_class = WorkflowScheduleSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        """
+        Filter schedules to show only those of workflows owned by the current user
+        """
+        return WorkflowSchedule.objects.filter(workflow__created_by=self.request.user)
+    
+    def perform_create(self, serializer):
+        if serializer.validated_data['workflow'].created_by != self.request.user:
+            raise PermissionDenied("You don't have permission to schedule this workflow")
+        serializer.save()
+        
+    def perform_update(self, serializer):
+        workflow = serializer.validated_data.get('workflow')
+        if workflow is not None and workflow.created_by != self.request.user:
+            raise PermissionDenied("You don't have permission to schedule this workflow")
+        serializer.save()
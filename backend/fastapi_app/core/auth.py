@@ -1,36 +1,62 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import jwt, JWTError
 from typing import Optional
+from redis import asyncio as redis
+from shared.auth.tokens import TokenVerifier, InvalidTokenError
+from shared.auth.revocation import AsyncTokenDenylist
+from shared.auth.claims import AsyncUserClaimsResolver, USER_CLAIM_FIELDS
+from shared.config.settings import get_settings as get_service_settings
 from .services.config import settings
 
 security = HTTPBearer()
 
+# Shared with Django: same signing key, denylist and published user claims
+token_verifier = TokenVerifier(settings.SECRET_KEY)
+_auth_redis = redis.from_url(
+    get_service_settings().AUTH_REDIS_URL,
+    decode_responses=True,
+    socket_timeout=0.5
+)
+token_denylist = AsyncTokenDenylist(_auth_redis)
+claims_resolver = AsyncUserClaimsResolver(_auth_redis)
+
 async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
     """
     Verify JWT token and return user info
     """
     try:
-        token = credentials.credentials
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
-        return payload
-    except JWTError:
+        payload = token_verifier.verify(credentials.credentials)
+    except InvalidTokenError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
-    
+
+    if await token_denylist.is_revoked(payload):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has been revoked")
+    return payload
+
 # Optional: Get current user dependency
 async def get_current_user(token_data: dict = Depends(verify_token)) -> dict:
     """
-    Get current user from token
+    Get current user from token. Privilege flags come from the claims
+    Django publishes, never from the token itself.
     """
-    return token_data
+    current_user = {
+        key: value for key, value in token_data.items()
+        if key not in USER_CLAIM_FIELDS or key == 'user_id'
+    }
+    claims: Optional[dict] = await claims_resolver.resolve(token_data.get('user_id'))
+    if claims:
+        if not claims.get('is_active', True):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User inactive or deleted")
+        current_user.update(claims)
+    return current_user
 
 async def require_admin(current_user: dict = Depends(get_current_user)) -> dict:
     """
     Verify the user has admin privileges
     """
-    if not current_user.get("is_admin", False):
+    if not (current_user.get("is_staff") or current_user.get("is_superuser")):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin privileges required"
         )
-    return current_user
\ No newline at end of file
+    return current_user
@@ -2,17 +2,42 @@ try:
     import redis.asyncio as redis
 except ImportError:
     from redis import asyncio as redis
-from typing import Optional, Any, Callable
+from typing import Optional, Any, Callable, Dict, Set
 import json
 from datetime import datetime
 import asyncio
+import inspect
+import logging
+import math
+import random
+import time
 import uuid
 
+logger = logging.getLogger(__name__)
+
+# KEYS: lock key. ARGV: token from acquire_lock. Deletes the lock only if
+# it is still held with that token (it may have expired and been re-taken).
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
 class BaseRedis:
     def __init__(self):
         self.redis = redis.from_url("redis://localhost:6379", decode_responses=True)
         self.pubsub = self.redis.pubsub()
         self._subscribers = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Strong references to background refreshes until they finish
+        self._background: Set[asyncio.Task] = set()
+        self._release_lock_script = self.redis.register_script(RELEASE_LOCK_SCRIPT)
+        
+    async def close(self):
+        """Release this client's connections (short-lived clients only)"""
+        await self.pubsub.aclose()
+        await self.redis.aclose()
         
     # Basic Redis Operations
     async def set_data(self, key: str, value: Any, expires: Optional[int] = None):
@@ -29,18 +54,176 @@ class BaseRedis:
         await self.redis.delete(key)
         
     #Caching
-    async def set_cache(self, key: str, value: Any, expires: int = 3600):
-        """Cache data with expiration"""
+    async def set_cache(
+        self,
+        key: str,
+        value: Any,
+        expires: int = 3600,
+        stale_ttl: int = 0,
+        delta: float = 0.0
+    ):
+        """
+        Cache data with expiration. The entry stays readable as stale for
+        ``stale_ttl`` more seconds; ``delta`` is how long the value took to
+        compute and drives early refresh in ``get_or_set_cache``.
+        """
         cache_data = {
             'data': value,
             'cached_at': datetime.utcnow().isoformat(),
+            'expires_at': time.time() + expires,
+            'delta': delta,
         }
-        await self.set_data(f"cache:{key}", cache_data, expires)
+        await self.set_data(f"cache:{key}", cache_data, expires + stale_ttl)
         
-    async def get_cached_data(self, key: str) -> Optional[Any]:
+    async def get_cached_data(self, key: str, allow_stale: bool = False) -> Optional[Any]:
         """GEt Cached Data"""
         data = await self.get_data(f"cache:{key}")
-        return data['data'] if data else None
+        if not data:
+            return None
+        if not allow_stale and self._is_expired(data.get('expires_at')):
+            return None
+        return data['data']
+    
+    async def get_or_set_cache(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        expires: int = 3600,
+        stale_ttl: int = 300,
+        beta: float = 1.0,
+        lock_timeout: int = 10
+    ) -> Any:
+        """
+        Read-through cache with stampede protection:
+
+        - fresh entries are served, but refreshed early in the background
+          with XFetch probability (``beta`` > 1 favours earlier refreshes)
+        - stale entries (within ``stale_ttl``) are served while one
+          background refresh runs
+        - on a miss, one caller per process computes (single-flight) and
+          one process per key holds a short lock; the others wait for it
+        """
+        entry = await self.get_data(f"cache:{key}")
+        if entry:
+            if self._is_expired(entry.get('expires_at')):
+                self._refresh_in_background(key, compute, expires, stale_ttl, lock_timeout)
+            elif self._should_refresh_early(entry.get('expires_at'), entry.get('delta'), beta):
+                self._refresh_in_background(key, compute, expires, stale_ttl, lock_timeout)
+            return entry['data']
+            
+        async def recompute():
+            await self._compute_once(
+                f"cache:{key}",
+                lambda: self._recompute_cache(key, compute, expires, stale_ttl),
+                lambda: self.get_cached_data(key),
+                lock_timeout
+            )
+            return await self.get_cached_data(key, allow_stale=True)
+            
+        return await self.single_flight(f"cache:{key}", recompute)
+    
+    async def _recompute_cache(self, key: str, compute: Callable[[], Any], expires: int, stale_ttl: int):
+        started = time.monotonic()
+        value = await self._call(compute)
+        await self.set_cache(key, value, expires, stale_ttl, delta=time.monotonic() - started)
+        
+    def _refresh_in_background(self, key, compute, expires, stale_ttl, lock_timeout):
+        async def refresh():
+            await self._compute_once(
+                f"cache:{key}",
+                lambda: self._recompute_cache(key, compute, expires, stale_ttl),
+                None,
+                lock_timeout
+            )
+        self.refresh_in_background(f"cache:{key}", refresh)
+        
+    # Stampede protection
+    @staticmethod
+    def _is_expired(expires_at: Optional[float]) -> bool:
+        # Entries written without an expiry time are fresh until Redis drops them
+        return expires_at is not None and time.time() >= expires_at
+    
+    @staticmethod
+    def _should_refresh_early(expires_at: Optional[float], delta: Optional[float], beta: float = 1.0) -> bool:
+        """
+        XFetch: refresh with a probability that rises as expiry approaches,
+        scaled by how long the value takes to compute
+        """
+        if expires_at is None or not delta or beta <= 0:
+            return False
+        return time.time() - delta * beta * math.log(1.0 - random.random()) >= expires_at
+    
+    @staticmethod
+    async def _call(compute: Callable[[], Any]) -> Any:
+        value = compute()
+        if inspect.isawaitable(value):
+            value = await value
+        return value
+    
+    async def single_flight(self, key: str, factory: Callable[[], Any]) -> Any:
+        """Run ``factory`` once per key at a time; concurrent callers share its result"""
+        future = self._inflight.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await factory()
+        except BaseException as e:
+            future.set_exception(e)
+            # Retrieved here so an error nobody else awaited is not logged
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+            
+    def refresh_in_background(self, key: str, factory: Callable[[], Any]):
+        """Start ``factory`` unless a computation for ``key`` is already running"""
+        if key in self._inflight:
+            return
+        
+        async def run():
+            try:
+                await self.single_flight(key, factory)
+            except Exception as e:
+                logger.warning(f"Background refresh of {key} failed: {str(e)}")
+        task = asyncio.create_task(run())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        
+    async def _compute_once(
+        self,
+        key: str,
+        recompute: Callable[[], Any],
+        read: Optional[Callable[[], Any]],
+        lock_timeout: int
+    ):
+        """
+        Recompute under a short cross-process lock. Without the lock, a
+        foreground caller (``read`` given) polls until the holder has
+        written or the lock times out, then computes anyway; a background
+        refresh just leaves the work to the holder.
+        """
+        token = await self.acquire_lock(key, timeout=lock_timeout)
+        if token:
+            try:
+                await recompute()
+            finally:
+                await self.release_lock(key, token)
+            return
+        if read is None:
+            return
+        
+        deadline = time.monotonic() + lock_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            if await read() is not None:
+                return
+        await recompute()
     
     #Rate Limiting
     async def check_rate_limit(self, key: str, limit: int, window: int = 60) -> bool:
@@ -97,8 +280,11 @@ class BaseRedis:
             })
         
     # Distributed Locking
-    async def acquire_lock(self, lock_name: str, timeout: int = 10) -> bool:
-        """Acquire distributed lock"""
+    async def acquire_lock(self, lock_name: str, timeout: int = 10) -> Optional[str]:
+        """
+        Acquire distributed lock; returns the token to release it with, or
+        None when another holder has it
+        """
         lock_id = str(uuid.uuid4())
         acquired = await self.redis.set(
             f"lock:{lock_name}",
@@ -106,8 +292,11 @@ class BaseRedis:
             ex=timeout,
             nx=True
         )
-        return bool(acquired)
+        return lock_id if acquired else None
 
-    async def release_lock(self, lock_name: str):
-        """Release distributed lock"""
-        await self.redis.delete(f"lock:{lock_name}")
\ No newline at end of file
+    async def release_lock(self, lock_name: str, token: str) -> bool:
+        """
+        Release distributed lock if still held with ``token``; a lock that
+        expired and was taken by someone else is left alone
+        """
+        return bool(await self._release_lock_script(keys=[f"lock:{lock_name}"], args=[token]))
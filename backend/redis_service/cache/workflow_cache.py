@@ -1,93 +1,474 @@
-
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable, Tuple
 from datetime import datetime
+import asyncio
+import json
+import logging
+import threading
+import time
+from cachetools import TTLCache
 from ..base import BaseRedis
 from ..exceptions import CacheError
 
+logger = logging.getLogger(__name__)
+
+# KEYS: cache key, version key. ARGV: check version ('1'/'0').
+# The cached blob is returned only if it is as new as the current version.
+READ_RESULT_SCRIPT = """
+if redis.call('TYPE', KEYS[1]).ok ~= 'hash' then
+    return nil
+end
+local entry = redis.call('HMGET', KEYS[1], 'version', 'data', 'expires_at', 'delta')
+if not entry[2] then
+    return nil
+end
+if ARGV[1] == '1' then
+    local current = tonumber(redis.call('GET', KEYS[2]) or '0')
+    if current > tonumber(entry[1]) then
+        return nil
+    end
+end
+return {entry[1], entry[2], entry[3] or '', entry[4] or ''}
+"""
+
+# KEYS: cache key, version key. ARGV: result JSON, key TTL, cached_at,
+# channel, workflow id, expires_at, compute time. Bumps the version, stores
+# and announces the result.
+WRITE_RESULT_SCRIPT = """
+local version = redis.call('INCR', KEYS[2])
+redis.call('DEL', KEYS[1])
+redis.call('HSET', KEYS[1], 'version', version, 'data', ARGV[1], 'cached_at', ARGV[3],
+    'expires_at', ARGV[6], 'delta', ARGV[7])
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+redis.call('PUBLISH', ARGV[4], cjson.encode({type = 'workflow_cached', workflow_id = ARGV[5], version = version}))
+return version
+"""
+
+# KEYS: cache key, version key. ARGV: channel, workflow id.
+INVALIDATE_RESULT_SCRIPT = """
+redis.call('DEL', KEYS[1])
+local version = redis.call('INCR', KEYS[2])
+redis.call('PUBLISH', ARGV[1], cjson.encode({type = 'cache_invalidated', workflow_id = ARGV[2], version = version}))
+return version
+"""
+
 class WorkflowCache(BaseRedis):
     """
-    Manages workflow result caching with versioning
+    Manages workflow result caching with versioning.
+
+    Reads and writes are single Lua script calls (one round trip, atomic).
+    Results are also kept in an in-process near-cache, which is only
+    trusted while this instance is subscribed to ``cache_events``: any
+    write or invalidation elsewhere evicts the local copy.
+    ``get_or_compute_result`` adds stampede protection on top.
     """
     
-    def __init__(self):
+    def __init__(self, near_cache_size: int = 1000, near_cache_ttl: int = 300):
         super().__init__()
         self.cache_prefix = "workflow:cache:"
         self.version_prefix = "workflow:version:"
+        self.plan_prefix = "workflow:plan:"
+        self.plan_version_prefix = "workflow:plan-version:"
+        self.memo_prefix = "workflow:memo:"
+        self.memo_stats_key = "workflow:memo-stats"
+        self.payload_prefix = "workflow:payload:"
+        self.events_channel = 'cache_events'
+        self._read_script = self.redis.register_script(READ_RESULT_SCRIPT)
+        self._write_script = self.redis.register_script(WRITE_RESULT_SCRIPT)
+        self._invalidate_script = self.redis.register_script(INVALIDATE_RESULT_SCRIPT)
+        self._near_lock = threading.Lock()
+        self._near_cache = TTLCache(maxsize=near_cache_size, ttl=near_cache_ttl)
+        # Evictions seen per workflow while a Redis read of it is in flight
+        # (and a counter of full clears), so a read that raced an eviction
+        # does not repopulate the near-cache with what it got
+        self._near_reads: Dict[str, int] = {}
+        self._near_generations: Dict[str, int] = {}
+        self._near_epoch = 0
+        self._listener: Optional[asyncio.Task] = None
         
-    async def cache_result(
+    # Near-cache
+    @property
+    def near_cache_active(self) -> bool:
+        return self._listener is not None and not self._listener.done()
+        
+    def _near_get(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        if not self.near_cache_active:
+            return None
+        with self._near_lock:
+            return self._near_cache.get(workflow_id)
+            
+    def _near_begin(self, workflow_id: str) -> Tuple[int, int]:
+        """
+        Start a Redis read of ``workflow_id``; returns the eviction
+        generation to pass to ``_near_set``. Pair with ``_near_end``.
+        """
+        with self._near_lock:
+            self._near_reads[workflow_id] = self._near_reads.get(workflow_id, 0) + 1
+            return self._near_epoch, self._near_generations.get(workflow_id, 0)
+            
+    def _near_end(self, workflow_id: str):
+        with self._near_lock:
+            remaining = self._near_reads.get(workflow_id, 0) - 1
+            if remaining > 0:
+                self._near_reads[workflow_id] = remaining
+            else:
+                self._near_reads.pop(workflow_id, None)
+                self._near_generations.pop(workflow_id, None)
+                
+    def _near_set(
         self,
         workflow_id: str,
+        generation: Tuple[int, int],
+        version: int,
         result: Dict[str, Any],
-        expires: int = 3600
+        expires_at: Optional[float] = None,
+        delta: float = 0.0
     ):
         """
-        Cache workflow execution result with version tracking
+        Keep a copy of what Redis returned, unless an eviction for the
+        workflow arrived since ``generation`` was taken: the event may be
+        for a newer version than the one read
         """
-        try:
-            # Increment version
-            version = await self.redis.incr(f"{self.version_prefix}{workflow_id}")
-            
-            cache_data = {
-                'result': result,
+        with self._near_lock:
+            if generation != (self._near_epoch, self._near_generations.get(workflow_id, 0)):
+                return
+            self._near_cache[workflow_id] = {
                 'version': version,
-                'cached_at': datetime.utcnow().isoformat()
+                'result': result,
+                'expires_at': expires_at,
+                'delta': delta,
             }
             
-            # Cache the result
-            await self.set_data(
-                f"{self.cache_prefix}{workflow_id}",
-                cache_data,
-                expires=expires
-            )
+    def _near_evict(self, workflow_id: str, version: Optional[int] = None):
+        """Drop the local copy unless it is already at ``version``"""
+        with self._near_lock:
+            if workflow_id in self._near_reads:
+                self._near_generations[workflow_id] = self._near_generations.get(workflow_id, 0) + 1
+            entry = self._near_cache.get(workflow_id)
+            if entry is not None and (version is None or entry['version'] != version):
+                self._near_cache.pop(workflow_id, None)
+                
+    def _near_clear(self):
+        with self._near_lock:
+            self._near_epoch += 1
+            self._near_cache.clear()
             
-            # Publish cache update event
-            await self.publish('cache_events', {
-                'type': 'workflow_cached',
-                'workflow_id': workflow_id,
-                'version': version
-            })
+    def handle_cache_event(self, event: Dict[str, Any]):
+        if event.get('type') in ('workflow_cached', 'cache_invalidated') and event.get('workflow_id'):
+            self._near_evict(str(event['workflow_id']), event.get('version'))
+            
+    async def start_near_cache(self):
+        """
+        Subscribe to ``cache_events`` so local copies can be evicted; until
+        this succeeds every read goes to Redis
+        """
+        if self.near_cache_active:
+            return
+        pubsub = self.redis.pubsub()
+        await pubsub.subscribe(self.events_channel)
+        self._listener = asyncio.create_task(self._listen(pubsub))
+        
+    async def _listen(self, pubsub):
+        try:
+            async for message in pubsub.listen():
+                if message['type'] == 'message':
+                    self.handle_cache_event(json.loads(message['data']))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Workflow cache events lost, near-cache disabled: {str(e)}")
+        finally:
+            self._near_clear()
+                
+    async def stop_near_cache(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+        self._near_clear()
+        
+    async def cache_result(
+        self,
+        workflow_id: str,
+        result: Dict[str, Any],
+        expires: int = 3600,
+        stale_ttl: int = 0,
+        delta: float = 0.0
+    ) -> int:
+        """
+        Cache workflow execution result with version tracking. Increment,
+        store and publish happen atomically in one script call. The entry
+        remains readable as stale for ``stale_ttl`` seconds after expiry.
+        """
+        workflow_id = str(workflow_id)
+        generation = self._near_begin(workflow_id)
+        try:
+            expires_at = time.time() + expires
+            version = await self._write_script(
+                keys=[f"{self.cache_prefix}{workflow_id}", f"{self.version_prefix}{workflow_id}"],
+                args=[
+                    json.dumps(result),
+                    expires + stale_ttl,
+                    datetime.utcnow().isoformat(),
+                    self.events_channel,
+                    workflow_id,
+                    expires_at,
+                    delta
+                ]
+            )
+            self._near_set(workflow_id, generation, int(version), result, expires_at, delta)
+            return int(version)
             
         except Exception as e:
             raise CacheError(f"Failed to cache workflow result: {str(e)}")
+        finally:
+            self._near_end(workflow_id)
             
     async def get_cached_result(
         self,
         workflow_id: str,
-        check_version: bool = True
+        check_version: bool = True,
+        allow_stale: bool = False
     ) -> Optional[Dict]:
         """
-        Get cached workflow result with optional version checking
+        Get cached workflow result with optional version checking: from the
+        near-cache when it is live, otherwise in one script call
         """
+        entry = await self._read_entry(str(workflow_id), check_version)
+        if entry is None:
+            return None
+        if not allow_stale and self._is_expired(entry['expires_at']):
+            return None
+        return entry['result']
+        
+    async def _read_entry(self, workflow_id: str, check_version: bool = True) -> Optional[Dict[str, Any]]:
+        """The cached result with its version and expiry metadata"""
+        if entry := self._near_get(workflow_id):
+            return entry
+        
+        if not self.near_cache_active:
+            try:
+                await self.start_near_cache()
+            except Exception as e:
+                logger.debug(f"Workflow cache near-cache unavailable: {str(e)}")
+                
+        # Taken before the read so an eviction that lands between the
+        # script's reply and _near_set is not lost
+        generation = self._near_begin(workflow_id)
         try:
-            cached = await self.get_data(f"{self.cache_prefix}{workflow_id}")
+            cached = await self._read_script(
+                keys=[f"{self.cache_prefix}{workflow_id}", f"{self.version_prefix}{workflow_id}"],
+                args=['1' if check_version else '0']
+            )
             if not cached:
                 return None
                 
-            if check_version:
-                current_version = await self.redis.get(
-                    f"{self.version_prefix}{workflow_id}"
-                )
-                if int(current_version) > cached['version']:
-                    return None
-                    
-            return cached['result']
+            entry = {
+                'version': int(cached[0]),
+                'result': json.loads(cached[1]),
+                'expires_at': float(cached[2]) if cached[2] else None,
+                'delta': float(cached[3]) if cached[3] else 0.0,
+            }
+            if self.near_cache_active and check_version:
+                self._near_set(workflow_id, generation, **entry)
+            return entry
             
         except Exception as e:
             raise CacheError(f"Failed to get cached result: {str(e)}")
+        finally:
+            self._near_end(workflow_id)
+            
+    async def get_or_compute_result(
+        self,
+        workflow_id: str,
+        compute: Callable[[], Any],
+        expires: int = 3600,
+        stale_ttl: int = 300,
+        beta: float = 1.0,
+        lock_timeout: int = 10
+    ) -> Dict[str, Any]:
+        """
+        Cached result, computing it at most once across callers: XFetch
+        early refresh and stale-while-revalidate in the background, and
+        single-flight plus a short Redis lock on a miss. An invalidated
+        (older version) result is never served stale.
+        """
+        workflow_id = str(workflow_id)
+        flight_key = f"{self.cache_prefix}{workflow_id}"
+        
+        async def recompute():
+            started = time.monotonic()
+            result = await self._call(compute)
+            await self.cache_result(
+                workflow_id, result, expires, stale_ttl, delta=time.monotonic() - started
+            )
+            
+        entry = await self._read_entry(workflow_id)
+        if entry is not None:
+            if (self._is_expired(entry['expires_at'])
+                    or self._should_refresh_early(entry['expires_at'], entry['delta'], beta)):
+                async def refresh():
+                    await self._compute_once(flight_key, recompute, None, lock_timeout)
+                self.refresh_in_background(flight_key, refresh)
+            return entry['result']
+            
+        async def fill():
+            await self._compute_once(
+                flight_key, recompute, lambda: self.get_cached_result(workflow_id), lock_timeout
+            )
+            return await self.get_cached_result(workflow_id, allow_stale=True)
+            
+        return await self.single_flight(flight_key, fill)
             
     async def invalidate_cache(self, workflow_id: str):
         """
         Invalidate cached workflow result
         """
         try:
-            await self.delete_data(f"{self.cache_prefix}{workflow_id}")
-            await self.redis.incr(f"{self.version_prefix}{workflow_id}")
+            self._near_evict(str(workflow_id))
+            await self._invalidate_script(
+                keys=[f"{self.cache_prefix}{workflow_id}", f"{self.version_prefix}{workflow_id}"],
+                args=[self.events_channel, workflow_id]
+            )
+            
+        except Exception as e:
+            raise CacheError(f"Failed to invalidate cache: {str(e)}")
+            
+    async def get_plan_version(self, workflow_id: str) -> Optional[str]:
+        """
+        Current compiled-plan version of a workflow (its ``updated_at``)
+        """
+        try:
+            return await self.redis.get(f"{self.plan_version_prefix}{workflow_id}")
+        except Exception as e:
+            raise CacheError(f"Failed to get plan version: {str(e)}")
+            
+    async def cache_plan(
+        self,
+        workflow_id: str,
+        plan: Dict[str, Any],
+        version: str,
+        expires: int = 86400
+    ) -> bool:
+        """
+        Cache a serialized execution plan, unless the workflow has moved
+        on to another version. The version key is only set if missing, so
+        a plan compiled from a stale read never replaces a newer version.
+        """
+        try:
+            version_key = f"{self.plan_version_prefix}{workflow_id}"
+            await self.redis.set(version_key, version, ex=expires, nx=True)
+            if await self.redis.get(version_key) != version:
+                return False
+            
+            await self.set_data(
+                f"{self.plan_prefix}{workflow_id}",
+                {'plan': plan, 'version': version},
+                expires=expires
+            )
+            return True
+            
+        except Exception as e:
+            raise CacheError(f"Failed to cache workflow plan: {str(e)}")
+            
+    async def get_cached_plan(self, workflow_id: str, version: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a serialized execution plan if it was compiled for ``version``
+        """
+        try:
+            cached = await self.get_data(f"{self.plan_prefix}{workflow_id}")
+            if not cached or cached['version'] != version:
+                return None
+            return cached['plan']
+            
+        except Exception as e:
+            raise CacheError(f"Failed to get cached plan: {str(e)}")
+            
+    async def invalidate_plan(self, workflow_id: str, version: Optional[str] = None, expires: int = 86400):
+        """
+        Drop a workflow's cached plan and publish its new version
+        """
+        try:
+            await self.delete_data(f"{self.plan_prefix}{workflow_id}")
+            version_key = f"{self.plan_version_prefix}{workflow_id}"
+            if version:
+                await self.redis.set(version_key, version, ex=expires)
+            else:
+                await self.redis.delete(version_key)
             
-            # Publish cache invalidation event
             await self.publish('cache_events', {
-                'type': 'cache_invalidated',
-                'workflow_id': workflow_id
+                'type': 'plan_invalidated',
+                'workflow_id': workflow_id,
+                'version': version
             })
             
         except Exception as e:
-            raise CacheError(f"Failed to invalidate cache: {str(e)}")
\ No newline at end of file
+            raise CacheError(f"Failed to invalidate plan: {str(e)}")
+            
+    async def get_step_result(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a memoized step result, wrapped as ``{'result': ...}`` so that
+        a memoized None is distinguishable from a miss
+        """
+        try:
+            return await self.get_data(f"{self.memo_prefix}{key}")
+        except Exception as e:
+            raise CacheError(f"Failed to get memoized step result: {str(e)}")
+            
+    async def cache_step_result(self, key: str, result: Any, expires: int):
+        """
+        Memoize a step result for ``expires`` seconds
+        """
+        try:
+            await self.set_data(
+                f"{self.memo_prefix}{key}",
+                {'result': result, 'cached_at': datetime.utcnow().isoformat()},
+                expires=expires
+            )
+        except Exception as e:
+            raise CacheError(f"Failed to memoize step result: {str(e)}")
+            
+    async def record_memo_lookup(self, step_type: str, hit: bool):
+        """
+        Count a memo hit or miss per step type
+        """
+        try:
+            await self.redis.hincrby(self.memo_stats_key, f"{step_type}:{'hits' if hit else 'misses'}", 1)
+        except Exception as e:
+            raise CacheError(f"Failed to record memo lookup: {str(e)}")
+            
+    async def get_memo_stats(self) -> Dict[str, int]:
+        """
+        Memo hit/miss counters, ``{'<step type>:hits': n, ...}``
+        """
+        try:
+            stats = await self.redis.hgetall(self.memo_stats_key)
+            return {field: int(count) for field, count in stats.items()}
+        except Exception as e:
+            raise CacheError(f"Failed to get memo stats: {str(e)}")
+            
+    async def store_payloads(self, payloads: Dict[str, Any], expires: int) -> Dict[str, str]:
+        """
+        Store run payloads out of line in one round trip. Returns a
+        reference per name (``redis:<key>``) to keep in place of the data.
+        """
+        refs = {}
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for name, payload in payloads.items():
+                    key = f"{self.payload_prefix}{name}"
+                    pipe.set(key, json.dumps(payload, default=str), ex=expires)
+                    refs[name] = f"redis:{key}"
+                await pipe.execute()
+            return refs
+        except Exception as e:
+            raise CacheError(f"Failed to store run payloads: {str(e)}")
+            
+    async def get_payload(self, ref: str) -> Optional[Any]:
+        """
+        Payload behind a ``store_payloads`` reference, or None once expired
+        """
+        if not ref.startswith(f"redis:{self.payload_prefix}"):
+            raise CacheError(f"Unsupported payload reference: {ref}")
+        try:
+            return await self.get_data(ref[len('redis:'):])
+        except Exception as e:
+            raise CacheError(f"Failed to get run payload: {str(e)}")
@@ -0,0 +1,119 @@
+from typing import Dict, List, Optional, Tuple
+from ..base import BaseRedis
+from ..exceptions import TaskQueueError
+
+# KEYS: due set. ARGV: now (epoch seconds), batch size.
+# Pops the due members so that each is claimed by exactly one caller.
+CLAIM_DUE_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'WITHSCORES', 'LIMIT', 0, ARGV[2])
+for i = 1, #due, 2 do
+    redis.call('ZREM', KEYS[1], due[i])
+end
+return due
+"""
+
+# KEYS: lease key. ARGV: owner token. Deletes the lease only if still held.
+RELEASE_LEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+class ScheduleStore(BaseRedis):
+    """
+    Due times of workflow schedules in one sorted set (member: schedule id,
+    score: next fire time in epoch seconds), so finding due schedules is
+    O(log n) however many schedules exist
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self.due_key = "schedule:due"
+        self.fired_prefix = "schedule:fired:"
+        self.lease_prefix = "schedule:lease:"
+        self._claim_script = self.redis.register_script(CLAIM_DUE_SCRIPT)
+        self._release_script = self.redis.register_script(RELEASE_LEASE_SCRIPT)
+        
+    async def schedule_many(self, due: Dict[str, float]):
+        """
+        Set the next due time of schedules (``{schedule_id: epoch seconds}``)
+        """
+        if not due:
+            return
+        try:
+            await self.redis.zadd(self.due_key, due)
+        except Exception as e:
+            raise TaskQueueError(f"Failed to schedule workflows: {str(e)}")
+            
+    async def unschedule(self, *schedule_ids: str):
+        """
+        Remove schedules from the due set
+        """
+        if not schedule_ids:
+            return
+        try:
+            await self.redis.zrem(self.due_key, *schedule_ids)
+        except Exception as e:
+            raise TaskQueueError(f"Failed to unschedule workflows: {str(e)}")
+            
+    async def claim_due(self, now: float, limit: int) -> List[Tuple[str, float]]:
+        """
+        Atomically take up to ``limit`` schedules due at ``now``; each is
+        returned to exactly one caller and must be rescheduled by it
+        """
+        try:
+            due = await self._claim_script(keys=[self.due_key], args=[now, limit])
+            return [(due[i], float(due[i + 1])) for i in range(0, len(due), 2)]
+        except Exception as e:
+            raise TaskQueueError(f"Failed to claim due schedules: {str(e)}")
+            
+    async def mark_fired(self, schedule_id: str, fire_time: float, expires: int) -> bool:
+        """
+        Record that a schedule fired for ``fire_time``; False if it
+        already had, so the same occurrence is never enqueued twice
+        """
+        try:
+            return bool(await self.redis.set(
+                f"{self.fired_prefix}{schedule_id}:{int(fire_time)}", 1, ex=expires, nx=True
+            ))
+        except Exception as e:
+            raise TaskQueueError(f"Failed to record schedule fire: {str(e)}")
+            
+    async def clear_fired(self, schedule_id: str, fire_time: float):
+        """
+        Forget a ``mark_fired`` whose enqueue failed, so the occurrence
+        can fire again
+        """
+        try:
+            await self.redis.delete(f"{self.fired_prefix}{schedule_id}:{int(fire_time)}")
+        except Exception as e:
+            raise TaskQueueError(f"Failed to clear schedule fire: {str(e)}")
+            
+    async def acquire_lease(self, name: str, owner: str, timeout: int) -> bool:
+        """
+        Become the only holder of ``name`` for up to ``timeout`` seconds
+        """
+        try:
+            return bool(await self.redis.set(f"{self.lease_prefix}{name}", owner, ex=timeout, nx=True))
+        except Exception as e:
+            raise TaskQueueError(f"Failed to acquire scheduler lease: {str(e)}")
+            
+    async def release_lease(self, name: str, owner: str):
+        """
+        Release ``name`` if ``owner`` still holds it (it may have expired
+        and been taken over)
+        """
+        try:
+            await self._release_script(keys=[f"{self.lease_prefix}{name}"], args=[owner])
+        except Exception as e:
+            raise TaskQueueError(f"Failed to release scheduler lease: {str(e)}")
+            
+    async def due_time(self, schedule_id: str) -> Optional[float]:
+        """
+        Current due time of a schedule, or None when not scheduled
+        """
+        try:
+            return await self.redis.zscore(self.due_key, schedule_id)
+        except Exception as e:
+            raise TaskQueueError(f"Failed to read schedule: {str(e)}")
@@ -0,0 +1,45 @@
+# backend/redis_service/state/json_patch.py
+
+from typing import Dict, Any, List
+import copy
+
+def _escape(key: str) -> str:
+    return str(key).replace('~', '~0').replace('/', '~1')
+
+def _unescape(token: str) -> str:
+    return token.replace('~1', '/').replace('~0', '~')
+
+def make_patch(source: Dict[str, Any], target: Dict[str, Any], path: str = '') -> List[Dict[str, Any]]:
+    """
+    JSON Patch (RFC 6902) operations turning ``source`` into ``target``.
+    Objects are diffed key by key; lists and scalars are replaced whole.
+    """
+    operations = []
+    for key in source:
+        if key not in target:
+            operations.append({'op': 'remove', 'path': f"{path}/{_escape(key)}"})
+    for key, value in target.items():
+        pointer = f"{path}/{_escape(key)}"
+        if key not in source:
+            operations.append({'op': 'add', 'path': pointer, 'value': value})
+        elif isinstance(value, dict) and isinstance(source[key], dict):
+            operations.extend(make_patch(source[key], value, pointer))
+        elif source[key] != value or type(source[key]) is not type(value):
+            operations.append({'op': 'replace', 'path': pointer, 'value': value})
+    return operations
+
+def apply_patch(document: Dict[str, Any], operations: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Apply ``make_patch`` output to a copy of ``document``"""
+    document = copy.deepcopy(document)
+    for operation in operations:
+        tokens = [_unescape(token) for token in operation['path'].split('/')[1:]]
+        parent = document
+        for token in tokens[:-1]:
+            parent = parent[token]
+        if operation['op'] == 'remove':
+            del parent[tokens[-1]]
+        elif operation['op'] in ('add', 'replace'):
+            parent[tokens[-1]] = copy.deepcopy(operation['value'])
+        else:
+            raise ValueError(f"Unsupported patch operation: {operation['op']}")
+    return document
@@ -1,23 +1,39 @@
 from typing import Dict, Any, List, Optional
 from datetime import datetime
+import json
+from redis.exceptions import WatchError
 from ..base import BaseRedis
 from ..exceptions import StateError
+from .json_patch import make_patch, apply_patch
 
 class WorkflowStateManager(BaseRedis):
     """
-    Manages workflow execution state with history tracking
+    Manages workflow execution state with history tracking. States that
+    carry a ``user_id`` are indexed by (user, status) so a user's
+    workflows in one status can be read in a single call.
     """
-    def __init__(self):
+    def __init__(self, history_limit: int = 100, snapshot_interval: int = 10):
         super().__init__()
         self.state_prefix = "workflow_state:"
         self.history_prefix = "workflow_history:"
+        self.version_prefix = "workflow_state_version:"
+        self.status_prefix = "workflow_status:"
+        # Newest entries kept per workflow, and how often a full snapshot
+        # is stored instead of a patch against the previous version
+        self.history_limit = history_limit
+        self.snapshot_interval = max(1, snapshot_interval)
         
     async def save_workflow_state(self, workflow_id: str, state: Dict[str, Any], expires: Optional[int] = None):
         """
-        Save workflow state with versioning and history
+        Save workflow state with versioning and history. History entries
+        (newest first, capped at ``history_limit``) hold a JSON patch
+        against the previous version, or a full snapshot every
+        ``snapshot_interval`` versions and whenever the previous version
+        is not available. Subscribers to ``workflow_events`` receive the
+        workflow id and version; the state itself is read from Redis.
         """
         try:
-            key = f"{self.state_prefix}{workflow_id}"
+            previous = await self.get_data(f"{self.state_prefix}{workflow_id}")
             
             # Add metadata
             state.update({
@@ -25,22 +41,195 @@ class WorkflowStateManager(BaseRedis):
                 'version': await self._get_next_version(workflow_id)
             })
             
-            # Save current state
-            await self.set_data(key, state, expires=expires)
+            async with self.redis.pipeline(transaction=True) as pipe:
+                self._queue_state_writes(pipe, workflow_id, previous, state, expires)
+                await pipe.execute()
+                
+        except Exception as e:
+            raise StateError(f"Failed to save workflow state: {str(e)}")
+            
+    async def compare_and_set_state(
+        self,
+        workflow_id: str,
+        state: Dict[str, Any],
+        expected_version: int,
+        expires: Optional[int] = None
+    ) -> bool:
+        """
+        Save ``state`` only if the current version is ``expected_version``
+        (0 when there is no state yet). Returns False, writing nothing, if
+        another writer got there first.
+        """
+        key = f"{self.state_prefix}{workflow_id}"
+        version_key = f"{self.version_prefix}{workflow_id}"
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                await pipe.watch(key, version_key)
+                current = await pipe.get(key)
+                counter = await pipe.get(version_key)
+                previous = json.loads(current) if current else None
+                current_version = previous.get('version', 0) if previous else 0
+                
+                # A counter ahead of the state means a save is in flight
+                if current_version != expected_version or int(counter or 0) != current_version:
+                    await pipe.unwatch()
+                    return False
+                    
+                state.update({
+                    'updated_at': datetime.utcnow().isoformat(),
+                    'version': expected_version + 1
+                })
+                pipe.multi()
+                pipe.set(version_key, state['version'])
+                self._queue_state_writes(pipe, workflow_id, previous, state, expires)
+                await pipe.execute()
+                return True
+                
+        except WatchError:
+            return False
+        except Exception as e:
+            raise StateError(f"Failed to save workflow state: {str(e)}")
             
-            #Add to History
-            await self.push_to_queue(
-                f"{self.history_prefix}{workflow_id}",
-                {**state, 'timestamp': datetime.utcnow().isoformat()}
-            )
+    def _queue_state_writes(
+        self,
+        pipe,
+        workflow_id: str,
+        previous: Optional[Dict[str, Any]],
+        state: Dict[str, Any],
+        expires: Optional[int]
+    ):
+        """Queue the state, history, status index and event writes for ``state``"""
+        version = state['version']
+        entry = {'version': version, 'timestamp': datetime.utcnow().isoformat()}
+        if (
+            previous is None
+            or previous.get('version') != version - 1
+            or (version - 1) % self.snapshot_interval == 0
+        ):
+            entry['snapshot'] = state
+        else:
+            entry['base'] = version - 1
+            entry['patch'] = make_patch(previous, state)
             
-            # Publish update event
-            await self.publish('workflow_events', {
-                'type': 'state_updated',
-                'workflow_id': workflow_id,
-                'state': state
-            })
+        # Save current state; the version counter lives exactly as long
+        pipe.set(f"{self.state_prefix}{workflow_id}", json.dumps(state), ex=expires)
+        if expires:
+            pipe.expire(f"{self.version_prefix}{workflow_id}", expires)
+        
+        # Add to bounded history
+        history_key = f"{self.history_prefix}{workflow_id}"
+        pipe.lpush(history_key, json.dumps(entry))
+        pipe.ltrim(history_key, 0, self.history_limit - 1)
+        if expires:
+            pipe.expire(history_key, expires)
             
+        # Keep the status index current; states saved without an owner
+        # (e.g. by the error handler) stay under the previous one
+        owner = state.get('user_id') or (previous or {}).get('user_id')
+        old_owner = (previous or {}).get('user_id')
+        if previous and old_owner and (old_owner, previous.get('status')) != (owner, state.get('status')):
+            pipe.srem(self._status_key(old_owner, previous.get('status')), workflow_id)
+        if owner and state.get('status'):
+            status_key = self._status_key(owner, state['status'])
+            pipe.sadd(status_key, workflow_id)
+            if expires:
+                pipe.expire(status_key, expires)
+                
+        # Publish update event by reference
+        pipe.publish('workflow_events', json.dumps({
+            'type': 'state_updated',
+            'workflow_id': workflow_id,
+            'version': version,
+            'status': state.get('status'),
+        }))
+        
+    def _status_key(self, user_id, status: Optional[str]) -> str:
+        return f"{self.status_prefix}{user_id}:{status}"
+        
+    async def get_workflow_state(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Current state of a workflow, or None
+        """
+        try:
+            return await self.get_data(f"{self.state_prefix}{workflow_id}")
         except Exception as e:
-            raise StateError(f"Failed to save workflow state: {str(e)}")
+            raise StateError(f"Failed to get workflow state: {str(e)}")
+            
+    async def get_workflow_states(self, workflow_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Current states of many workflows in one round trip (None for
+        workflows without state)
+        """
+        if not workflow_ids:
+            return {}
+        try:
+            values = await self.redis.mget([f"{self.state_prefix}{workflow_id}" for workflow_id in workflow_ids])
+            return {
+                workflow_id: json.loads(value) if value else None
+                for workflow_id, value in zip(workflow_ids, values)
+            }
+        except Exception as e:
+            raise StateError(f"Failed to get workflow states: {str(e)}")
+            
+    async def get_workflows_by_status(self, user_id, status: str) -> Dict[str, Dict[str, Any]]:
+        """
+        States of a user's workflows currently in ``status``. Index entries
+        whose state expired or moved on are pruned as they are found.
+        """
+        try:
+            status_key = self._status_key(user_id, status)
+            workflow_ids = sorted(await self.redis.smembers(status_key))
+            states = await self.get_workflow_states(workflow_ids)
+            
+            matching, stale = {}, []
+            for workflow_id, state in states.items():
+                if state and state.get('status') == status and str(state.get('user_id', user_id)) == str(user_id):
+                    matching[workflow_id] = state
+                else:
+                    stale.append(workflow_id)
+            if stale:
+                await self.redis.srem(status_key, *stale)
+            return matching
+            
+        except StateError:
+            raise
+        except Exception as e:
+            raise StateError(f"Failed to query workflow states: {str(e)}")
+            
+    async def get_state_history(self, workflow_id: str, start: int = 0, end: int = -1) -> List[Dict[str, Any]]:
+        """
+        Past states, newest first, for history positions ``start``..``end``
+        (inclusive, as in LRANGE). Patches are replayed from the nearest
+        older snapshot; trimmed-away entries that a patch would need are
+        left out.
+        """
+        try:
+            history_key = f"{self.history_prefix}{workflow_id}"
+            # A snapshot is at most snapshot_interval entries older
+            stop = -1 if end < 0 else end + self.snapshot_interval
+            entries = [json.loads(entry) for entry in await self.redis.lrange(history_key, start, stop)]
+            
+            states, state = [], None
+            for entry in reversed(entries):
+                if 'snapshot' in entry:
+                    state = entry['snapshot']
+                elif state is not None and state.get('version') == entry.get('base'):
+                    state = apply_patch(state, entry['patch'])
+                else:
+                    state = None
+                states.append(state)
+            states.reverse()
+            
+            if end >= 0:
+                states = states[:end - start + 1]
+            return [state for state in states if state is not None]
+            
+        except Exception as e:
+            raise StateError(f"Failed to get workflow history: {str(e)}")
+            
+    async def _get_next_version(self, workflow_id: str) -> int:
+        """
+        Monotonic state version, allocated atomically in Redis
+        """
+        return await self.redis.incr(f"{self.version_prefix}{workflow_id}")
         
\ No newline at end of file
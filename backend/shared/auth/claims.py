@@ -0,0 +1,107 @@
+# backend/shared/auth/claims.py
+
+from typing import Any, Dict, Optional
+import json
+import logging
+import threading
+from cachetools import TTLCache
+
+logger = logging.getLogger(__name__)
+
+CLAIMS_PREFIX = "auth:user-claims:"
+
+# Authorization-relevant user fields; tokens must not be trusted for these
+USER_CLAIM_FIELDS = ('user_id', 'email', 'is_active', 'is_staff', 'is_superuser')
+
+def claims_key(user_id: str) -> str:
+    return f"{CLAIMS_PREFIX}{user_id}"
+
+class UserClaimsResolver:
+    """
+    Current user claims (active/staff/superuser flags) published by Django
+    to Redis whenever a user changes and on every login and token refresh,
+    read by both services. ``ttl`` should outlive an access token so a
+    valid token always has claims. Resolved claims are kept in process for
+    ``local_ttl`` seconds.
+    """
+
+    def __init__(self, client, ttl: int = 60 * 60 * 24, local_ttl: int = 30, cache_size: int = 10000):
+        self.redis = client
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._local = TTLCache(maxsize=cache_size, ttl=local_ttl)
+
+    def _cached(self, user_id: str):
+        with self._lock:
+            return self._local.get(user_id)
+
+    def _remember(self, user_id: str, claims: Dict[str, Any]):
+        with self._lock:
+            self._local[user_id] = claims
+
+    def _data(self, user_id: str, claims: Dict[str, Any]) -> Dict[str, Any]:
+        data = {field: claims.get(field) for field in USER_CLAIM_FIELDS}
+        data['user_id'] = str(user_id)
+        return data
+
+    def publish(self, user_id: str, claims: Dict[str, Any]):
+        data = self._data(user_id, claims)
+        self.redis.set(claims_key(user_id), json.dumps(data), ex=self.ttl)
+        self._remember(str(user_id), data)
+
+    def publish_many(self, claims_by_user: Dict[str, Dict[str, Any]]):
+        """Publish the claims of many users in one round trip"""
+        if not claims_by_user:
+            return
+        published = {user_id: self._data(user_id, claims) for user_id, claims in claims_by_user.items()}
+        pipe = self.redis.pipeline(transaction=False)
+        for user_id, data in published.items():
+            pipe.set(claims_key(user_id), json.dumps(data), ex=self.ttl)
+        pipe.execute()
+        for user_id, data in published.items():
+            self._remember(str(user_id), data)
+
+    def invalidate(self, user_id: str):
+        self.redis.delete(claims_key(user_id))
+        with self._lock:
+            self._local.pop(str(user_id), None)
+
+    def resolve(self, user_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Claims for ``user_id``, or None when unknown or Redis is unreachable"""
+        if not user_id:
+            return None
+        user_id = str(user_id)
+        claims = self._cached(user_id)
+        if claims is not None:
+            return claims
+        try:
+            data = self.redis.get(claims_key(user_id))
+        except Exception as e:
+            logger.warning(f"User claims unavailable: {str(e)}")
+            return None
+        if not data:
+            return None
+        claims = json.loads(data)
+        self._remember(user_id, claims)
+        return claims
+
+class AsyncUserClaimsResolver(UserClaimsResolver):
+    """UserClaimsResolver for a ``redis.asyncio`` client (read side)"""
+
+    async def resolve(self, user_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        if not user_id:
+            return None
+        user_id = str(user_id)
+        claims = self._cached(user_id)
+        if claims is not None:
+            return claims
+        try:
+            data = await self.redis.get(claims_key(user_id))
+        except Exception as e:
+            logger.warning(f"User claims unavailable: {str(e)}")
+            return None
+        if not data:
+            return None
+        claims = json.loads(data)
+        self._remember(user_id, claims)
+        return claims
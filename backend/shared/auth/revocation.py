@@ -0,0 +1,63 @@
+# backend/shared/auth/revocation.py
+
+from typing import Any, Dict, Optional
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+DENYLIST_PREFIX = "auth:denylist:"
+
+def denylist_key(jti: str) -> str:
+    return f"{DENYLIST_PREFIX}{jti}"
+
+def _remaining_lifetime(exp: Optional[int]) -> int:
+    """Seconds until expiry; denylist entries disappear with the token"""
+    if not exp:
+        return 0
+    return max(int(exp - time.time()), 1)
+
+class TokenDenylist:
+    """
+    Revoked token IDs (jti) in Redis, shared by Django and FastAPI.
+    Each entry expires with its token, so the set stays small.
+    Lookups fail open when Redis is unreachable.
+    """
+
+    def __init__(self, client):
+        self.redis = client
+
+    def revoke(self, claims: Dict[str, Any]):
+        jti = claims.get('jti')
+        if not jti:
+            return
+        self.redis.set(denylist_key(jti), 1, ex=_remaining_lifetime(claims.get('exp')))
+
+    def is_revoked(self, claims: Dict[str, Any]) -> bool:
+        jti = claims.get('jti')
+        if not jti:
+            return False
+        try:
+            return bool(self.redis.exists(denylist_key(jti)))
+        except Exception as e:
+            logger.warning(f"Token denylist unavailable: {str(e)}")
+            return False
+
+class AsyncTokenDenylist(TokenDenylist):
+    """TokenDenylist for a ``redis.asyncio`` client"""
+
+    async def revoke(self, claims: Dict[str, Any]):
+        jti = claims.get('jti')
+        if not jti:
+            return
+        await self.redis.set(denylist_key(jti), 1, ex=_remaining_lifetime(claims.get('exp')))
+
+    async def is_revoked(self, claims: Dict[str, Any]) -> bool:
+        jti = claims.get('jti')
+        if not jti:
+            return False
+        try:
+            return bool(await self.redis.exists(denylist_key(jti)))
+        except Exception as e:
+            logger.warning(f"Token denylist unavailable: {str(e)}")
+            return False
@@ -0,0 +1,64 @@
+# backend/shared/auth/tokens.py
+
+from typing import Any, Dict, Iterable
+import hashlib
+import threading
+import time
+from cachetools import TLRUCache
+from jose import jwt, JWTError
+
+class InvalidTokenError(Exception):
+    """Raised when a token cannot be verified or has expired"""
+
+def token_digest(token: str) -> str:
+    """Cache key for a raw token, so tokens are never kept in memory as keys"""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+class TokenVerifier:
+    """
+    Verifies HS256 JWTs issued by Django (simplejwt) and keeps verified
+    claims in an LRU cache until the token's own ``exp``. A cached token
+    is returned without decoding or checking the signature again.
+    """
+
+    def __init__(
+        self,
+        secret_key: str,
+        algorithms: Iterable[str] = ('HS256',),
+        cache_size: int = 10000,
+        token_type: str = 'access'
+    ):
+        self.secret_key = secret_key
+        self.algorithms = list(algorithms)
+        self.token_type = token_type
+        self._lock = threading.Lock()
+        self._cache = TLRUCache(
+            maxsize=cache_size,
+            ttu=lambda _key, claims, now: claims['exp'],
+            timer=time.time
+        )
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        digest = token_digest(token)
+        with self._lock:
+            claims = self._cache.get(digest)
+        if claims is not None:
+            return dict(claims)
+
+        try:
+            claims = jwt.decode(token, self.secret_key, algorithms=self.algorithms)
+        except JWTError as e:
+            raise InvalidTokenError(str(e))
+
+        if 'exp' not in claims:
+            raise InvalidTokenError('Token has no expiry')
+        if self.token_type and claims.get('token_type', self.token_type) != self.token_type:
+            raise InvalidTokenError('Token has wrong type')
+
+        with self._lock:
+            self._cache[digest] = claims
+        return dict(claims)
+
+    def forget(self, token: str):
+        with self._lock:
+            self._cache.pop(token_digest(token), None)
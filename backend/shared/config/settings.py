@@ -17,6 +17,9 @@ class ServiceSettings(BaseSettings):
     
     # Redis settings
     REDIS_URL: str = "redis://localhost:6379"
+    # Token denylist and published user claims; Django and FastAPI must
+    # read the same one, so both take it from here
+    AUTH_REDIS_URL: str = "redis://localhost:6379"
     
     class Config:
         env_file = ".env"